@@ -15,10 +15,11 @@
 if current_dir not in sys.path:
     sys.path.insert(0, current_dir)
 
-from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from pydantic import HttpUrl
 from typing import Dict, List, Optional
 from yt_dlp_wrapper import VideoDownloader
+from extraction_executor import AsyncExtractionExecutor, ClientDisconnectedError, ExecutorSaturatedError
 from models import VideoUrlRequest, FormatInfo, VideoInfoResponse, DownloadLinkResponse
 
 # 配置日志
@@ -63,8 +64,40 @@ async def log_requests(request: Request, call_next):
 
     return response
 
-# 创建视频下载器实例
-downloader = VideoDownloader()
+# 创建提取执行器（工作线程数、排队上限与单域名并发数可通过环境变量配置）
+extraction_executor = AsyncExtractionExecutor(
+    max_workers=int(os.environ.get('YTDLP_MAX_WORKERS', 8)),
+    max_pending=int(os.environ.get('YTDLP_MAX_PENDING', 64)),
+    per_domain_limit=int(os.environ.get('YTDLP_PER_DOMAIN_LIMIT', 4)),
+)
+
+# 创建视频下载器实例（实例池与提取结果缓存的参数可通过环境变量配置）
+downloader = VideoDownloader(
+    pool_size=int(os.environ.get('YTDLP_POOL_SIZE', extraction_executor.max_workers)),
+    pool_idle_timeout=float(os.environ.get('YTDLP_POOL_IDLE_TIMEOUT', 300)),
+    cache_size=int(os.environ.get('YTDLP_CACHE_SIZE', 1024)),
+    cache_ttl=float(os.environ.get('YTDLP_CACHE_TTL', 600)),
+)
+
+@app.on_event("shutdown")
+def shutdown_downloader():
+    """服务关闭时释放提取执行器与YoutubeDL实例池"""
+    extraction_executor.shutdown()
+    downloader.close()
+
+async def run_extraction(request: Request, url_str: str, func, *args, **kwargs):
+    """
+    在提取执行器中运行阻塞的提取函数
+    队列已满时返回 429，客户端断开时取消提取
+    """
+    try:
+        return await extraction_executor.run_until_disconnected(
+            request.is_disconnected, extraction_executor.run(url_str, func, *args, **kwargs))
+    except ExecutorSaturatedError as e:
+        logger.warning(f"提取队列已满，拒绝请求: {url_str}")
+        raise HTTPException(
+            status_code=429, detail=f"服务繁忙，请稍后重试: {e}",
+            headers={"Retry-After": extraction_executor.retry_after()})
 
 # API接口
 @app.get("/health", summary="健康检查", tags=["系统"])
@@ -77,7 +110,8 @@ def health_check():
     }
 
 @app.get("/formats", summary="获取视频可用格式", tags=["视频"])
-def get_video_formats(
+async def get_video_formats(
+    request: Request,
     url: HttpUrl = Query(..., description="视频URL"),
     enable_remote: Optional[bool] = Query(None, description="是否启用远程组件（绕过YouTube限制），默认仅在YouTube请求时启用")
 ):
@@ -91,14 +125,19 @@ def get_video_formats(
         final_enable_remote = is_youtube if enable_remote is None else enable_remote
 
         logger.info(f"获取原始视频信息: {url}, 是YouTube链接: {is_youtube}, 启用远程组件: {final_enable_remote}")
-        video_info = downloader.get_raw_info(url, enable_remote=final_enable_remote)
+        video_info = await run_extraction(
+            request, url_str, downloader.get_raw_info, url, enable_remote=final_enable_remote)
         return video_info
+    except HTTPException:
+        raise
+    except ClientDisconnectedError:
+        return Response(status_code=499)
     except Exception as e:
         logger.error(f"获取视频格式失败: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"获取视频格式失败: {str(e)}")
 
 @app.post("/download-link", summary="获取视频下载链接", tags=["视频"])
-def get_download_link(request: VideoUrlRequest):
+async def get_download_link(request: VideoUrlRequest, http_request: Request):
     """获取视频的最佳下载链接（自动筛选）"""
     try:
         # 判断是否为YouTube链接
@@ -109,19 +148,25 @@ def get_download_link(request: VideoUrlRequest):
         final_enable_remote = is_youtube if request.enable_remote is None else request.enable_remote
 
         logger.info(f"获取最佳下载链接: {request.url}, 格式: {request.format_id}, 是YouTube链接: {is_youtube}, 启用远程组件: {final_enable_remote}")
-        download_result = downloader.get_download_links(
+        download_result = await run_extraction(
+            http_request, url_str, downloader.get_download_links,
             request.url,
             format_id=request.format_id,
             max_quality=request.max_quality,
             enable_remote=final_enable_remote
         )
         return download_result
+    except HTTPException:
+        raise
+    except ClientDisconnectedError:
+        return Response(status_code=499)
     except Exception as e:
         logger.error(f"获取下载链接失败: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"获取下载链接失败: {str(e)}")
 
 @app.get("/download-link", summary="获取视频下载链接(GET)", tags=["视频"])
-def get_download_link_get(
+async def get_download_link_get(
+    request: Request,
     url: HttpUrl = Query(..., description="视频URL"),
     format_id: Optional[str] = Query(None, description="特定格式ID") ,
     max_quality: Optional[int] = Query(None, description="最大分辨率高度，如1080"),
@@ -137,13 +182,18 @@ def get_download_link_get(
         final_enable_remote = is_youtube if enable_remote is None else enable_remote
 
         logger.info(f"GET获取最佳下载链接: {url}, 格式: {format_id}, 是YouTube链接: {is_youtube}, 启用远程组件: {final_enable_remote}")
-        download_result = downloader.get_download_links(
+        download_result = await run_extraction(
+            request, url_str, downloader.get_download_links,
             url,
             format_id=format_id,
             max_quality=max_quality,
             enable_remote=final_enable_remote
         )
         return download_result
+    except HTTPException:
+        raise
+    except ClientDisconnectedError:
+        return Response(status_code=499)
     except Exception as e:
         logger.error(f"GET获取下载链接失败: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"获取下载链接失败: {str(e)}")
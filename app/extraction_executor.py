@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步提取执行器
+在独立的有界线程池中运行阻塞的yt-dlp提取，提供按域名的并发限制、
+排队背压（饱和时拒绝请求）以及客户端断开时的取消
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict
+from urllib.parse import urlparse
+
+logger = logging.getLogger('extraction-executor')
+
+
+class ExecutorSaturatedError(Exception):
+    """执行器排队已满，调用方应返回 429"""
+
+
+class ClientDisconnectedError(Exception):
+    """客户端在提取完成前断开连接"""
+
+
+class AsyncExtractionExecutor:
+    """有界的异步提取执行器"""
+
+    def __init__(self, max_workers: int = 8, max_pending: int = 64, per_domain_limit: int = 4):
+        """
+        初始化执行器
+        :param max_workers: 同时执行提取的最大线程数
+        :param max_pending: 允许的最大请求数（执行中 + 排队中），超过时拒绝新请求
+        :param per_domain_limit: 每个域名同时执行提取的最大数量
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.per_domain_limit = per_domain_limit
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='extract')
+        # 只保留有任务持有或等待的域名信号量，避免任意主机名的请求使其无限增长
+        self._domain_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._domain_refcounts: Dict[str, int] = {}
+        self._pending = 0
+
+    @staticmethod
+    def domain_of(url: str) -> str:
+        """
+        获取用于并发限制的域名键
+        :param url: 视频URL字符串
+        :return: 去掉 www. 前缀的小写主机名
+        """
+        hostname = (urlparse(url).hostname or '').lower()
+        return hostname[4:] if hostname.startswith('www.') else hostname
+
+    @property
+    def pending(self) -> int:
+        """当前执行中和排队中的请求数"""
+        return self._pending
+
+    def retry_after(self) -> str:
+        """根据当前排队情况估算 Retry-After 秒数"""
+        return str(max(1, self._pending // self.max_workers))
+
+    def _acquire_domain(self, domain: str) -> asyncio.Semaphore:
+        semaphore = self._domain_semaphores.get(domain)
+        if semaphore is None:
+            semaphore = self._domain_semaphores[domain] = asyncio.Semaphore(self.per_domain_limit)
+        self._domain_refcounts[domain] = self._domain_refcounts.get(domain, 0) + 1
+        return semaphore
+
+    def _release_domain(self, domain: str):
+        self._domain_refcounts[domain] -= 1
+        if not self._domain_refcounts[domain]:
+            del self._domain_refcounts[domain]
+            del self._domain_semaphores[domain]
+
+    async def run(self, url: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        在执行器中运行阻塞的提取函数
+        :param url: 视频URL，用于按域名限流
+        :param func: 阻塞的提取函数
+        :raises ExecutorSaturatedError: 排队已满
+        :return: 提取函数的返回值
+        """
+        if self._pending >= self.max_pending:
+            raise ExecutorSaturatedError(f'提取队列已满 ({self._pending}/{self.max_pending})')
+
+        domain = self.domain_of(url)
+        self._pending += 1
+        semaphore = self._acquire_domain(domain)
+        try:
+            async with semaphore:
+                loop = asyncio.get_running_loop()
+                # 任务被取消时，尚未开始执行的线程池任务会一并取消；
+                # 已经在执行的提取无法中断，但其结果会被丢弃
+                return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+        finally:
+            self._release_domain(domain)
+            self._pending -= 1
+
+    async def run_until_disconnected(
+            self, is_disconnected: Callable[[], Awaitable[bool]], coro: Awaitable[Any],
+            poll_interval: float = 0.5) -> Any:
+        """
+        运行协程，并在客户端断开连接时取消它
+        :param is_disconnected: 检查客户端是否断开的协程函数（如 Request.is_disconnected）
+        :param coro: 要运行的协程
+        :param poll_interval: 检查客户端连接状态的间隔（秒）
+        :raises ClientDisconnectedError: 客户端已断开
+        :return: 协程的返回值
+        """
+        task = asyncio.ensure_future(coro)
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=poll_interval)
+                if done:
+                    return task.result()
+                if await is_disconnected():
+                    logger.info('客户端已断开连接，取消提取任务')
+                    raise ClientDisconnectedError()
+        finally:
+            if not task.done():
+                task.cancel()
+
+    def shutdown(self, wait: bool = False):
+        """关闭线程池，取消尚未开始的提取任务"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+提取结果缓存
+进程内的 LRU + TTL 缓存，保存提取函数返回的（已经过 YoutubeDL.sanitize_info 处理的）视频信息，
+并对并发的相同请求进行合并（single-flight），只执行一次提取
+"""
+
+import copy
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger('yt-dlp-info-cache')
+
+# 签名URL中的过期时间：查询参数 expire=1700000000 或路径 /expire/1700000000/
+_EXPIRE_RE = re.compile(r'[?&/]expire[=/](\d{9,11})(?:[&/]|$)')
+
+
+def normalize_url(url: str) -> str:
+    """
+    规范化URL，用作缓存键
+    主机名小写、去掉默认端口和片段、查询参数排序
+    :param url: 视频URL字符串
+    :return: 规范化后的URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or '').lower()
+    if parts.port and (scheme, parts.port) not in (('http', 80), ('https', 443)):
+        netloc = f'{netloc}:{parts.port}'
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, parts.path or '/', query, ''))
+
+
+def earliest_expiry(info: Dict[str, Any]) -> Optional[int]:
+    """
+    查找所有格式URL中最早的 expire 时间戳
+    :param info: 视频信息字典
+    :return: Unix 时间戳，没有签名URL时返回 None
+    """
+    expiry = None
+    for fmt in info.get('formats') or ():
+        for key in ('url', 'manifest_url', 'fragment_base_url'):
+            mobj = _EXPIRE_RE.search(fmt.get(key) or '')
+            if mobj:
+                value = int(mobj.group(1))
+                expiry = value if expiry is None else min(expiry, value)
+    return expiry
+
+
+class _Flight:
+    """正在进行中的提取，供并发的相同请求等待"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class InfoCache:
+    """线程安全的 LRU + TTL 视频信息缓存"""
+
+    def __init__(self, max_entries: int = 1024, default_ttl: float = 600.0,
+                 max_ttl: float = 3600.0, expiry_margin: float = 120.0):
+        """
+        初始化缓存
+        :param max_entries: 最多缓存的条目数，超出时淘汰最久未使用的条目
+        :param default_ttl: 格式中没有签名过期时间时使用的 TTL（秒）
+        :param max_ttl: TTL 上限（秒）
+        :param expiry_margin: 在签名URL过期前提前失效的秒数，留给客户端下载的余量
+        """
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.max_ttl = max_ttl
+        self.expiry_margin = expiry_margin
+
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]' = OrderedDict()
+        self._flights: Dict[Tuple[str, str], _Flight] = {}
+        self.stats = {'hits': 0, 'misses': 0, 'shared': 0}
+
+    def ttl_for(self, info: Dict[str, Any]) -> float:
+        """
+        计算视频信息的缓存时间
+        :param info: 视频信息字典
+        :return: TTL（秒），小于等于 0 表示不缓存
+        """
+        expiry = earliest_expiry(info)
+        if expiry is None:
+            return min(self.default_ttl, self.max_ttl)
+        return min(expiry - time.time() - self.expiry_margin, self.max_ttl)
+
+    def get_or_extract(self, url: str, options_key: str, extract: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        从缓存获取视频信息，未命中时执行提取并写入缓存
+        并发的相同请求共享同一次提取的结果
+        :param url: 视频URL字符串
+        :param options_key: 影响提取结果的选项指纹
+        :param extract: 执行提取的函数，返回经过 sanitize_info 处理的视频信息
+        :return: 视频信息字典的副本，调用方可以随意修改
+        """
+        key = (normalize_url(url), options_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, info = entry
+                if expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return copy.deepcopy(info)
+                del self._entries[key]
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.stats['misses'] += 1
+            else:
+                self.stats['shared'] += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.result)
+
+        try:
+            info = extract()
+            ttl = self.ttl_for(info)
+            with self._lock:
+                if ttl > 0:
+                    self._entries[key] = (time.monotonic() + ttl, info)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            flight.result = info
+            return copy.deepcopy(info)
+        except BaseException as e:
+            # 提取失败不缓存，仅把异常传递给正在等待的请求
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.event.set()
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+YoutubeDL实例池
+按选项指纹复用预先初始化的YoutubeDL实例，避免每次请求都重新注册提取器、
+加载cookie、构建请求调度器以及丢失播放器缓存
+"""
+
+import contextlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple
+
+from yt_dlp import YoutubeDL
+
+logger = logging.getLogger('yt-dlp-pool')
+
+
+class YoutubeDLPool:
+    """线程安全的YoutubeDL实例池，按选项指纹分组，限制总数量并回收空闲实例"""
+
+    def __init__(self, max_size: int = 8, idle_timeout: float = 300.0, acquire_timeout: Optional[float] = None):
+        """
+        初始化实例池
+        :param max_size: 池中实例（空闲 + 使用中）的最大数量
+        :param idle_timeout: 空闲实例的最长保留时间（秒），超时后关闭
+        :param acquire_timeout: 池满时等待可用实例的最长时间（秒），None 表示一直等待
+        """
+        if max_size < 1:
+            raise ValueError('max_size 必须大于 0')
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+
+        self._cond = threading.Condition()
+        # 指纹 -> 空闲实例队列 [(实例, 最后使用时间)]，按最近使用顺序排列
+        self._idle: 'OrderedDict[str, Deque[Tuple[YoutubeDL, float]]]' = OrderedDict()
+        self._size = 0
+        self._closed = False
+        self.stats = {'created': 0, 'reused': 0, 'evicted': 0}
+
+    @staticmethod
+    def fingerprint(opts: Dict[str, Any]) -> str:
+        """
+        计算选项指纹，相同指纹的选项可以共享同一个实例
+        :param opts: YoutubeDL 选项字典
+        :return: 指纹字符串
+        """
+        # logger 等不可序列化的对象以 repr 参与指纹计算（同一对象 repr 稳定）
+        return json.dumps(opts, sort_keys=True, default=repr)
+
+    @contextlib.contextmanager
+    def acquire(self, opts: Dict[str, Any]) -> Iterator[YoutubeDL]:
+        """
+        从池中取出一个与选项匹配的实例，使用完毕后自动归还
+        :param opts: YoutubeDL 选项字典
+        """
+        key = self.fingerprint(opts)
+        ydl = self._checkout(key, opts)
+        try:
+            yield ydl
+        except Exception:
+            self._checkin(key, ydl)
+            raise
+        except BaseException:
+            # 被中断（如 KeyboardInterrupt）的实例状态不可信，直接丢弃
+            self._discard(ydl)
+            raise
+        else:
+            self._checkin(key, ydl)
+
+    def _checkout(self, key: str, opts: Dict[str, Any]) -> YoutubeDL:
+        deadline = None if self.acquire_timeout is None else time.monotonic() + self.acquire_timeout
+        to_close = []
+        try:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError('YoutubeDL实例池已关闭')
+                    to_close.extend(self._expire_idle())
+
+                    idle = self._idle.get(key)
+                    if idle:
+                        ydl, _ = idle.pop()
+                        if not idle:
+                            del self._idle[key]
+                        self.stats['reused'] += 1
+                        return ydl
+
+                    if self._size >= self.max_size:
+                        # 池已满：优先回收其他指纹下最久未使用的空闲实例
+                        victim = self._pop_lru_idle()
+                        if victim is not None:
+                            to_close.append(victim)
+                            self.stats['evicted'] += 1
+
+                    if self._size < self.max_size:
+                        # 先占位，实例在锁外创建
+                        self._size += 1
+                        break
+
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError('等待可用的YoutubeDL实例超时')
+                    self._cond.wait(remaining)
+        finally:
+            self._close_all(to_close)
+
+        try:
+            # YoutubeDL 会改写传入的选项字典，传入副本以保持指纹稳定
+            ydl = YoutubeDL(dict(opts))
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.stats['created'] += 1
+        logger.debug(f'创建新的YoutubeDL实例，当前实例数: {self._size}')
+        return ydl
+
+    def _checkin(self, key: str, ydl: YoutubeDL):
+        with self._cond:
+            if self._closed:
+                self._size -= 1
+                closed = True
+            else:
+                self._idle.setdefault(key, deque()).append((ydl, time.monotonic()))
+                self._idle.move_to_end(key)
+                closed = False
+            self._cond.notify()
+        if closed:
+            self._close_all([ydl])
+
+    def _discard(self, ydl: YoutubeDL):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+        self._close_all([ydl])
+
+    def _pop_lru_idle(self) -> Optional[YoutubeDL]:
+        # 调用方需持有锁
+        oldest_key, oldest_time = None, None
+        for key, idle in self._idle.items():
+            if oldest_time is None or idle[0][1] < oldest_time:
+                oldest_key, oldest_time = key, idle[0][1]
+        if oldest_key is None:
+            return None
+        idle = self._idle[oldest_key]
+        ydl, _ = idle.popleft()
+        if not idle:
+            del self._idle[oldest_key]
+        self._size -= 1
+        return ydl
+
+    def _expire_idle(self):
+        # 调用方需持有锁
+        if self.idle_timeout is None:
+            return []
+        cutoff = time.monotonic() - self.idle_timeout
+        expired = []
+        for key in list(self._idle):
+            idle = self._idle[key]
+            while idle and idle[0][1] < cutoff:
+                expired.append(idle.popleft()[0])
+            if not idle:
+                del self._idle[key]
+        if expired:
+            self._size -= len(expired)
+            self.stats['evicted'] += len(expired)
+            self._cond.notify(len(expired))
+        return expired
+
+    @staticmethod
+    def _close_all(instances):
+        for ydl in instances:
+            try:
+                ydl.close()
+            except Exception as e:
+                logger.warning(f'关闭YoutubeDL实例失败: {e}')
+
+    def evict_idle(self) -> int:
+        """
+        立即回收所有超时的空闲实例
+        :return: 回收的实例数量
+        """
+        with self._cond:
+            expired = self._expire_idle()
+        self._close_all(expired)
+        return len(expired)
+
+    def close(self):
+        """关闭实例池及其中所有空闲实例，使用中的实例在归还时关闭"""
+        with self._cond:
+            self._closed = True
+            instances = [ydl for idle in self._idle.values() for ydl, _ in idle]
+            self._size -= len(instances)
+            self._idle.clear()
+            self._cond.notify_all()
+        self._close_all(instances)
+
+    def __len__(self):
+        with self._cond:
+            return self._size
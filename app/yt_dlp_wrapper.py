@@ -9,20 +9,31 @@
 import sys
 import os
 
-from yt_dlp import YoutubeDL
 from typing import Dict, List, Optional, Any
 from models import VideoInfoResponse, FormatInfo
+from ydl_pool import YoutubeDLPool
+from info_cache import InfoCache
 
 logger = logging.getLogger('yt-dlp-wrapper')
 
 class VideoDownloader:
     """视频下载器类，封装yt-dlp的核心功能"""
 
-    def __init__(self, enable_remote: bool = True):
+    def __init__(self, enable_remote: bool = True, pool_size: int = 8, pool_idle_timeout: float = 300.0,
+                 cache_size: int = 1024, cache_ttl: float = 600.0):
         """
         初始化视频下载器
         :param enable_remote: 是否启用远程组件（用于绕过YouTube的n参数限制）
+        :param pool_size: YoutubeDL实例池的最大实例数
+        :param pool_idle_timeout: 实例池中空闲实例的保留时间（秒）
+        :param cache_size: 提取结果缓存的最大条目数，0 表示禁用缓存
+        :param cache_ttl: 格式URL不含过期时间时，提取结果的缓存时间（秒）
         """
+        # 复用预先初始化的YoutubeDL实例，避免每个请求重复初始化
+        self.ydl_pool = YoutubeDLPool(max_size=pool_size, idle_timeout=pool_idle_timeout)
+        # 缓存热门视频的提取结果，TTL 不超过签名URL的过期时间
+        self.info_cache = InfoCache(max_entries=cache_size, default_ttl=cache_ttl) if cache_size > 0 else None
+
         self.ydl_opts = {
             'quiet': True,
             'no_warnings': True,
@@ -94,9 +105,25 @@ def _extract_video_info(self, url, enable_remote: Optional[bool] = None) -> Dict
         if enable_remote is not None:
             opts['remote_components'] = ['ejs:github'] if enable_remote else []
 
-        with YoutubeDL(opts) as ydl:
-            info = ydl.extract_info(url_str, download=False)
-            return info
+        if self.info_cache is None:
+            return self._extract_uncached(url_str, opts)
+        return self.info_cache.get_or_extract(
+            url_str, YoutubeDLPool.fingerprint(opts), lambda: self._extract_uncached(url_str, opts))
+
+    def _extract_uncached(self, url_str: str, opts: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        使用实例池中的YoutubeDL实例执行提取
+        结果经过 sanitize_info 处理，无论是否启用缓存都返回相同结构、可JSON序列化的数据
+        :param url_str: 视频URL字符串
+        :param opts: YoutubeDL 选项字典
+        :return: 视频信息字典
+        """
+        with self.ydl_pool.acquire(opts) as ydl:
+            return ydl.sanitize_info(ydl.extract_info(url_str, download=False))
+
+    def close(self):
+        """释放实例池中的所有YoutubeDL实例"""
+        self.ydl_pool.close()
 
     def _map_format_to_interface(self, fmt: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+"""
+Measure the throughput of AES-CBC decryption
+
+Decrypts synthetic data with the legacy block-by-block implementation, the
+native word-based one and the backend selected by yt_dlp.aes, and reports
+the throughput of each
+"""
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import time
+
+from yt_dlp.aes import AES_BACKEND, _aes_cbc_decrypt_words, aes_cbc_decrypt_bytes, aes_decrypt, key_expansion
+
+
+def measure(func, size, repeat):
+    elapsed = min(timed(func) for _ in range(repeat))
+    return size / elapsed / 1024 / 1024
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=int, default=256 * 1024, help='size of the data in bytes (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=3, help='runs of each implementation; the best is reported (default: %(default)s)')
+    args = parser.parse_args()
+
+    data = bytes(range(256)) * (args.size // 256)
+    key, iv = bytes(range(16)), bytes(16)
+
+    def legacy():
+        expanded_key = key_expansion(list(key))
+        for i in range(0, len(data), 16):
+            aes_decrypt(list(data[i:i + 16]), expanded_key)
+
+    for name, func in (
+        ('legacy', legacy),
+        ('native', lambda: _aes_cbc_decrypt_words(data, key, iv)),
+        (AES_BACKEND, lambda: aes_cbc_decrypt_bytes(data, key, iv)),
+    ):
+        print(f'{name:>12}: {measure(func, len(data), args.repeat):.2f}MB/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+"""
+Measure the cost of sorting the formats of a video
+
+Sorts a synthetic list of YouTube-like formats the way YoutubeDL.sort_formats
+does and reports the time per video
+"""
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import itertools
+import random
+import time
+
+from yt_dlp import YoutubeDL
+from yt_dlp.utils._utils import _YDLLogger
+
+VIDEO_CODECS = ('avc1.640028', 'avc1.4d401f', 'vp09.00.40.08', 'av01.0.08M.08', 'none')
+AUDIO_CODECS = ('mp4a.40.2', 'opus', 'none')
+HEIGHTS = (144, 240, 360, 480, 720, 1080, 1440, 2160)
+PROTOCOLS = ('https', 'm3u8_native', 'http_dash_segments')
+
+
+def make_formats(count, seed=0):
+    rng = random.Random(seed)
+    formats = []
+    for index, (vcodec, acodec) in zip(range(count), itertools.cycle(itertools.product(VIDEO_CODECS, AUDIO_CODECS))):
+        if vcodec == acodec == 'none':
+            acodec = 'opus'
+        height = rng.choice(HEIGHTS) if vcodec != 'none' else None
+        formats.append({
+            'format_id': str(100 + index),
+            'url': f'https://example.com/{index}',
+            'ext': 'webm' if vcodec.startswith('vp') or acodec == 'opus' else 'mp4',
+            'vcodec': vcodec,
+            'acodec': acodec,
+            'height': height,
+            'width': height and height * 16 // 9,
+            'fps': rng.choice((24, 30, 60)) if height else None,
+            'tbr': rng.uniform(50, 20000),
+            'filesize': rng.randint(10 ** 5, 10 ** 9) if rng.random() > 0.3 else None,
+            'protocol': rng.choice(PROTOCOLS),
+            'dynamic_range': rng.choice(('SDR', 'HDR10', None)),
+            'language': 'en',
+            'quality': rng.randint(0, 10),
+        })
+    return formats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--videos', type=int, default=2000, help='number of videos to sort (default: %(default)s)')
+    parser.add_argument('--formats', type=int, default=120, help='number of formats per video (default: %(default)s)')
+    parser.add_argument('-S', '--format-sort', default='', help='sort order, as given to -S')
+    args = parser.parse_args()
+
+    params = {'logger': _YDLLogger(), 'format_sort': [f for f in args.format_sort.split(',') if f]}
+    with YoutubeDL(params) as ydl:
+        formats = make_formats(args.formats)
+        ydl.sort_formats({'formats': [dict(f) for f in formats]})  # warm up
+        start = time.perf_counter()
+        for _ in range(args.videos):
+            ydl.sort_formats({'formats': [dict(f) for f in formats]})
+        elapsed = time.perf_counter() - start
+
+    print(f'{elapsed / args.videos * 1e6:.1f}us per video ({args.formats} formats)')
+
+
+if __name__ == '__main__':
+    main()
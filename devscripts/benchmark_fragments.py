@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+"""
+Compare on-disk and in-memory fragment downloads
+
+Serves a synthetic DASH stream from a local HTTP server, downloads it with
+DashSegmentsFD in both modes and reports the wall time and the number of
+file open/remove/rename operations (counted with an audit hook)
+"""
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import collections
+import http.server
+import tempfile
+import threading
+import time
+
+from yt_dlp import YoutubeDL
+from yt_dlp.downloader.dash import DashSegmentsFD
+from yt_dlp.utils._utils import _YDLLogger
+
+FILE_EVENTS = ('open', 'os.remove', 'os.rename')
+event_counts = collections.Counter()
+
+
+def audit_hook(event, args):
+    if event in FILE_EVENTS:
+        event_counts[event] += 1
+
+
+def make_handler(fragment_size):
+    content = b'\0' * fragment_size
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'video/mp4')
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+    return Handler
+
+
+def run(port, fragments, params):
+    params = {**params, 'logger': _YDLLogger(), 'noprogress': True}
+    with tempfile.TemporaryDirectory() as tmpdir, YoutubeDL(params) as ydl:
+        filename = os.path.join(tmpdir, 'out.mp4')
+        info_dict = {
+            'protocol': 'http_dash_segments',
+            'fragments': [{'url': f'http://127.0.0.1:{port}/frag{i}'} for i in range(fragments)],
+        }
+        event_counts.clear()
+        start = time.perf_counter()
+        assert DashSegmentsFD(ydl, params).real_download(filename, info_dict)
+        return time.perf_counter() - start, dict(event_counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--fragments', type=int, default=1000, help='number of fragments (default: %(default)s)')
+    parser.add_argument('--fragment-size', type=int, default=64 * 1024, help='size of each fragment in bytes (default: %(default)s)')
+    parser.add_argument('-N', '--concurrent-fragments', type=int, default=1, help='concurrent fragment downloads (default: %(default)s)')
+    args = parser.parse_args()
+
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), make_handler(args.fragment_size))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    sys.addaudithook(audit_hook)
+
+    params = {'concurrent_fragment_downloads': args.concurrent_fragments}
+    for name, extra_params in (('disk', {}), ('memory', {'in_memory_fragments': True})):
+        elapsed, counts = run(httpd.server_address[1], args.fragments, {**params, **extra_params})
+        events = ', '.join(f'{event}={counts.get(event, 0)}' for event in FILE_EVENTS)
+        print(f'{name:>6}: {elapsed:.3f}s ({elapsed / args.fragments * 1000:.3f}ms/fragment); {events}')
+
+    httpd.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+"""
+Measure repeated evaluation of functions with JSInterpreter
+
+Builds synthetic functions with bodies of the given sizes, calls each of them
+repeatedly from a few JSInterpreter instances (as site extractors do), and
+reports the run time and the memory kept by the parse caches for each size
+of the caches and cutoff of the length of cached expressions
+"""
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from yt_dlp import jsinterp
+from yt_dlp.jsinterp import JSInterpreter
+
+
+def make_code(body_size):
+    statements = ['var a = s.split("")', 'var b = [1, 5, 2, 4, 3]']
+    while len(';'.join(statements)) < body_size:
+        i = len(statements)
+        statements.append(f'a[{i % 5}] = a[{(i * 3) % 5}] + "{i % 7}"; b[{i % 5}] = (b[{i % 5}] * {i} + {i % 3}) % 97')
+    statements.append('for (var i = 0; i < 20; i++) { var c = a[0]; a[0] = a[i % a.length]; a[i % a.length] = c; }')
+    statements.append('return a.join("").slice(0, 8) + b.length')
+    return 'function f(s){%s}' % ';'.join(statements)
+
+
+def set_cache_size(size):
+    jsinterp._PARSE_CACHE_SIZE = size
+    jsinterp._js_to_json = jsinterp._parse_cache(jsinterp._js_to_json.__wrapped__)
+    JSInterpreter._separate = staticmethod(jsinterp._parse_cache(JSInterpreter._separate.__wrapped__))
+    JSInterpreter._separate_at_operator = classmethod(
+        jsinterp._parse_cache(JSInterpreter.__dict__['_separate_at_operator'].__func__.__wrapped__))
+
+
+def clear_caches():
+    JSInterpreter._separate.cache_clear()
+    JSInterpreter._separate_at_operator.cache_clear()
+    jsinterp._js_to_json.cache_clear()
+    JSInterpreter._function_code_cache.clear()
+
+
+def run(code, interpreters, calls):
+    start = time.perf_counter()
+    for _ in range(interpreters):
+        func = JSInterpreter(code).extract_function('f')
+        for _ in range(calls):
+            func(['abcdefgh'])
+    return time.perf_counter() - start
+
+
+def parse_cutoff(value):
+    return float('inf') if value == 'inf' else int(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        '--body-sizes', type=int, nargs='+', default=[500, 2000, 4000, 8000, 16000],
+        help='approximate sizes of the function bodies in characters (default: %(default)s)')
+    parser.add_argument(
+        '--cutoffs', type=parse_cutoff, nargs='+', default=[0, jsinterp._MAX_CACHED_EXPR_LENGTH, float('inf')],
+        help='values of _MAX_CACHED_EXPR_LENGTH to compare; 0 disables the parse caches (default: %(default)s)')
+    parser.add_argument(
+        '--cache-sizes', type=int, nargs='+', default=[jsinterp._PARSE_CACHE_SIZE],
+        help='values of _PARSE_CACHE_SIZE to compare (default: %(default)s)')
+    parser.add_argument('--interpreters', type=int, default=5, help='JSInterpreter instances per run (default: %(default)s)')
+    parser.add_argument('--calls', type=int, default=60, help='calls of the function per instance (default: %(default)s)')
+    args = parser.parse_args()
+
+    print(f'{"body":>8} {"entries":>8} {"cutoff":>8} {"time":>9} {"cached":>9}')
+    for body_size in args.body_sizes:
+        code = make_code(body_size)
+        for cache_size in args.cache_sizes:
+            set_cache_size(cache_size)
+            for cutoff in args.cutoffs:
+                jsinterp._MAX_CACHED_EXPR_LENGTH = cutoff
+                clear_caches()
+                elapsed = run(code, args.interpreters, args.calls)
+                # Tracing slows the interpreter down, so the memory is measured in a separate, shorter run
+                clear_caches()
+                gc.collect()
+                tracemalloc.start()
+                run(code, 1, 2)
+                gc.collect()
+                cached, _ = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(f'{len(code):>8} {cache_size:>8} {cutoff:>8} {elapsed:>8.2f}s {cached / 1024:>7.0f}KB')
+
+if __name__ == '__main__':
+    main()
@@ -12,6 +12,7 @@
 from devscripts.utils import get_filename_args, read_file, write_file
 from yt_dlp.extractor import import_extractors
 from yt_dlp.extractor.common import InfoExtractor, SearchInfoExtractor
+from yt_dlp.extractor.url_index import url_literals
 from yt_dlp.globals import extractors
 
 NO_ATTR = object()
@@ -73,9 +74,11 @@ def build_ies(ies, bases, attr_base):
     for ie in sort_ies(ies, bases):
         yield build_lazy_ie(ie, ie.__name__, attr_base)
         if ie in ies:
-            names.append(ie.__name__)
+            names.append(ie)
 
-    yield '\n_CLASS_LOOKUP = {%s}' % ', '.join(f'{name!r}: {name}' for name in names)
+    yield '\n_CLASS_LOOKUP = {%s}' % ', '.join(f'{ie.__name__!r}: {ie.__name__}' for ie in names)
+    # Used by URLIndex to find the candidate extractors for a URL without compiling every _VALID_URL
+    yield '\n_URL_LITERALS = {%s}' % ', '.join(f'{ie.__name__!r}: {url_literals(ie)!r}' for ie in names)
 
 
 def sort_ies(ies, ignored_bases):
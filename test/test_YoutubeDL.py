@@ -14,6 +14,8 @@
 import contextlib
 import copy
 import json
+import threading
+import time
 
 from test.helper import FakeYDL, assertRegexpMatches, try_rm
 from yt_dlp import YoutubeDL
@@ -22,7 +24,9 @@
 from yt_dlp.utils import (
     ExtractorError,
     LazyList,
+    MaxDownloadsReached,
     OnDemandPagedList,
+    SpooledList,
     int_or_none,
     match_filter_func,
 )
@@ -482,6 +486,29 @@ def test_format_filtering(self):
         downloaded_ids = [info['format_id'] for info in ydl.downloaded_info_dicts]
         self.assertEqual(downloaded_ids, ['E', 'D', 'C', 'B'])
 
+    def test_format_selector_plan_cache(self):
+        ydl = YDL({'format': 'bv[height<=720]+ba/b'})
+        plan = ydl.build_format_selector('bv[height<=720]+ba/b')
+        self.assertIs(plan, ydl.format_selector)
+        self.assertEqual(plan.spec, 'bv[height<=720]+ba/b')
+        self.assertEqual(plan.selectors[0].type, 'PICKFIRST')
+        self.assertIsNot(ydl.build_format_selector('bv+ba/b'), plan)
+
+        ydl.params['allow_multiple_audio_streams'] = True
+        self.assertIsNot(ydl.build_format_selector('bv[height<=720]+ba/b'), plan)
+
+        formats = [
+            {'format_id': 'v1', 'ext': 'mp4', 'vcodec': 'avc1', 'acodec': 'none', 'height': 1080, 'url': TEST_URL},
+            {'format_id': 'v2', 'ext': 'mp4', 'vcodec': 'avc1', 'acodec': 'none', 'height': 720, 'url': TEST_URL},
+            {'format_id': 'a1', 'ext': 'm4a', 'vcodec': 'none', 'acodec': 'mp4a', 'url': TEST_URL},
+        ]
+        for video_id in ('a', 'b'):
+            ydl.downloaded_info_dicts = []
+            ydl.process_ie_result(_make_result(list(formats), id=video_id))
+            downloaded = ydl.downloaded_info_dicts[0]
+            self.assertEqual(downloaded['format_id'], 'v2+a1')
+            self.assertEqual(downloaded['ext'], 'mp4')
+
     @patch('yt_dlp.postprocessor.ffmpeg.FFmpegMergerPP.available', False)
     def test_default_format_spec_without_ffmpeg(self):
         ydl = YDL({})
@@ -1212,6 +1239,215 @@ def _real_extract(self, url):
         self.assertEqual(downloaded['extractor'], 'Video')
         self.assertEqual(downloaded['extractor_key'], 'Video')
 
+    def test_concurrent_extractions(self):
+        class _YDL(YDL):
+            def process_info(self, info_dict):
+                super().process_info(info_dict)
+                if len(self.downloaded_info_dicts) == 6:
+                    raise MaxDownloadsReached
+
+        ydl = _YDL({'concurrent_extractions': 4})
+        extracted = []
+
+        class VideoIE(InfoExtractor):
+            _VALID_URL = r'video:(?P<id>\d+)'
+
+            def _real_extract(self, url):
+                video_id = self._match_id(url)
+                # Later entries finish first
+                time.sleep(0.01 * (10 - int(video_id) % 4))
+                extracted.append(video_id)
+                return {'id': video_id, 'title': f'Video {video_id}', 'url': TEST_URL}
+
+        class PlaylistIE(InfoExtractor):
+            _VALID_URL = r'playlist:'
+
+            def _real_extract(self, url):
+                return self.playlist_result(
+                    self.url_result(f'video:{n}', VideoIE) for n in range(20))
+
+        ydl.add_info_extractor(VideoIE(ydl))
+        ydl.add_info_extractor(PlaylistIE(ydl))
+        with self.assertRaises(MaxDownloadsReached):
+            ydl.extract_info('playlist:')
+        self.assertEqual([info['id'] for info in ydl.downloaded_info_dicts], list(map(str, range(6))))
+        self.assertEqual([info['playlist_index'] for info in ydl.downloaded_info_dicts], list(range(1, 7)))
+        # Only the entries in the look-ahead window are extracted in advance
+        self.assertLessEqual(len(extracted), 6 + 4)
+        self.assertEqual(ydl._prefetched_extractions, {})
+
+    def test_concurrent_extractions_output(self):
+        messages = []
+
+        class Logger:
+            debug = warning = error = messages.append
+
+        ydl = YoutubeDL({'concurrent_extractions': 4, 'logger': Logger(), 'simulate': True}, auto_init=False)
+        instances = set()
+
+        class VideoIE(InfoExtractor):
+            _VALID_URL = r'video:(?P<id>\d+)'
+
+            def _real_extract(self, url):
+                video_id = self._match_id(url)
+                instances.add((id(self), threading.get_ident()))
+                time.sleep(0.01 * (10 - int(video_id) % 4))
+                self.to_screen(f'extracting {video_id}')
+                self.report_warning(f'warning {video_id}')
+                if video_id == '3':
+                    raise ExtractorError('failed 3', expected=True)
+                return {'id': video_id, 'title': f'Video {video_id}', 'url': TEST_URL, 'ext': 'mp4'}
+
+        class PlaylistIE(InfoExtractor):
+            _VALID_URL = r'playlist:'
+
+            def _real_extract(self, url):
+                return self.playlist_result(self.url_result(f'video:{n}', VideoIE) for n in range(8))
+
+        ydl.add_info_extractor(VideoIE())
+        ydl.add_info_extractor(PlaylistIE())
+        ydl.params['ignoreerrors'] = True
+        ydl.extract_info('playlist:')
+        output = [msg for msg in messages if msg.startswith(('[download] Downloading item', '[Video]', 'ERROR'))]
+        expected = []
+        for n in range(8):
+            expected += [
+                f'[download] Downloading item {n + 1} of 8', f'[Video] Extracting URL: video:{n}',
+                f'[Video] extracting {n}', f'[Video] warning {n}']
+        expected.insert(expected.index('[Video] warning 3') + 1, 'ERROR: [Video] 3: failed 3')
+        self.assertEqual(output, expected)
+        # Each thread has its own extractor instance
+        self.assertEqual(len(instances), len({instance for instance, _ in instances}))
+
+    def test_prefetched_pages_output(self):
+        messages = []
+
+        class Logger:
+            debug = warning = error = messages.append
+
+        ydl = YoutubeDL({'prefetch_playlist_pages': 3, 'logger': Logger(), 'simulate': True}, auto_init=False)
+
+        class PlaylistIE(InfoExtractor):
+            _VALID_URL = r'playlist:'
+
+            def _real_extract(self, url):
+                def get_page(pagenum):
+                    time.sleep(0.01 * (5 - pagenum))
+                    self.to_screen(f'Downloading page {pagenum}')
+                    if pagenum == 4:
+                        raise ExtractorError('failed page 4', expected=True)
+                    for n in range(pagenum * 2, pagenum * 2 + 2):
+                        yield {'id': str(n), 'title': f'Video {n}', 'url': TEST_URL, 'ext': 'mp4'}
+
+                return self.playlist_result(OnDemandPagedList(get_page, 2))
+
+        ydl.add_info_extractor(PlaylistIE())
+        ydl.params['ignoreerrors'] = True
+        ydl.extract_info('playlist:')
+        output = [msg for msg in messages if msg.startswith(('[Playlist] Downloading', 'ERROR'))]
+        self.assertEqual(output, [
+            *(f'[Playlist] Downloading page {n}' for n in range(5)), 'ERROR: failed page 4'])
+
+    def test_spool_playlist_entries(self):
+        class VideoIE(InfoExtractor):
+            _VALID_URL = r'video:(?P<id>\d+)'
+
+            def _real_extract(self, url):
+                video_id = self._match_id(url)
+                return {
+                    'id': video_id, 'title': f'Vidéo {video_id}', 'url': TEST_URL, 'epoch': 0,
+                    'tags': ('a', None), 'duration': None, '__private': range(3),
+                }
+
+        class PlaylistIE(InfoExtractor):
+            _VALID_URL = r'playlist:'
+
+            def _real_extract(self, url):
+                return self.playlist_result(
+                    [self.url_result(f'video:{n}', VideoIE) for n in range(5)], 'pl', 'Playlist', epoch=0)
+
+        def dump(params):
+            ydl = YDL(params)
+            ydl.add_info_extractor(VideoIE(ydl))
+            ydl.add_info_extractor(PlaylistIE(ydl))
+            info = ydl.extract_info('playlist:')
+            return info, [''.join(ydl._iter_json(info, remove_private_keys)) for remove_private_keys in (False, True)]
+
+        info, expected = dump({})
+        spooled_info, result = dump({'spool_playlist_entries': True})
+        self.assertIsInstance(spooled_info['entries'], SpooledList)
+        self.assertEqual(len(spooled_info['entries']), 5)
+        self.assertEqual(spooled_info['entries'][1]['title'], 'Vidéo 1')
+        self.assertEqual(result, expected)
+        self.assertEqual(result[0], json.dumps(YDL.sanitize_info(info)))
+        self.assertNotIn('entries', json.loads(result[1]))
+
+        # The whole JSON goes through to_stdout if a logger is used
+        class Logger:
+            debug = warning = error = staticmethod(lambda msg: None)
+
+        ydl = YDL({'spool_playlist_entries': True, 'dump_single_json': True, 'simulate': True, 'logger': Logger()})
+        ydl.add_info_extractor(VideoIE(ydl))
+        ydl.add_info_extractor(PlaylistIE(ydl))
+        printed = []
+        ydl.to_stdout = printed.append
+        ydl._YoutubeDL__download_wrapper(ydl.extract_info)('playlist:', force_generic_extractor=False)
+        self.assertEqual(len(printed), 1)
+        self.assertEqual(len(json.loads(printed[0])['entries']), 5)
+
+    def test_extract_batch(self):
+        class _YDL(YDL):
+            trouble = YoutubeDL.trouble
+
+            def to_stderr(self, *args, **kwargs):
+                pass
+
+        ydl = _YDL({'ignoreerrors': 'only_download'})
+
+        class VideoIE(InfoExtractor):
+            _VALID_URL = r'video:(?P<id>\w+)'
+
+            def _real_extract(self, url):
+                video_id = self._match_id(url)
+                if video_id == 'private':
+                    raise ExtractorError('This video is private', expected=True)
+                return {'id': video_id, 'title': f'Video {video_id}', 'url': TEST_URL}
+
+        ydl.add_info_extractor(VideoIE(ydl))
+        urls = iter(['video:a', 'video:private', 'other:b', 'video:c'])
+        results = sorted(ydl.extract_batch(urls, workers=2), key=lambda result: result['index'])
+        self.assertEqual([result['status'] for result in results], ['ok', 'error', 'error', 'ok'])
+        self.assertEqual(results[0]['info']['title'], 'Video a')
+        self.assertEqual(results[0]['errors'], [])
+        self.assertEqual(results[1]['errors'], [{'type': 'unavailable', 'message': '[Video] private: This video is private'}])
+        self.assertEqual(results[2]['errors'][0]['type'], 'unknown')
+        self.assertEqual(results[3]['url'], 'video:c')
+        self.assertIsInstance(results[3]['elapsed'], float)
+        json.dumps(results)
+
+    def test_extract_batch_playlists(self):
+        ydl = YDL()
+        barrier = threading.Barrier(2)
+
+        class PlaylistIE(InfoExtractor):
+            _VALID_URL = r'playlist:(?P<id>\w+)'
+
+            def _real_extract(self, url):
+                playlist_id = self._match_id(url)
+
+                def entries():
+                    # Both playlists are being processed at the same time
+                    barrier.wait(5)
+                    yield {'id': f'{playlist_id}1', 'title': 'Video', 'url': TEST_URL}
+
+                return self.playlist_result(entries(), playlist_id, webpage_url='https://example.com/playlist')
+
+        ydl.add_info_extractor(PlaylistIE(ydl))
+        results = list(ydl.extract_batch(['playlist:a', 'playlist:a'], workers=2))
+        self.assertEqual([len(result['info']['entries']) for result in results], [1, 1])
+        self.assertEqual(ydl._playlist_level, 0)
+        self.assertEqual(ydl._download_retcode, 0)
+
     def test_header_cookies(self):
         from http.cookiejar import Cookie
 
@@ -26,6 +26,7 @@
     key_expansion,
     pad_block,
 )
+from yt_dlp.aes import _aes_cbc_decrypt_words
 from yt_dlp.dependencies import Cryptodome
 
 # the encrypted data can be generate with 'devscripts/generate_aes_testdata.py'
@@ -51,6 +52,21 @@ def test_cbc_decrypt(self):
             decrypted = aes_cbc_decrypt_bytes(data, bytes(self.key), bytes(self.iv))
             self.assertEqual(decrypted.rstrip(b'\x08'), self.secret_msg)
 
+    def test_cbc_decrypt_key_sizes(self):
+        data = bytes(range(64))
+        iv = bytes(range(16, 32))
+        for key_size in (16, 24, 32):
+            key = bytes(range(key_size))
+            encrypted = aes_cbc_encrypt(list(data), list(key), list(iv), padding_mode='zero')
+            self.assertEqual(_aes_cbc_decrypt_words(bytes(encrypted), key, iv), data, key_size)
+            self.assertEqual(aes_cbc_decrypt_bytes(bytes(encrypted), key, iv), data, key_size)
+            # Legacy block-by-block implementation
+            expanded_key = key_expansion(list(key))
+            self.assertEqual(bytes(
+                x ^ y for i in range(0, len(encrypted), 16)
+                for x, y in zip(aes_decrypt(encrypted[i:i + 16], expanded_key), ([*iv, *encrypted])[i:i + 16], strict=True)),
+                data, key_size)
+
     def test_cbc_encrypt(self):
         data = list(self.secret_msg)
         encrypted = bytes(aes_cbc_encrypt(data, self.key, self.iv))
@@ -12,6 +12,7 @@
 
 from test.helper import gettestcases
 from yt_dlp.extractor import FacebookIE, YoutubeIE, gen_extractors
+from yt_dlp.extractor.url_index import URLResolver, literals_from_regex
 
 
 class TestAllURLsMatching(unittest.TestCase):
@@ -82,6 +83,22 @@ def test_no_duplicates(self):
                         ie.suitable(url),
                         f'{type(ie).__name__} should not match URL {url!r} . That URL belongs to {tc["name"]}.')
 
+    def test_url_resolver(self):
+        resolver = URLResolver({ie.ie_key(): ie for ie in self.ies})
+        for tc in gettestcases(include_onlymatching=True):
+            self.assertEqual(resolver.resolve(tc['url']), tc['name'], f'Wrong extractor for {tc["url"]!r}')
+        self.assertEqual(resolver.resolve('https://example.com/video.mp4'), 'Generic')
+        misses = resolver.stats['misses']
+        self.assertEqual(resolver.resolve('https://example.com/video.mp4'), 'Generic')
+        self.assertEqual(resolver.stats['misses'], misses)
+        self.assertGreaterEqual(resolver.stats['hits'], 1)
+
+    def test_literals_from_regex(self):
+        self.assertEqual(literals_from_regex(r'https?://(?:www\.)?example\.com/(?P<id>\d+)'), ('example.com/',))
+        self.assertEqual(
+            literals_from_regex(r'(?i)https?://(?:foo\.tv|Bar\.com/v)/(?P<id>\d+)'), ('bar.com/v/', 'foo.tv/'))
+        self.assertEqual(literals_from_regex(r'https?://[^/]+/(?P<id>\d+)'), None)
+
     def test_keywords(self):
         self.assertMatch(':ytsubs', ['youtube:subscriptions'])
         self.assertMatch(':ytsubscriptions', ['youtube:subscriptions'])
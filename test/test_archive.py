@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import shutil
+
+from test.helper import FakeYDL
+from yt_dlp.archive import SQLiteArchive, is_sqlite_archive
+
+
+def _mkdir(d):
+    if not os.path.exists(d):
+        os.mkdir(d)
+
+
+class TestSQLiteArchive(unittest.TestCase):
+    def setUp(self):
+        TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+        TESTDATA_DIR = os.path.join(TEST_DIR, 'testdata')
+        _mkdir(TESTDATA_DIR)
+        self.test_dir = os.path.join(TESTDATA_DIR, 'archive_test')
+        self.tearDown()
+        os.mkdir(self.test_dir)
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def test_archive(self):
+        fn = os.path.join(self.test_dir, 'archive.sqlite')
+        archive = SQLiteArchive(fn)
+        self.assertFalse(archive)
+        archive.add('youtube abc')
+        archive.add('youtube abc')
+        self.assertTrue(archive)
+        self.assertIn('youtube abc', archive)
+        self.assertNotIn('youtube abcd', archive)
+        self.assertEqual(len(archive), 1)
+
+        # Entries written by another process are visible immediately
+        other = SQLiteArchive(fn)
+        other.add('vimeo 123')
+        self.assertIn('vimeo 123', archive)
+        other.close()
+        archive.close()
+
+    def test_import_text(self):
+        text_fn = os.path.join(self.test_dir, 'archive.txt')
+        with open(text_fn, 'w', encoding='utf-8') as f:
+            f.write('youtube abc\n\nyoutube def\nyoutube abc\n')
+
+        archive = SQLiteArchive(text_fn + '.sqlite')
+        self.assertEqual(len(archive), 2)
+        self.assertIn('youtube def', archive)
+        archive.close()
+
+    def test_ydl(self):
+        fn = os.path.join(self.test_dir, 'archive.db')
+        with FakeYDL({'download_archive': fn}) as ydl:
+            self.assertIsInstance(ydl.archive, SQLiteArchive)
+            info = {'id': 'abc', 'extractor_key': 'Youtube'}
+            self.assertFalse(ydl.in_download_archive(info))
+            ydl.record_download_archive(info)
+            self.assertTrue(ydl.in_download_archive(info))
+            self.assertTrue(ydl.in_download_archive({'id': 'xyz', 'extractor_key': 'Youtube', '_old_archive_ids': ['youtube abc']}))
+
+        with FakeYDL({'download_archive': fn}) as ydl:
+            self.assertTrue(ydl.in_download_archive({'id': 'abc', 'extractor_key': 'Youtube'}))
+
+    def test_ydl_text_archive_with_sqlite_extension(self):
+        fn = os.path.join(self.test_dir, 'archive.db')
+        with open(fn, 'w', encoding='utf-8') as f:
+            f.write('youtube abc\n')
+        self.assertFalse(is_sqlite_archive(fn))
+        with FakeYDL({'download_archive': fn}) as ydl:
+            self.assertNotIsInstance(ydl.archive, SQLiteArchive)
+            self.assertTrue(ydl.in_download_archive({'id': 'abc', 'extractor_key': 'Youtube'}))
+
+        # Detected by content rather than by extension
+        fn = os.path.join(self.test_dir, 'archive')
+        SQLiteArchive(fn).close()
+        self.assertTrue(is_sqlite_archive(fn))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,11 +4,13 @@
 import os
 import sys
 import unittest
+from unittest import mock
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
 import shutil
+import time
 
 from test.helper import FakeYDL
 from yt_dlp.cache import Cache
@@ -52,6 +54,67 @@ def test_cache(self):
         self.assertFalse(os.path.exists(self.test_dir))
         self.assertEqual(c.load('test_cache', 'k.'), None)
 
+    def test_cache_memory(self):
+        ydl = FakeYDL({
+            'cachedir': self.test_dir,
+        })
+        c = Cache(ydl)
+        c.store('test_cache', 'k', {'x': [1]})
+        c.load('test_cache', 'k')['x'].append(2)
+        self.assertEqual(c.load('test_cache', 'k'), {'x': [1]})
+        self.assertEqual(c.stats['memory_hits'], 1)
+
+        # Changes by other processes are picked up
+        Cache(ydl).store('test_cache', 'k', {'x': [1, 2, 3]})
+        self.assertEqual(c.load('test_cache', 'k'), {'x': [1, 2, 3]})
+        self.assertEqual(c.stats, {'hits': 3, 'memory_hits': 1, 'misses': 0})
+
+    def test_cache_ttl(self):
+        ydl = FakeYDL({
+            'cachedir': self.test_dir,
+        })
+        c = Cache(ydl)
+        c.store('test_cache', 'k', 1, ttl=60)
+        self.assertEqual(c.load('test_cache', 'k'), 1)
+        c.store('test_cache', 'k', 1, ttl=-1)
+        self.assertEqual(c.load('test_cache', 'k', default=0), 0)
+        self.assertTrue(_is_empty(os.path.join(self.test_dir, 'test_cache')))
+
+    def test_cache_max_size(self):
+        ydl = FakeYDL({
+            'cachedir': self.test_dir,
+            'cache_max_size': 2500,
+        })
+        c = Cache(ydl)
+        for key in ('a', 'b', 'c'):
+            c.store('test_cache', key, 'x' * 1000)
+            time.sleep(0.01)
+        self.assertEqual(c.load('test_cache', 'a'), None)
+        self.assertEqual(c.load('test_cache', 'b'), 'x' * 1000)
+        time.sleep(0.01)
+        # The least recently used entry is removed
+        c.store('test_cache', 'd', 'x' * 1000)
+        self.assertEqual(c.load('test_cache', 'b'), 'x' * 1000)
+        self.assertEqual(c.load('test_cache', 'c'), None)
+
+    def test_cache_max_size_scans(self):
+        ydl = FakeYDL({
+            'cachedir': self.test_dir,
+            'cache_max_size': 10 ** 6,
+        })
+        c = Cache(ydl)
+        with mock.patch('os.walk', side_effect=os.walk) as walk:
+            for key in range(Cache._SIZE_SCAN_INTERVAL):
+                c.store('test_cache', str(key), 'x' * 100)
+            # The size is tracked, rather than recomputed on every store
+            self.assertEqual(walk.call_count, 1)
+            c.store('test_cache', 'last', 'x' * 100)
+            self.assertEqual(walk.call_count, 2)
+            # Exceeding the maximum size is noticed without waiting for a scan
+            c.store('test_cache', 'large', 'x' * 10 ** 6)
+            self.assertEqual(walk.call_count, 3)
+            self.assertEqual(c.load('test_cache', '0'), None)
+
 
 if __name__ == '__main__':
     unittest.main()
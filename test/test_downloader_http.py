@@ -4,11 +4,13 @@
 import os
 import sys
 import unittest
+from unittest import mock
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
 import http.server
+import json
 import re
 import threading
 
@@ -100,6 +102,36 @@ def test_chunked(self):
             'http_chunk_size': 1000,
         })
 
+    @mock.patch.object(HttpFD, '_MIN_RANGE_SIZE', 1024)
+    def test_connections(self):
+        self.download_all({
+            'http_connections': 4,
+        })
+        self.download_all({
+            'http_connections': 4,
+            'http_chunk_size': 1000,
+        })
+
+    @mock.patch.object(HttpFD, '_MIN_RANGE_SIZE', 1024)
+    def test_connections_resume(self):
+        filename = 'testfile.mp4'
+        params = {'logger': FakeLogger(), 'http_connections': 2}
+        downloader = HttpFD(YoutubeDL(params), params)
+        with open(downloader.temp_name(filename), 'wb') as f:
+            f.truncate(TEST_SIZE)
+        with open(downloader.ytdl_filename(filename), 'w') as f:
+            json.dump({'downloader': {'total_bytes': TEST_SIZE, 'ranges': [[1000, 4000], [6000, TEST_SIZE]]}}, f)
+        try:
+            self.assertTrue(downloader.real_download(filename, {
+                'url': f'http://127.0.0.1:{self.port}/regular',
+            }))
+            with open(filename, 'rb') as f:
+                self.assertEqual(f.read(), b''.join((
+                    b'\0' * 1000, b'#' * 3000, b'\0' * 2000, b'#' * (TEST_SIZE - 6000))))
+            self.assertFalse(os.path.exists(downloader.ytdl_filename(filename)))
+        finally:
+            try_rm(filename)
+
 
 if __name__ == '__main__':
     unittest.main()
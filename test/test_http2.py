@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import concurrent.futures
+import gzip
+import http.server
+import json
+import socket
+import ssl
+import threading
+import time
+
+from test.helper import http_server_port
+from yt_dlp.dependencies import h2
+from yt_dlp.networking import Request, RequestDirector
+from yt_dlp.networking.common import _REQUEST_HANDLERS, _RH_PREFERENCES
+from yt_dlp.networking.exceptions import HTTPError, TransportError
+from yt_dlp.utils._utils import _YDLLogger as FakeLogger
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+
+pytestmark = pytest.mark.skipif(h2 is None, reason='h2 is not installed')
+
+
+class HTTP2TestServer:
+    """Minimal HTTP/2 server. Responses to /slow are delayed, so that requests overlap"""
+
+    def __init__(self, alpn='h2'):
+        self.max_open_streams = 0
+        self.connections = 0
+        self._open_streams = 0
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(os.path.join(TEST_DIR, 'testcert.pem'), None)
+        context.set_alpn_protocols([alpn])
+        self._sock = context.wrap_socket(socket.create_server(('127.0.0.1', 0)), server_side=True)
+        self.port = self._sock.getsockname()[1]
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                sock, _ = self._sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self._handle, args=(sock,), daemon=True).start()
+
+    def _handle(self, sock):
+        import h2.config
+        import h2.connection
+        import h2.events
+
+        conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False, header_encoding='utf-8'))
+        conn.initiate_connection()
+        sock.sendall(conn.data_to_send())
+        sock.settimeout(0.01)
+        requests, responses = {}, []
+
+        while True:
+            # The socket is only used from this thread, as ssl sockets are not thread-safe
+            for response in [r for r in responses if r[0] <= time.monotonic()]:
+                responses.remove(response)
+                _, stream_id, headers, body = response
+                conn.send_headers(stream_id, headers, end_stream=not body)
+                for i in range(0, len(body), 16384):
+                    conn.send_data(stream_id, body[i:i + 16384], end_stream=i + 16384 >= len(body))
+                self._open_streams -= 1
+            sock.sendall(conn.data_to_send())
+            try:
+                data = sock.recv(65536)
+            except TimeoutError:
+                continue
+            except OSError:
+                return
+            if not data:
+                return
+            for event in conn.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    requests[event.stream_id] = [dict(event.headers), b'']
+                elif isinstance(event, h2.events.DataReceived):
+                    requests[event.stream_id][1] += event.data
+                    conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                elif isinstance(event, h2.events.StreamEnded):
+                    self._open_streams += 1
+                    self.max_open_streams = max(self.max_open_streams, self._open_streams)
+                    headers, body, *delay = self._route(*requests.pop(event.stream_id))
+                    responses.append((time.monotonic() + sum(delay), event.stream_id, headers, body))
+
+    def _route(self, headers, body):
+        path = headers[':path']
+        if path == '/headers':
+            return [(':status', '200'), ('set-cookie', 'test=ytdlp; path=/')], json.dumps(headers).encode()
+        elif path == '/method':
+            return [(':status', '200')], f'{headers[":method"]} {body.decode()}'.encode()
+        elif path == '/slow':
+            return [(':status', '200')], b'slow', 0.2
+        elif path == '/redirect':
+            return [(':status', '302'), ('location', '/headers')], b''
+        elif path == '/redirect_loop':
+            return [(':status', '302'), ('location', '/redirect_loop')], b''
+        elif path == '/gzip':
+            return [(':status', '200'), ('content-encoding', 'gzip')], gzip.compress(b'<html>')
+        elif path == '/incomplete':
+            return [(':status', '200'), ('content-length', '100')], b'x' * 10
+        return [(':status', '404')], b'Not Found'
+
+    def close(self):
+        self._sock.close()
+
+
+class HTTPSTestRequestHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '5')
+        self.end_headers()
+        self.wfile.write(b'http1')
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def server():
+    server = HTTP2TestServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def handler():
+    if 'H2' not in _REQUEST_HANDLERS:
+        pytest.skip('h2 request handler is not available')
+    return lambda **kwargs: _REQUEST_HANDLERS['H2'](logger=FakeLogger(), verify=False, **kwargs)
+
+
+class TestHTTP2RequestHandler:
+    def test_get(self, handler, server):
+        with handler() as rh:
+            res = rh.send(Request(f'https://127.0.0.1:{server.port}/headers', headers={'Test': 'test'}))
+            assert res.status == 200
+            assert res.url == f'https://127.0.0.1:{server.port}/headers'
+            headers = json.loads(res.read())
+            assert headers[':authority'] == f'127.0.0.1:{server.port}'
+            assert headers['test'] == 'test'
+            assert 'connection' not in headers
+            assert res.closed
+
+    def test_post(self, handler, server):
+        with handler() as rh:
+            res = rh.send(Request(f'https://127.0.0.1:{server.port}/method', data=b'x' * 100000))
+            assert res.read() == b'POST ' + b'x' * 100000
+
+    def test_multiplexing(self, handler, server):
+        with handler(max_concurrent_streams=3) as rh:
+            # Open the connection first, so that the requests can share it
+            rh.send(Request(f'https://127.0.0.1:{server.port}/headers')).read()
+            connections = server.connections
+            server.max_open_streams = 0
+            with concurrent.futures.ThreadPoolExecutor(6) as executor:
+                results = list(executor.map(
+                    lambda _: rh.send(Request(f'https://127.0.0.1:{server.port}/slow')).read(), range(6)))
+            assert results == [b'slow'] * 6
+            assert server.connections == connections
+            assert server.max_open_streams == 3
+            stats = rh.connection_stats.get()[f'127.0.0.1:{server.port}']
+            assert stats['new_connections'] == 1
+            assert stats['reused_connections'] == 6
+
+    def test_redirect(self, handler, server):
+        with handler() as rh:
+            res = rh.send(Request(f'https://127.0.0.1:{server.port}/redirect'))
+            assert res.url == f'https://127.0.0.1:{server.port}/headers'
+            res.read()
+            with pytest.raises(HTTPError) as exc_info:
+                rh.send(Request(f'https://127.0.0.1:{server.port}/redirect_loop'))
+            assert exc_info.value.redirect_loop
+
+    def test_cookies(self, handler, server):
+        with handler() as rh:
+            rh.send(Request(f'https://127.0.0.1:{server.port}/headers')).read()
+            headers = json.loads(rh.send(Request(f'https://127.0.0.1:{server.port}/headers')).read())
+            assert headers['cookie'] == 'test=ytdlp'
+
+    def test_errors(self, handler, server):
+        with handler() as rh:
+            with pytest.raises(HTTPError) as exc_info:
+                rh.send(Request(f'https://127.0.0.1:{server.port}/404'))
+            assert exc_info.value.status == 404
+            assert exc_info.value.response.read() == b'Not Found'
+            with pytest.raises(TransportError):
+                rh.send(Request(f'https://127.0.0.1:{server.port}/incomplete')).read()
+            with socket.create_server(('127.0.0.1', 0)) as sock:
+                closed_port = sock.getsockname()[1]
+            with pytest.raises(TransportError):
+                rh.send(Request(f'https://127.0.0.1:{closed_port}/', extensions={'timeout': 1}))
+
+    def test_gzip(self, handler, server):
+        with handler() as rh:
+            assert rh.send(Request(f'https://127.0.0.1:{server.port}/gzip')).read() == b'<html>'
+
+    def test_http1_fallback(self, handler):
+        httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), HTTPSTestRequestHandler)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(os.path.join(TEST_DIR, 'testcert.pem'), None)
+        httpd.socket = context.wrap_socket(httpd.socket, server_side=True)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        url = f'https://127.0.0.1:{http_server_port(httpd)}/'
+        try:
+            with handler() as rh:
+                assert not rh.is_http1_host(url)
+                assert rh.send(Request(url)).read() == b'http1'
+                assert rh.is_http1_host(url)
+                assert rh.send(Request(url)).read() == b'http1'
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+
+    def test_preference(self, handler, server):
+        director = RequestDirector(logger=FakeLogger())
+        for rh_class in _REQUEST_HANDLERS.values():
+            director.add_handler(rh_class(logger=FakeLogger(), verify=False))
+        director.preferences.update(_RH_PREFERENCES)
+        url = f'https://127.0.0.1:{server.port}/headers'
+        assert director._get_handlers(Request(url, extensions={'fragment': True}))[0].RH_KEY == 'H2'
+        assert director._get_handlers(Request(url))[0].RH_KEY != 'H2'
+        director.close()
+
+
+class BlockingTLSConnection:
+    """Unencrypted stand-in for TLSConnection, whose send() blocks while `blocked` is set"""
+
+    def __init__(self):
+        self.blocked = threading.Event()
+        self.sending = threading.Event()
+        self._closed = threading.Event()
+
+    def encrypt(self, data):
+        return data
+
+    def send(self, data):
+        if self.blocked.is_set():
+            self.sending.set()
+            while self.blocked.is_set():
+                time.sleep(0.01)
+
+    def recv(self):
+        self._closed.wait()
+        raise ConnectionResetError('closed')
+
+    def feed(self, data):
+        return data
+
+    def close(self):
+        self._closed.set()
+
+
+class TestHTTP2Connection:
+    def test_send_without_lock(self):
+        from yt_dlp.networking._h2 import HTTP2Connection
+
+        tls = BlockingTLSConnection()
+        connection = HTTP2Connection(tls)
+        tls.blocked.set()
+        thread = threading.Thread(target=connection.send_request, args=('GET', 'https://example.com/', {}, None, 5))
+        thread.start()
+        try:
+            assert tls.sending.wait(5)
+            # The other threads, including the reader, are not blocked by a slow send
+            assert connection._cond.acquire(timeout=1)
+            connection._cond.release()
+        finally:
+            tls.blocked.clear()
+            thread.join(5)
+            connection.close()
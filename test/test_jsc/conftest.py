@@ -6,6 +6,7 @@
 import yt_dlp.globals
 from yt_dlp import YoutubeDL
 from yt_dlp.extractor.common import InfoExtractor
+from yt_dlp.extractor.youtube.pot._provider import IEContentProviderLogger
 
 
 _TESTDATA_PATH = pathlib.Path(__file__).parent.parent / 'testdata/sigs'
@@ -39,6 +40,9 @@ def _load_player(video_id, player_url, fatal=True):
 
 
 class MockLogger:
+    log_level = IEContentProviderLogger.LogLevel.TRACE
+    LogLevel = IEContentProviderLogger.LogLevel
+
     def trace(self, message: str):
         print(f'trace: {message}')
 
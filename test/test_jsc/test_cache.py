@@ -0,0 +1,143 @@
+import pytest
+
+from yt_dlp.extractor.youtube.jsc._builtin.disk_cache import DiskJCCP
+from yt_dlp.extractor.youtube.jsc._director import JsChallengeCache, JsChallengeRequestDirector
+from yt_dlp.extractor.youtube.jsc.cache import JsChallengeCacheProvider, JsChallengeCacheProviderError
+from yt_dlp.extractor.youtube.jsc.provider import (
+    JsChallengeProvider,
+    JsChallengeProviderResponse,
+    JsChallengeRequest,
+    JsChallengeResponse,
+    JsChallengeType,
+    NChallengeInput,
+    NChallengeOutput,
+)
+
+PLAYER_URL = 'https://www.youtube.com/s/player/12345678/player_ias.vflset/en_US/base.js'
+
+
+class MemoryJCCP(JsChallengeCacheProvider):
+    PROVIDER_NAME = 'memory'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache = {}
+
+    def is_available(self):
+        return True
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def store(self, key, value, expires_at):
+        self.cache[key] = value
+
+    def delete(self, key):
+        self.cache.pop(key, None)
+
+
+class ErrorJCCP(MemoryJCCP):
+    def get(self, key):
+        raise JsChallengeCacheProviderError('get error')
+
+    def store(self, key, value, expires_at):
+        raise JsChallengeCacheProviderError('store error')
+
+
+class CountingJCP(JsChallengeProvider):
+    _SUPPORTED_TYPES = [JsChallengeType.N]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.solved = []
+
+    def is_available(self):
+        return True
+
+    def _real_bulk_solve(self, requests):
+        for request in requests:
+            self.solved.extend(request.input.challenges)
+            yield JsChallengeProviderResponse(request, JsChallengeResponse(request.type, NChallengeOutput(
+                {challenge: f'{challenge}-solved' for challenge in request.input.challenges})))
+
+
+def n_request(*challenges, player_url=PLAYER_URL):
+    return JsChallengeRequest(JsChallengeType.N, NChallengeInput(player_url, list(challenges)), 'video')
+
+
+def make_director(ie, logger, *cache_providers):
+    director = JsChallengeRequestDirector(logger, cache=JsChallengeCache(logger, list(cache_providers)))
+    provider = CountingJCP(ie, logger, {})
+    director.register_provider(provider)
+    return director, provider
+
+
+def all_results(results):
+    return {challenge: result for _, response in results for challenge, result in response.output.results.items()}
+
+
+class TestJsChallengeCache:
+    def test_shared_between_directors(self, ie, logger):
+        cache_provider = MemoryJCCP(ie, logger, {})
+        director, provider = make_director(ie, logger, cache_provider)
+        assert all_results(director.bulk_solve([n_request('a', 'b')])) == {'a': 'a-solved', 'b': 'b-solved'}
+        assert provider.solved == ['a', 'b']
+
+        # e.g. another process using the same cache
+        other_director, other_provider = make_director(ie, logger, cache_provider)
+        results = other_director.bulk_solve([n_request('a', 'b', 'c')])
+        assert all_results(results) == {'a': 'a-solved', 'b': 'b-solved', 'c': 'c-solved'}
+        assert other_provider.solved == ['c']
+        assert [request.input.challenges for request, _ in results] == [['a', 'b'], ['c']]
+
+        assert other_director.bulk_solve([n_request('a')]) == [(n_request('a'), JsChallengeResponse(
+            JsChallengeType.N, NChallengeOutput({'a': 'a-solved'})))]
+        assert other_provider.solved == ['c']
+
+    def test_keyed_by_player(self, ie, logger):
+        cache_provider = MemoryJCCP(ie, logger, {})
+        director, provider = make_director(ie, logger, cache_provider)
+        director.bulk_solve([n_request('a')])
+        # The same player on another host
+        director.bulk_solve([n_request('a', player_url=PLAYER_URL.replace('www.', 'm.'))])
+        director.bulk_solve([n_request('a', player_url=PLAYER_URL.replace('12345678', '87654321'))])
+        assert provider.solved == ['a', 'a']
+
+    def test_invalid_cached_result(self, ie, logger):
+        cache_provider = MemoryJCCP(ie, logger, {})
+        director, provider = make_director(ie, logger, cache_provider)
+        director.bulk_solve([n_request('a')])
+        for key in cache_provider.cache:
+            # n results that end with the challenge are errors
+            cache_provider.cache[key] = 'error-a'
+        assert all_results(director.bulk_solve([n_request('a')])) == {'a': 'a-solved'}
+        assert provider.solved == ['a', 'a']
+
+    def test_cache_provider_error(self, ie, logger):
+        director, provider = make_director(ie, logger, ErrorJCCP(ie, logger, {}))
+        assert all_results(director.bulk_solve([n_request('a')])) == {'a': 'a-solved'}
+        assert all_results(director.bulk_solve([n_request('a')])) == {'a': 'a-solved'}
+        assert provider.solved == ['a', 'a']
+
+
+class TestDiskJCCP:
+    @pytest.fixture
+    def provider(self, ie, logger, tmp_path):
+        ie._downloader.params['cachedir'] = str(tmp_path)
+        return DiskJCCP(ie, logger, {})
+
+    def test_store_and_get(self, provider):
+        assert provider.is_available()
+        assert provider.get('key') is None
+        provider.store('key', 'value', 2 ** 40)
+        assert provider.get('key') == 'value'
+        provider.delete('key')
+        assert provider.get('key') is None
+
+    def test_expired(self, provider):
+        provider.store('key', 'value', 0)
+        assert provider.get('key') is None
+
+    def test_disabled_cache(self, provider):
+        provider.ie._downloader.params['cachedir'] = False
+        assert not provider.is_available()
@@ -194,6 +194,17 @@ def test_bulk_requests(jcp):
     assert list(jcp.bulk_solve(requests)) == responses
 
 
+@pytest.mark.download
+def test_bulk_requests_with_workers(jcp):
+    jcp._worker_count = 2
+    try:
+        assert list(jcp.bulk_solve(requests)) == responses
+        # Solved using the preprocessed players in the worker processes
+        assert list(jcp.bulk_solve(requests)) == responses
+    finally:
+        jcp.close()
+
+
 @pytest.mark.download
 def test_using_cached_player(jcp):
     first_player_requests = requests[:3]
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from yt_dlp.extractor.youtube.jsc._builtin.ejs import Script, ScriptSource, ScriptType, ScriptVariant
+from yt_dlp.extractor.youtube.jsc._builtin.node import NodeJCP
+from yt_dlp.extractor.youtube.jsc._builtin.worker import JsRuntimeWorkerPool
+from yt_dlp.extractor.youtube.jsc.provider import (
+    JsChallengeProviderResponse,
+    JsChallengeRequest,
+    JsChallengeResponse,
+    JsChallengeType,
+    NChallengeInput,
+    NChallengeOutput,
+)
+
+# Stands in for the challenge solver: the "preprocessed player" is the upper case player
+FAKE_LIB = 'const lib = {};'
+FAKE_CORE = '''
+var jsc = (input) => {
+  const player = input.type === 'player' ? input.player.toUpperCase() : input.preprocessed_player;
+  return {
+    type: 'result',
+    ...(input.output_preprocessed ? { preprocessed_player: player } : {}),
+    responses: input.requests.map((request) => ({
+      type: 'result',
+      data: Object.fromEntries(request.challenges.map((challenge) => [challenge, `${player}:${challenge}`])),
+    })),
+  };
+};
+'''
+
+PLAYER_URL = 'https://www.youtube.com/s/player/12345678/player_ias.vflset/en_US/base.js'
+
+
+@pytest.fixture
+def jcp(ie, logger):
+    obj = NodeJCP(ie, logger, None)
+    if not obj.is_available():
+        pytest.skip(f'{obj.PROVIDER_NAME} is not available')
+    obj._lib_script = Script(ScriptType.LIB, ScriptVariant.UNKNOWN, ScriptSource.BUILTIN, '0', FAKE_LIB)
+    obj._core_script = Script(ScriptType.CORE, ScriptVariant.UNKNOWN, ScriptSource.BUILTIN, '0', FAKE_CORE)
+    obj._worker_count = 1
+    obj.player_loads = 0
+
+    def _get_player(video_id, player_url):
+        obj.player_loads += 1
+        return 'player'
+
+    obj._get_player = _get_player
+    yield obj
+    obj.close()
+
+
+def solve(jcp, *challenges):
+    request = JsChallengeRequest(JsChallengeType.N, NChallengeInput(PLAYER_URL, list(challenges)), 'video')
+    return list(jcp.bulk_solve([request])), request
+
+
+def expected_response(request):
+    return JsChallengeProviderResponse(request, JsChallengeResponse(JsChallengeType.N, NChallengeOutput(
+        {challenge: f'PLAYER:{challenge}' for challenge in request.input.challenges})))
+
+
+def test_worker_solve(jcp):
+    responses, request = solve(jcp, 'a', 'b')
+    assert responses == [expected_response(request)]
+    responses, request = solve(jcp, 'c')
+    assert responses == [expected_response(request)]
+    # The preprocessed player is kept in the worker process
+    assert jcp.player_loads == 1
+
+    script_path = jcp._worker_script_path
+    assert os.path.exists(script_path)
+    jcp.close()
+    assert not os.path.exists(script_path)
+
+
+def test_worker_restart(jcp):
+    solve(jcp, 'a')
+    with jcp._worker_pool.worker(PLAYER_URL) as worker:
+        worker._proc.kill()
+        worker._proc.wait()
+
+    responses, request = solve(jcp, 'b')
+    assert responses == [expected_response(request)]
+    assert jcp.player_loads == 2
+
+
+def test_worker_health_check(jcp, monkeypatch):
+    monkeypatch.setattr(JsRuntimeWorkerPool, 'HEALTH_CHECK_INTERVAL', 0)
+    solve(jcp, 'a')
+    with jcp._worker_pool.worker(PLAYER_URL) as worker:
+        assert worker.ping(5)
+        first_worker = worker
+
+    responses, request = solve(jcp, 'b')
+    assert responses == [expected_response(request)]
+    with jcp._worker_pool.worker(PLAYER_URL) as worker:
+        assert worker is first_worker
@@ -4,9 +4,11 @@
 import os
 import sys
 import unittest
+from unittest import mock
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import itertools
 import math
 
 from yt_dlp.jsinterp import (
@@ -566,6 +568,37 @@ def test_nested_function_scoping(self):
             }
         ''', 31)
 
+    def test_repeated_calls(self):
+        code = '''
+            function f(s) {
+                var a = s.split("");
+                for (var i = 0; i < 20; i++) { var c = a[0]; a[0] = a[i % a.length]; a[i % a.length] = c; }
+                a.reverse();
+                return a.join("");
+            }
+        '''
+        func = JSInterpreter(code).extract_function('f')
+        self.assertEqual(func(['abcdef']), 'cbafde')
+        # The function body is only parsed on the first call
+        misses = JSInterpreter._separate.cache_info().misses, JSInterpreter._separate_at_operator.cache_info().misses
+        for _ in range(50):
+            self.assertEqual(func(['abcdef']), 'cbafde')
+        self.assertEqual(
+            (JSInterpreter._separate.cache_info().misses, JSInterpreter._separate_at_operator.cache_info().misses),
+            misses)
+
+        # Functions are only searched for once per code, without keeping the code itself
+        with mock.patch.object(JSInterpreter, '_extract_function_code') as extract:
+            self._test(code, 'cbafde', args=['abcdef'])
+        extract.assert_not_called()
+        self.assertNotIn(code, itertools.chain.from_iterable(JSInterpreter._function_code_cache))
+
+        # Long expressions are not cached
+        long_expr = ','.join(['1'] * 2000)
+        misses = JSInterpreter._separate.cache_info().misses
+        self.assertEqual(len(JSInterpreter._separate(long_expr)), 2000)
+        self.assertEqual(JSInterpreter._separate.cache_info().misses, misses)
+
     def test_undefined_varnames(self):
         jsi = JSInterpreter('function f(){ var a; return [a, b]; }')
         self._test(jsi, [JS_Undefined, JS_Undefined])
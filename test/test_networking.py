@@ -19,6 +19,7 @@
 import logging
 import pathlib
 import random
+import socket
 import ssl
 import tempfile
 import threading
@@ -46,6 +47,7 @@
     RequestHandler,
     Response,
 )
+from yt_dlp.networking._helper import DNSCache, create_connection
 from yt_dlp.networking._urllib import UrllibRH
 from yt_dlp.networking.exceptions import (
     CertificateVerifyError,
@@ -695,6 +697,40 @@ def test_read(self, handler):
             # Should auto-close and mark the response adaptor as closed
             assert res.closed
 
+    @pytest.mark.skip_handler('CurlCFFI', 'does not record connection statistics')
+    def test_connection_stats(self, handler):
+        with handler(verify=False) as rh:
+            for url in (f'http://127.0.0.1:{self.http_port}/headers',) * 2 + (f'https://127.0.0.1:{self.https_port}/headers',):
+                validate_and_send(rh, Request(url)).read()
+            stats = rh.connection_stats.get()
+
+        http_stats = stats[f'127.0.0.1:{self.http_port}']
+        assert http_stats['requests'] == 2
+        assert http_stats['new_connections'] >= 1
+        assert http_stats['new_connections'] + http_stats['reused_connections'] == 2
+        assert http_stats['tls_time'] == 0
+        https_stats = stats[f'127.0.0.1:{self.https_port}']
+        assert https_stats['requests'] == https_stats['new_connections'] == 1
+        assert https_stats['connect_time'] > 0
+        assert https_stats['tls_time'] > 0
+        assert https_stats['ttfb'] > 0
+
+    @pytest.mark.skip_handler('CurlCFFI', 'uses the resolver of libcurl')
+    def test_dns_cache(self, handler):
+        lookups = []
+
+        def resolver(host, port, *args):
+            lookups.append((host, port))
+            return socket.getaddrinfo('127.0.0.1', port, *args)
+
+        dns_cache = DNSCache(resolver=resolver)
+        # The cache is shared between handlers
+        for _ in range(2):
+            with handler(dns_cache=dns_cache) as rh:
+                res = validate_and_send(rh, Request(f'http://yt-dlp.test:{self.http_port}/headers'))
+                assert b'Host: yt-dlp.test' in res.read()
+        assert lookups == [('yt-dlp.test', self.http_port)]
+
     def test_request_disable_proxy(self, handler):
         for proxy_proto in handler._SUPPORTED_PROXY_SCHEMES or ['http']:
             # Given the handler is configured with a proxy
@@ -888,6 +924,98 @@ def _send(self, request: Request):
             assert exc_info.value.handler is rh
 
 
+class TestCreateConnection:
+    IPV4_ADDR = (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('127.0.0.1', 80))
+    IPV6_ADDR = (socket.AF_INET6, socket.SOCK_STREAM, 6, '', ('::1', 80, 0, 0))
+
+    class FakeSocket:
+        def __init__(self, ip_addr):
+            self.ip_addr = ip_addr
+            self.closed = False
+
+        def close(self):
+            self.closed = True
+
+    def test_dns_cache(self):
+        lookups = []
+
+        def resolver(*args):
+            lookups.append(args)
+            return [self.IPV4_ADDR]
+
+        dns_cache = DNSCache(resolver=resolver)
+        assert dns_cache.resolve('example.com', 80) == [self.IPV4_ADDR]
+        assert dns_cache.resolve('example.com', 80) == [self.IPV4_ADDR]
+        assert dns_cache.resolve('example.com', 443) == [self.IPV4_ADDR]
+        assert lookups == [('example.com', 80, 0, socket.SOCK_STREAM), ('example.com', 443, 0, socket.SOCK_STREAM)]
+        assert dns_cache.stats == {'hits': 1, 'misses': 2}
+
+        dns_cache.invalidate('example.com', 80)
+        dns_cache.resolve('example.com', 80)
+        dns_cache.resolve('example.com', 443)
+        assert len(lookups) == 3
+
+        expiring_cache = DNSCache(ttl=0, resolver=resolver)
+        expiring_cache.resolve('example.com', 80)
+        expiring_cache.resolve('example.com', 80)
+        assert len(lookups) == 5
+
+    def test_dns_cache_invalidated_on_failure(self):
+        dns_cache = DNSCache(resolver=lambda *_: [self.IPV4_ADDR])
+
+        def create_socket(*_):
+            raise ConnectionRefusedError
+
+        dns_cache.resolve('example.com', 80)
+        with pytest.raises(ConnectionRefusedError):
+            create_connection(('example.com', 80), dns_cache=dns_cache, _create_socket_func=create_socket)
+        dns_cache.resolve('example.com', 80)
+        assert dns_cache.stats == {'hits': 1, 'misses': 2}
+
+    def test_happy_eyeballs(self):
+        dns_cache = DNSCache(resolver=lambda *_: [self.IPV6_ADDR, self.IPV6_ADDR, self.IPV4_ADDR])
+        attempts, sockets = [], []
+
+        def create_socket(ip_addr, timeout, source_address):
+            attempts.append(ip_addr[0])
+            sock = self.FakeSocket(ip_addr)
+            sockets.append(sock)
+            if ip_addr[0] == socket.AF_INET6:
+                time.sleep(0.5)  # unreachable
+            return sock
+
+        start = time.monotonic()
+        sock = create_connection(
+            ('example.com', 80), dns_cache=dns_cache, happy_eyeballs=True, _create_socket_func=create_socket)
+        assert time.monotonic() - start < 0.5
+        assert sock.ip_addr == self.IPV4_ADDR
+        # The address families are interleaved
+        assert attempts == [socket.AF_INET6, socket.AF_INET]
+
+        time.sleep(0.5)
+        assert [s.closed for s in sockets] == [True, False]
+
+    def test_happy_eyeballs_source_address(self):
+        dns_cache = DNSCache(resolver=lambda *_: [self.IPV6_ADDR, self.IPV4_ADDR])
+        attempts = []
+
+        def create_socket(ip_addr, timeout, source_address):
+            attempts.append(ip_addr[0])
+            raise ConnectionRefusedError
+
+        with pytest.raises(ConnectionRefusedError):
+            create_connection(
+                ('example.com', 80), source_address=('0.0.0.0', 0), dns_cache=dns_cache,
+                happy_eyeballs=True, _create_socket_func=create_socket)
+        assert attempts == [socket.AF_INET]
+
+        attempts.clear()
+        with pytest.raises(ConnectionRefusedError):
+            create_connection(
+                ('example.com', 80), dns_cache=dns_cache, happy_eyeballs=True, _create_socket_func=create_socket)
+        assert attempts == [socket.AF_INET6, socket.AF_INET]
+
+
 @pytest.mark.parametrize('handler', ['Urllib'], indirect=True)
 class TestUrllibRequestHandler(TestRequestHandlerBase):
     def test_file_urls(self, handler):
@@ -1657,6 +1785,21 @@ def some_preference(rh, request):
         assert director.send(Request('http://')).read() == b''
         assert director.send(Request('http://', headers={'prefer': '1'})).read() == b'supported'
 
+    def test_connection_stats(self):
+        director = RequestDirector(logger=FakeLogger())
+        director.add_handler(FakeRH(logger=FakeLogger()))
+        assert director.get_connection_stats() == {}
+        rh = FakeRH(logger=FakeLogger())
+        rh.RH_KEY = 'Fake2'
+        director.add_handler(rh)
+        for handler in director.handlers.values():
+            handler.connection_stats.record_request('example.com:443', None, 0.5)
+        rh.connection_stats.record_request('example.com:443', {'dns': 0.1, 'connect': 0.2, 'tls': 0.3}, 1)
+        assert director.get_connection_stats() == {'example.com:443': {
+            'requests': 3, 'new_connections': 1, 'reused_connections': 2,
+            'dns_time': 0.1, 'connect_time': 0.2, 'tls_time': 0.3, 'ttfb': 2.0,
+        }}
+
     def test_close(self, monkeypatch):
         director = RequestDirector(logger=FakeLogger())
         director.add_handler(FakeRH(logger=FakeLogger()))
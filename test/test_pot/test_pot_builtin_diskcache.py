@@ -0,0 +1,67 @@
+import time
+import pytest
+from yt_dlp.extractor.youtube.pot._provider import IEContentProvider, BuiltinIEContentProvider
+from yt_dlp.utils import bug_reports_message
+from yt_dlp.extractor.youtube.pot._builtin.disk_cache import DiskPCP, disk_cache_preference
+from yt_dlp.extractor.youtube.pot._builtin.memory_cache import memorylru_preference
+from yt_dlp.version import __version__
+from yt_dlp.extractor.youtube.pot._registry import _pot_cache_providers
+
+
+class TestDiskPCP:
+
+    def test_base_type(self):
+        assert issubclass(DiskPCP, IEContentProvider)
+        assert issubclass(DiskPCP, BuiltinIEContentProvider)
+
+    @pytest.fixture
+    def pcp(self, ie, logger, tmp_path) -> DiskPCP:
+        ie._downloader.params['cachedir'] = str(tmp_path)
+        return DiskPCP(ie, logger, {})
+
+    def test_is_registered(self):
+        assert _pot_cache_providers.value.get('Disk') == DiskPCP
+
+    def test_initialization(self, pcp):
+        assert pcp.PROVIDER_NAME == 'disk'
+        assert pcp.PROVIDER_VERSION == __version__
+        assert pcp.BUG_REPORT_MESSAGE == bug_reports_message(before='')
+        assert pcp.is_available()
+
+    def test_unavailable_without_cache_dir(self, pcp):
+        pcp.ie._downloader.params['cachedir'] = False
+        assert not pcp.is_available()
+
+    def test_store_and_get(self, pcp):
+        pcp.store('key1', 'value1', int(time.time()) + 60)
+        assert pcp.get('key1') == 'value1'
+        pcp.store('key1', 'value2', int(time.time()) + 60)
+        assert pcp.get('key1') == 'value2'
+
+    def test_store_ignore_expired(self, pcp, tmp_path):
+        pcp.store('key1', 'value1', int(time.time()) - 1)
+        assert pcp.get('key1') is None
+        assert not (tmp_path / DiskPCP._CACHE_SECTION).exists()
+
+    def test_get_key_expired(self, pcp, monkeypatch):
+        pcp.store('key1', 'value1', int(time.time()) + 60)
+        now = time.time()
+        monkeypatch.setattr(time, 'time', lambda: now + 61)
+        assert pcp.get('key1') is None
+
+    def test_delete(self, pcp):
+        pcp.store('key1', 'value1', int(time.time()) + 60)
+        pcp.delete('key1')
+        assert pcp.get('key1') is None
+
+    def test_shared_between_processes(self, pcp, ie, logger):
+        pcp.store('key1', 'value1', int(time.time()) + 60)
+        # A separate YoutubeDL instance with the same cache dir, e.g. another yt-dlp process
+        other_ie = type(ie)()
+        other_ie.set_downloader(type(ie._downloader)({'cachedir': ie._downloader.params['cachedir']}))
+        assert DiskPCP(other_ie, logger, {}).get('key1') == 'value1'
+
+    def test_disk_cache_preference(self, pcp, pot_request):
+        assert disk_cache_preference(pcp, pot_request) == 100
+        # The memory cache must be tried first
+        assert disk_cache_preference(pcp, pot_request) < memorylru_preference(pcp, pot_request)
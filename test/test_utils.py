@@ -15,6 +15,8 @@
 import ntpath
 import pickle
 import subprocess
+import threading
+import time
 import unittest
 import unittest.mock
 import warnings
@@ -33,6 +35,7 @@
     NO_DEFAULT,
     OnDemandPagedList,
     Popen,
+    SpooledList,
     age_restricted,
     args_to_str,
     base_url,
@@ -775,6 +778,26 @@ def get_page(pagenum):
         testPL(5, 2, (2, 99), [2, 3, 4])
         testPL(5, 2, (20, 99), [])
 
+    def test_paged_list_prefetch(self):
+        fetched = []
+
+        def get_page(pagenum):
+            fetched.append((pagenum, threading.current_thread() is threading.main_thread()))
+            time.sleep(0.01)
+            return range(pagenum * 2, min(11, pagenum * 2 + 2))
+
+        pl = OnDemandPagedList(get_page, 2, prefetch_pages=3)
+        self.assertEqual(pl.getslice(), list(range(11)))
+        self.assertEqual(sorted(set(fetched))[:6], [(0, True), *((n, False) for n in range(1, 6))])
+        pl.stop_prefetching()
+
+        fetched.clear()
+        pl = OnDemandPagedList(get_page, 2, prefetch_pages=3)
+        self.assertEqual(pl.getslice(0, 3), [0, 1, 2])
+        pl.stop_prefetching()
+        time.sleep(0.05)
+        self.assertLessEqual(max(pagenum for pagenum, _ in fetched), 4)
+
     def test_read_batch_urls(self):
         f = io.StringIO('''\xef\xbb\xbf foo
             bar\r
@@ -784,6 +807,13 @@ def test_read_batch_urls(self):
             bam''')
         self.assertEqual(read_batch_urls(f), ['foo', 'bar', 'baz', 'bam'])
 
+        f = io.StringIO('foo\n# bar\nbaz\n')
+        urls = read_batch_urls(f, lazy=True)
+        self.assertEqual(next(urls), 'foo')
+        self.assertFalse(f.closed)
+        self.assertEqual(list(urls), ['baz'])
+        self.assertTrue(f.closed)
+
     def test_urlencode_postdata(self):
         data = urlencode_postdata({'username': 'foo@bar.com', 'password': '1234'})
         self.assertTrue(isinstance(data, bytes))
@@ -1986,6 +2016,21 @@ def test(ll, idx, val, cache):
         ll = reversed(ll)
         test(ll, -15, 14, range(15))
 
+    def test_SpooledList(self):
+        items = [{'id': 'ä', 'n': [1, 2.5, None]}, 'x', None]
+        sl = SpooledList(items)
+        self.assertEqual(len(sl), 3)
+        self.assertEqual(sl[0], items[0])
+        self.assertEqual(sl[-1], None)
+        self.assertEqual(sl[1:], items[1:])
+        self.assertEqual(list(sl), items)
+        self.assertEqual(list(sl.iter_json()), [json.dumps(item) for item in items])
+
+        block = sl.store({'y': 1})
+        self.assertEqual(len(sl), 3)
+        self.assertIs(sl.arrange([block, 'z']), sl)
+        self.assertEqual(list(sl), [{'y': 1}, 'z'])
+
     def test_format_bytes(self):
         self.assertEqual(format_bytes(0), '0.00B')
         self.assertEqual(format_bytes(1000), '1000.00B')
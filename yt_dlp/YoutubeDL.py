@@ -1,4 +1,5 @@
 import collections
+import concurrent.futures
 import contextlib
 import copy
 import datetime as dt
@@ -19,11 +20,13 @@
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 import tokenize
 import traceback
 import unicodedata
 
+from .archive import SQLiteArchive, is_sqlite_archive
 from .cache import Cache
 from .compat import urllib  # isort: split
 from .compat import urllib_req_to_req
@@ -33,6 +36,7 @@
 from .extractor import gen_extractor_classes, get_info_extractor, import_extractors
 from .extractor.common import UnsupportedURLIE
 from .extractor.openload import PhantomJSwrapper
+from .extractor.url_index import URLResolver, has_prebuilt_url_index
 from .globals import (
     IN_CLI,
     LAZY_EXTRACTORS,
@@ -47,6 +51,7 @@
 )
 from .minicurses import format_text
 from .networking import HEADRequest, Request, RequestDirector
+from .networking._helper import DNSCache
 from .networking.common import _REQUEST_HANDLERS, _RH_PREFERENCES
 from .networking.exceptions import (
     HTTPError,
@@ -111,7 +116,9 @@
     ReExtractInfo,
     RejectedVideoReached,
     SameFileError,
+    SpooledList,
     UnavailableVideoError,
+    UnsupportedError,
     UserNotLive,
     YoutubeDLError,
     age_restricted,
@@ -196,6 +203,26 @@ def wrapper(self, *args, **kwargs):
     return wrapper
 
 
+class FormatSelectorPlan:
+    """
+    A parsed format specification
+
+    Calling the plan with the context of a video yields the selected formats.
+    The parsed selectors are kept in "selectors" for inspection
+    """
+
+    def __init__(self, spec, selectors, selector_function):
+        self.spec = spec
+        self.selectors = selectors
+        self._selector_function = selector_function
+
+    def __call__(self, ctx):
+        return self._selector_function(ctx)
+
+    def __repr__(self):
+        return f'<{type(self).__name__} {self.spec!r}: {self.selectors!r}>'
+
+
 class YoutubeDL:
     """YoutubeDL class.
 
@@ -293,6 +320,13 @@ class YoutubeDL:
     playlist_items:    Specific indices of playlist to download.
     playlistrandom:    Download playlist items in random order.
     lazy_playlist:     Process playlist entries as they are received.
+    concurrent_extractions: Number of playlist entries to extract concurrently,
+                       ahead of processing them in order. Default is 1
+    prefetch_playlist_pages: Number of pages of an OnDemandPagedList to download
+                       in the background, ahead of the page being processed
+    spool_playlist_entries: Keep the processed playlist entries in a temporary
+                       file instead of in memory. They are written out one at
+                       a time by dump_single_json and writeinfojson
     matchtitle:        Download only matching titles.
     rejecttitle:       Reject downloads for matching titles.
     logger:            A class having a `debug`, `warning` and `error` function where
@@ -328,6 +362,8 @@ class YoutubeDL:
     skip_download:     Skip the actual download of the video file
     cachedir:          Location of the cache files in the filesystem.
                        False to disable filesystem cache.
+    cache_max_size:    Maximum total size of the cache files in bytes. The least
+                       recently used files are deleted when it is exceeded
     noplaylist:        Download single video instead of a playlist if in doubt.
     age_limit:         An integer representing the user's age in years.
                        Unsuitable videos for the given age are skipped.
@@ -342,6 +378,8 @@ class YoutubeDL:
                        downloaded. None for no limit.
     download_archive:  A set, or the name of a file where all downloads are recorded.
                        Videos already present in the file are not downloaded again.
+                       Files ending in .sqlite, .sqlite3 or .db are used as an
+                       indexed SQLite database instead of being loaded into memory
     break_on_existing: Stop the download process after attempting to download a
                        file that is in the archive.
     break_per_url:     Whether break_on_reject and break_on_existing
@@ -433,6 +471,9 @@ class YoutubeDL:
                        - "detect_or_warn": check whether we can do anything
                                            about it, warn otherwise (default)
     source_address:    Client-side IP address to bind to.
+    dns_cache_ttl:     Number of seconds to cache resolved hostnames for (default 60).
+                       0 disables the cache
+    happy_eyeballs:    Connect to the IPv4 and IPv6 addresses of hosts in parallel
     impersonate:       Client to impersonate for requests.
                        An ImpersonateTarget (from yt_dlp.networking.impersonate)
     sleep_interval_requests: Number of seconds to sleep between requests
@@ -512,8 +553,9 @@ class YoutubeDL:
     the downloader (see yt_dlp/downloader/common.py):
     nopart, updatetime, buffersize, ratelimit, throttledratelimit, min_filesize,
     max_filesize, test, noresizebuffer, retries, file_access_retries, fragment_retries,
-    continuedl, hls_use_mpegts, http_chunk_size, external_downloader_args,
-    concurrent_fragment_downloads, progress_delta.
+    continuedl, hls_use_mpegts, http_chunk_size, http_connections, external_downloader_args,
+    concurrent_fragment_downloads, adaptive_fragment_concurrency, in_memory_fragments,
+    async_fragments, progress_delta.
 
     The following options are used by the post processors:
     ffmpeg_location:   Location of the ffmpeg binary; either the path
@@ -636,6 +678,12 @@ def __init__(self, params=None, auto_init=True):
         self.params = params
         self._ies = {}
         self._ies_instances = {}
+        self._url_resolver = None
+        self._url_lookups = 0
+        self._format_sorters = {}
+        self._format_selectors = {}
+        self._prefetched_extractions = {}
+        self._local = threading.local()
         self._pps = {k: [] for k in POSTPROCESS_WHEN}
         self._printed_messages = set()
         self._first_webpage_request = True
@@ -837,6 +885,11 @@ def preload_download_archive(fn):
                 return archive
             elif not is_path_like(fn):
                 return fn
+            elif is_sqlite_archive(fn):
+                self.write_debug(f'Opening archive database {fn!r}')
+                archive = SQLiteArchive(fn, self.write_debug)
+                self.add_close_hook(archive.close)
+                return archive
 
             self.write_debug(f'Loading archive file {fn!r}')
             try:
@@ -898,6 +951,8 @@ def warn_if_short_id(self, argv):
     def add_info_extractor(self, ie):
         """Add an InfoExtractor object to the end of the list."""
         ie_key = ie.ie_key()
+        if ie_key not in self._ies:
+            self._url_resolver = None
         self._ies[ie_key] = ie
         if not isinstance(ie, type):
             self._ies_instances[ie_key] = ie
@@ -989,8 +1044,32 @@ def to_stdout(self, message, skip_eol=False, quiet=None):
                                      'Use "YoutubeDL.to_screen" instead')
         self._write_string(f'{self._bidi_workaround(message)}\n', self._out_files.out)
 
+    def _defer_output(self, name, *args, **kwargs):
+        """Record the call instead of outputting, if the output of this thread is deferred"""
+        deferred = getattr(self._local, 'deferred_output', None)
+        if deferred is None:
+            return False
+        deferred.append((name, args, kwargs))
+        return True
+
+    @contextlib.contextmanager
+    def _deferring_output(self):
+        """Record the output of this thread into the yielded list instead, for _replay_output"""
+        previous = getattr(self._local, 'deferred_output', None)
+        self._local.deferred_output = output = []
+        try:
+            yield output
+        finally:
+            self._local.deferred_output = previous
+
+    def _replay_output(self, output):
+        for name, args, kwargs in output:
+            getattr(self, name)(*args, **kwargs)
+
     def to_screen(self, message, skip_eol=False, quiet=None, only_once=False):
         """Print message to screen if not in quiet mode"""
+        if self._defer_output('to_screen', message, skip_eol, quiet, only_once):
+            return
         if self.params.get('logger'):
             self.params['logger'].debug(message)
             return
@@ -1003,6 +1082,8 @@ def to_screen(self, message, skip_eol=False, quiet=None, only_once=False):
     def to_stderr(self, message, only_once=False):
         """Print message to stderr"""
         assert isinstance(message, str)
+        if self._defer_output('to_stderr', message, only_once):
+            return
         if self.params.get('logger'):
             self.params['logger'].error(message)
         else:
@@ -1052,7 +1133,12 @@ def __exit__(self, *args):
 
     def close(self):
         self.save_cookies()
+        if self._url_resolver is not None:
+            self.write_debug('URL resolver: {hits} hits, {misses} misses, {entries} cached'.format(**self._url_resolver.stats))
+        if self.cache.stats['hits'] or self.cache.stats['misses']:
+            self.write_debug('Cache: {hits} hits ({memory_hits} from memory), {misses} misses'.format(**self.cache.stats))
         if '_request_director' in self.__dict__:
+            self._report_connection_stats()
             self._request_director.close()
             del self._request_director
 
@@ -1085,6 +1171,9 @@ def trouble(self, message=None, tb=None, is_error=True):
                 self.to_stderr(tb)
         if not is_error:
             return
+        errors = getattr(self._local, 'errors', None)
+        if errors is not None:
+            errors.append((message, sys.exc_info()[1]))
         if not self.params.get('ignoreerrors'):
             if sys.exc_info()[0] and hasattr(sys.exc_info()[1], 'exc_info') and sys.exc_info()[1].exc_info[0]:
                 exc_info = sys.exc_info()[1].exc_info
@@ -1130,6 +1219,8 @@ def report_warning(self, message, only_once=False):
         Print the message to stderr, it will be prefixed with 'WARNING:'
         If stderr is a tty file the 'WARNING:' will be colored
         """
+        if self._defer_output('report_warning', message, only_once):
+            return
         if self.params.get('logger') is not None:
             self.params['logger'].warning(message)
         else:
@@ -1157,6 +1248,8 @@ def write_debug(self, message, only_once=False):
         """Log debug message or Print message to stderr"""
         if not self.params.get('verbose', False):
             return
+        if self._defer_output('write_debug', message, only_once):
+            return
         message = f'[debug] {message}'
         if self.params.get('logger'):
             self.params['logger'].debug(message)
@@ -1667,7 +1760,8 @@ def extract_info(self, url, download=True, ie_key=None, extra_info=None,
         if ie_key:
             ies = {ie_key: self._ies[ie_key]} if ie_key in self._ies else {}
         else:
-            ies = self._ies
+            suitable_key = self._suitable_ie_key(url)
+            ies = {suitable_key: self._ies[suitable_key]} if suitable_key else {}
 
         for key, ie in ies.items():
             if not ie.suitable(url):
@@ -1690,6 +1784,17 @@ def extract_info(self, url, download=True, ie_key=None, extra_info=None,
             self.report_error(f'No suitable extractor{format_field(ie_key, None, " (%s)")} found for URL {url}',
                               tb=False if extractors_restricted else None)
 
+    def _suitable_ie_key(self, url):
+        """Return the key of the first extractor whose suitable() is True for the URL"""
+        self._url_lookups += 1
+        # Without lazy extractors, building the index costs about as much as
+        # trying every extractor once, so it is only worth it for several URLs
+        if self._url_resolver is None and (has_prebuilt_url_index() or self._url_lookups > 1):
+            self._url_resolver = URLResolver(self._ies)
+        if self._url_resolver is None:
+            return next((ie_key for ie_key, ie in self._ies.items() if ie.suitable(url)), None)
+        return self._url_resolver.resolve(url)
+
     def _handle_extraction_exceptions(func):
         @functools.wraps(func)
         def wrapper(self, *args, **kwargs):
@@ -1829,8 +1934,15 @@ def _apply_header_cookies(self, url, cookies=None):
     def __extract_info(self, url, ie, download, extra_info, process):
         self._apply_header_cookies(url)
 
+        future = self._prefetched_extractions.pop((url, ie.ie_key()), None)
         try:
-            ie_result = ie.extract(url)
+            if future:
+                ie_result, output = future.result()
+                self._replay_output(output)
+                if isinstance(ie_result, Exception):
+                    raise ie_result
+            else:
+                ie_result = ie.extract(url)
         except UserNotLive as e:
             if process:
                 if self.params.get('wait_for_video'):
@@ -2097,52 +2209,62 @@ def __process_playlist(self, ie_result, download):
         keep_resolved_entries = self.params.get('extract_flat') != 'discard'
         if self.params.get('extract_flat') == 'discard_in_playlist':
             keep_resolved_entries = ie_result['_type'] != 'playlist'
-        if keep_resolved_entries:
+        spool = None
+        if keep_resolved_entries and self.params.get('spool_playlist_entries'):
+            spool = SpooledList()
+            self.write_debug('The information of all playlist entries will be kept in a temporary file')
+        elif keep_resolved_entries:
             self.write_debug('The information of all playlist entries will be held in memory')
 
         failures = 0
         max_failures = self.params.get('skip_playlist_after_errors') or float('inf')
-        for i, (playlist_index, entry) in enumerate(entries):
-            if lazy:
-                resolved_entries.append((playlist_index, entry))
-            if not entry:
-                continue
+        with contextlib.closing(self._prefetch_extractions(entries)) as entries:
+            for i, (playlist_index, entry) in enumerate(entries):
+                if lazy:
+                    resolved_entries.append((playlist_index, entry))
+                if not entry:
+                    continue
 
-            entry['__x_forwarded_for_ip'] = ie_result.get('__x_forwarded_for_ip')
-            if not lazy and 'playlist-index' in self.params['compat_opts']:
-                playlist_index = ie_result['requested_entries'][i]
+                entry['__x_forwarded_for_ip'] = ie_result.get('__x_forwarded_for_ip')
+                if not lazy and 'playlist-index' in self.params['compat_opts']:
+                    playlist_index = ie_result['requested_entries'][i]
 
-            entry_copy = collections.ChainMap(entry, {
-                **common_info,
-                'n_entries': int_or_none(n_entries),
-                'playlist_index': playlist_index,
-                'playlist_autonumber': i + 1,
-            })
+                entry_copy = collections.ChainMap(entry, {
+                    **common_info,
+                    'n_entries': int_or_none(n_entries),
+                    'playlist_index': playlist_index,
+                    'playlist_autonumber': i + 1,
+                })
 
-            if self._match_entry(entry_copy, incomplete=True) is not None:
-                # For compatabilty with youtube-dl. See https://github.com/yt-dlp/yt-dlp/issues/4369
-                resolved_entries[i] = (playlist_index, NO_DEFAULT)
-                continue
+                if self._match_entry(entry_copy, incomplete=True) is not None:
+                    # For compatabilty with youtube-dl. See https://github.com/yt-dlp/yt-dlp/issues/4369
+                    resolved_entries[i] = (playlist_index, NO_DEFAULT)
+                    continue
 
-            self.to_screen(
-                f'[download] Downloading item {self._format_screen(i + 1, self.Styles.ID)} '
-                f'of {self._format_screen(n_entries, self.Styles.EMPHASIS)}')
-
-            entry_result = self.__process_iterable_entry(entry, download, collections.ChainMap({
-                'playlist_index': playlist_index,
-                'playlist_autonumber': i + 1,
-            }, extra))
-            if not entry_result:
-                failures += 1
-            if failures >= max_failures:
-                self.report_error(
-                    f'Skipping the remaining entries in playlist "{title}" since {failures} items failed extraction')
-                break
-            if keep_resolved_entries:
-                resolved_entries[i] = (playlist_index, entry_result)
+                self.to_screen(
+                    f'[download] Downloading item {self._format_screen(i + 1, self.Styles.ID)} '
+                    f'of {self._format_screen(n_entries, self.Styles.EMPHASIS)}')
+
+                entry_result = self.__process_iterable_entry(entry, download, collections.ChainMap({
+                    'playlist_index': playlist_index,
+                    'playlist_autonumber': i + 1,
+                }, extra))
+                if not entry_result:
+                    failures += 1
+                if failures >= max_failures:
+                    self.report_error(
+                        f'Skipping the remaining entries in playlist "{title}" since {failures} items failed extraction')
+                    break
+                if spool is not None:
+                    resolved_entries[i] = (playlist_index, spool.store(self._sanitize_value(entry_result)))
+                elif keep_resolved_entries:
+                    resolved_entries[i] = (playlist_index, entry_result)
 
         # Update with processed data
         ie_result['entries'] = [e for _, e in resolved_entries if e is not NO_DEFAULT]
+        if spool is not None:
+            ie_result['entries'] = spool.arrange(
+                e if isinstance(e, SpooledList.Block) else self._sanitize_value(e) for e in ie_result['entries'])
         ie_result['requested_entries'] = [i for i, e in resolved_entries if e is not NO_DEFAULT]
         if ie_result['requested_entries'] == try_call(lambda: list(range(1, ie_result['playlist_count'] + 1))):
             # Do not set for full playlist
@@ -2158,6 +2280,75 @@ def __process_playlist(self, ie_result, download):
         self.to_screen(f'[download] Finished downloading playlist: {title}')
         return ie_result
 
+    def _prefetch_extractions(self, entries):
+        """
+        Yield the playlist entries, while extracting the URL entries after them
+
+        Up to "concurrent_extractions" entries are extracted in a thread pool
+        ahead of the current one. The entries are still processed in order, so
+        the archive and playlist indices do not change. The messages of the
+        extraction are held back until its entry is processed
+        """
+        workers = self.params.get('concurrent_extractions') or 1
+        if workers <= 1 or self.params.get('extract_flat') in (True, 'in_playlist'):
+            yield from entries
+            return
+
+        def discard(key):
+            future = self._prefetched_extractions.pop(key, None)
+            if future:
+                future.cancel()
+
+        pending, key, local = collections.deque(), None, threading.local()
+        with concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix='extract') as executor:
+            try:
+                for item in entries:
+                    pending.append((item, self.__submit_extraction(executor, local, item[1])))
+                    if len(pending) > workers:
+                        item, key = pending.popleft()
+                        yield item
+                        # The entry may have been skipped without being extracted
+                        discard(key)
+                while pending:
+                    item, key = pending.popleft()
+                    yield item
+                    discard(key)
+            finally:
+                discard(key)
+                for _, key in pending:
+                    discard(key)
+
+    def __submit_extraction(self, executor, local, entry):
+        if not entry or entry.get('_type') not in ('url', 'url_transparent'):
+            return None
+        url = sanitize_url(entry['url'], scheme='http' if self.params.get('prefer_insecure') else 'https')
+        ie_key = entry.get('ie_key') or self._suitable_ie_key(url)
+        ie = self._ies.get(ie_key)
+        if not ie or not ie.suitable(url) or (url, ie_key) in self._prefetched_extractions:
+            return None
+        temp_id = ie.get_temp_id(url)
+        if temp_id is not None and self.in_download_archive({'id': temp_id, 'ie_key': ie_key}):
+            return None
+
+        ie_class = type(self.get_info_extractor(ie_key))
+
+        def extract():
+            # Extractors are not reentrant, so each thread has its own instances
+            ies = local.__dict__.setdefault('ies', {})
+            if ie_key not in ies:
+                ies[ie_key] = ie_class(self)
+            with self._deferring_output() as output:
+                try:
+                    self._apply_header_cookies(url)
+                    return ies[ie_key].extract(url), output
+                except Exception as e:
+                    # Raised when the entry is processed, after its output
+                    return e, output
+
+        key = (url, ie_class.ie_key())
+        self._prefetched_extractions[key] = executor.submit(extract)
+        return key
+
     @_handle_extraction_exceptions
     def __process_iterable_entry(self, entry, download, extra_info):
         return self.process_ie_result(
@@ -2223,10 +2414,12 @@ def _build_format_filter(self, filter_spec):
         if not m:
             raise SyntaxError(f'Invalid filter specification {filter_spec!r}')
 
+        key, none_inclusive = m.group('key', 'none_inclusive')
+
         def _filter(f):
-            actual_value = f.get(m.group('key'))
+            actual_value = f.get(key)
             if actual_value is None:
-                return m.group('none_inclusive')
+                return none_inclusive
             return op(actual_value, comparison_value)
         return _filter
 
@@ -2302,6 +2495,20 @@ def can_merge():
                 else 'bestvideo*+bestaudio/best')
 
     def build_format_selector(self, format_spec):
+        """
+        Return a FormatSelectorPlan for the format specification
+
+        Plans are cached per specification, so that the specification is parsed
+        and its filters are compiled only once for all the videos
+        """
+        key = (format_spec, self.params.get('allow_multiple_audio_streams', False),
+               self.params.get('allow_multiple_video_streams', False))
+        plan = self._format_selectors.get(key)
+        if plan is None:
+            plan = self._format_selectors[key] = self._compile_format_selector(format_spec)
+        return plan
+
+    def _compile_format_selector(self, format_spec):
         def syntax_error(note, start):
             message = (
                 'Invalid format specification: '
@@ -2414,6 +2621,12 @@ def _parse_format_selection(tokens, inside_merge=False, inside_choice=False, ins
                 selectors.append(current_selector)
             return selectors
 
+        @functools.lru_cache(maxsize=256)
+        def compatible_ext(vcodecs, acodecs, vexts, aexts, preferences):
+            return get_compatible_ext(
+                vcodecs=list(vcodecs), acodecs=list(acodecs), vexts=list(vexts), aexts=list(aexts),
+                preferences=preferences and list(preferences))
+
         def _merge(formats_pair):
             format_1, format_2 = formats_pair
 
@@ -2443,13 +2656,13 @@ def _merge(formats_pair):
             the_only_video = video_fmts[0] if len(video_fmts) == 1 else None
             the_only_audio = audio_fmts[0] if len(audio_fmts) == 1 else None
 
-            output_ext = get_compatible_ext(
-                vcodecs=[f.get('vcodec') for f in video_fmts],
-                acodecs=[f.get('acodec') for f in audio_fmts],
-                vexts=[f['ext'] for f in video_fmts],
-                aexts=[f['ext'] for f in audio_fmts],
-                preferences=(try_call(lambda: self.params['merge_output_format'].split('/'))
-                             or (self.params.get('prefer_free_formats') and ('webm', 'mkv'))))
+            output_ext = compatible_ext(
+                vcodecs=tuple(f.get('vcodec') for f in video_fmts),
+                acodecs=tuple(f.get('acodec') for f in audio_fmts),
+                vexts=tuple(f['ext'] for f in video_fmts),
+                aexts=tuple(f['ext'] for f in audio_fmts),
+                preferences=(try_call(lambda: tuple(self.params['merge_output_format'].split('/')))
+                             or (self.params.get('prefer_free_formats') and ('webm', 'mkv')) or None))
 
             filtered = lambda *keys: filter(None, (traverse_obj(fmt, *keys) for fmt in formats_info))
 
@@ -2645,7 +2858,7 @@ def restore_last_token(self):
                 self.counter -= 1
 
         parsed_selector = _parse_format_selection(iter(TokenIterator(tokens)))
-        return _build_selector_function(parsed_selector)
+        return FormatSelectorPlan(format_spec, parsed_selector, _build_selector_function(parsed_selector))
 
     def _calc_headers(self, info_dict, load_cookies=False):
         res = HTTPHeaderDict(self.params['http_headers'], info_dict.get('http_headers'))
@@ -2793,8 +3006,18 @@ def _raise_pending_errors(self, info):
 
     def sort_formats(self, info_dict):
         formats = self._get_formats(info_dict)
-        formats.sort(key=FormatSorter(
-            self, info_dict.get('_format_sort_fields') or []).calculate_preference)
+        formats.sort(key=self._get_format_sorter(info_dict.get('_format_sort_fields') or []).calculate_preference)
+
+    def _get_format_sorter(self, field_preference):
+        key = (
+            tuple(field_preference), tuple(self.params.get('format_sort') or ()), FormatSorter.default,
+            self.params.get('prefer_free_formats'), self.params.get('format_sort_force'))
+        sorter = self._format_sorters.get(key)
+        if sorter is None:
+            sorter = self._format_sorters[key] = FormatSorter(self, field_preference)
+        elif self.params.get('verbose'):
+            sorter.print_verbose_info(self.write_debug)
+        return sorter
 
     def process_video_result(self, info_dict, download=True):
         assert info_dict.get('_type', 'video') == 'video'
@@ -3653,7 +3876,15 @@ def wrapper(*args, **kwargs):
             else:
                 if self.params.get('dump_single_json', False):
                     self.post_extract(res)
-                    self.to_stdout(json.dumps(self.sanitize_info(res)))
+                    if not isinstance((res or {}).get('entries'), SpooledList):
+                        self.to_stdout(json.dumps(self.sanitize_info(res)))
+                    elif self.params.get('logger') or self.params.get('bidi_workaround'):
+                        # These need the whole message
+                        self.to_stdout(''.join(self._iter_json(res)))
+                    else:
+                        for chunk in self._iter_json(res):
+                            self._write_string(chunk, self._out_files.out)
+                        self._write_string('\n', self._out_files.out)
         return wrapper
 
     def download(self, url_list):
@@ -3672,6 +3903,106 @@ def download(self, url_list):
 
         return self._download_retcode
 
+    def extract_batch(self, urls, workers=1):
+        """
+        Extract the information of many URLs concurrently, without downloading
+
+        The URLs are taken from the iterable only as workers become free, so it
+        may be arbitrarily long. Yields a result for each URL as it finishes, with
+        its 1-based "index", the sanitized "info" (or None), the "elapsed" seconds
+        and the classified "errors" that were reported.
+        Each worker thread extracts with its own copy of this instance (see _batch_worker)
+        """
+        local = threading.local()
+
+        def extract(index, url):
+            if not hasattr(local, 'ydl'):
+                local.ydl = self._batch_worker()
+            return local.ydl.__extract_batch_item(index, url)
+
+        def results(futures):
+            for future in futures:
+                result = future.result()
+                if result['status'] == 'error':
+                    self._download_retcode = 1
+                yield result
+
+        with concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix='batch') as executor:
+            running = set()
+            for index, url in enumerate(urls, 1):
+                running.add(executor.submit(extract, index, url))
+                if len(running) >= workers:
+                    done, running = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                    yield from results(done)
+            yield from results(concurrent.futures.as_completed(running))
+
+    def _batch_worker(self):
+        """
+        Shallow copy of this instance for a worker thread of extract_batch
+
+        The options, output, hooks, cookies and request handlers are shared.
+        The extractor instances and the playlist and error state are not,
+        since they are not safe to use from several threads
+        """
+        # Create these once, instead of in every worker
+        for name in ('cookiejar', '_request_director'):
+            getattr(self, name)
+        worker = copy.copy(self)
+        worker._local = threading.local()
+        worker._download_retcode = 0
+        worker._playlist_level = 0
+        worker._playlist_urls = set()
+        worker._prefetched_extractions = {}
+        worker._ies = dict(self._ies)
+        worker._ies_instances = {}
+        for ie in self._ies_instances.values():
+            worker.add_info_extractor(type(ie)())
+        return worker
+
+    def __extract_batch_item(self, index, url):
+        self._local.errors = errors = []
+        start = time.perf_counter()
+        try:
+            info = self.extract_info(url, download=False)
+        except DownloadCancelled:
+            raise
+        except Exception as e:
+            info = None
+            if not errors:  # Not reported by trouble() before it was raised
+                errors.append((str(e), e))
+        finally:
+            self._local.errors = None
+
+        return {
+            'index': index,
+            'url': url,
+            'status': 'error' if info is None else 'ok',
+            'elapsed': round(time.perf_counter() - start, 3),
+            'info': info and self.sanitize_info(info),
+            'errors': [{
+                'type': self._classify_error(error),
+                'message': str(error) if error else remove_terminal_sequences(message or '').removeprefix('ERROR: '),
+            } for message, error in errors],
+        }
+
+    @staticmethod
+    def _classify_error(error):
+        if isinstance(error, DownloadError) and error.exc_info and error.exc_info[1]:
+            error = error.exc_info[1]
+        if isinstance(error, ExtractorError) and isinstance(error.cause, network_exceptions):
+            error = error.cause
+        if error is None:
+            return 'unknown'
+        elif isinstance(error, UnsupportedError):
+            return 'unsupported'
+        elif isinstance(error, GeoRestrictedError):
+            return 'geo_restricted'
+        elif isinstance(error, network_exceptions):
+            return 'network'
+        elif isinstance(error, ExtractorError):
+            return 'unavailable' if error.expected else 'extractor'
+        return 'internal'
+
     def download_with_info_file(self, info_filename):
         with contextlib.closing(fileinput.FileInput(
                 [info_filename], mode='r',
@@ -3708,6 +4039,10 @@ def sanitize_info(info_dict, remove_private_keys=False):
             'repository': ORIGIN,
         })
 
+        return YoutubeDL._sanitize_value(info_dict, remove_private_keys)
+
+    @staticmethod
+    def _sanitize_value(obj, remove_private_keys=False):
         if remove_private_keys:
             reject = lambda k, v: v is None or k.startswith('__') or k in {
                 'requested_downloads', 'requested_formats', 'requested_subtitles', 'requested_entries',
@@ -3720,7 +4055,7 @@ def sanitize_info(info_dict, remove_private_keys=False):
         def filter_fn(obj):
             if isinstance(obj, dict):
                 return {k: filter_fn(v) for k, v in obj.items() if not reject(k, v)}
-            elif isinstance(obj, (list, tuple, set, LazyList)):
+            elif isinstance(obj, (list, tuple, set, LazyList, SpooledList)):
                 return list(map(filter_fn, obj))
             elif isinstance(obj, ImpersonateTarget):
                 return str(obj)
@@ -3729,7 +4064,37 @@ def filter_fn(obj):
             else:
                 return repr(obj)
 
-        return filter_fn(info_dict)
+        return filter_fn(obj)
+
+    def _iter_json(self, info_dict, remove_private_keys=False, ensure_ascii=True):
+        """
+        Encode the sanitized infodict as JSON, in pieces
+
+        The output is the same as that of json.dumps(sanitize_info(...)), but spooled
+        playlist entries are decoded and encoded again one at a time, instead of
+        being loaded into memory together
+        """
+        entries = info_dict.get('entries')
+        if not isinstance(entries, SpooledList):
+            yield json.dumps(self.sanitize_info(info_dict, remove_private_keys), ensure_ascii=ensure_ascii)
+            return
+
+        marker = '\0' + ''.join(random.choices(string.ascii_letters, k=32))
+        info_dict['entries'] = marker
+        try:
+            envelope = json.dumps(self.sanitize_info(info_dict, remove_private_keys), ensure_ascii=ensure_ascii)
+        finally:
+            info_dict['entries'] = entries
+        prefix, found, suffix = envelope.partition(json.dumps(marker, ensure_ascii=ensure_ascii))
+        if not found:  # The entries were removed
+            yield envelope
+            return
+
+        yield prefix + '['
+        for i, entry in enumerate(entries.iter_json()):
+            yield (', ' if i else '') + json.dumps(
+                self._sanitize_value(json.loads(entry), remove_private_keys), ensure_ascii=ensure_ascii)
+        yield ']' + suffix
 
     @staticmethod
     def filter_requested_info(info_dict, actually_filter=True):
@@ -3751,6 +4116,8 @@ def _delete_downloaded_files(self, *files_to_delete, info={}, msg=None):
     def post_extract(info_dict):
         def actual_post_extract(info_dict):
             if info_dict.get('_type') in ('playlist', 'multi_video'):
+                if isinstance(info_dict.get('entries'), SpooledList):
+                    return  # Spooled entries are already post-processed
                 for video_dict in info_dict.get('entries', {}):
                     actual_post_extract(video_dict or {})
                 return
@@ -3822,11 +4189,8 @@ def _make_archive_id(self, info_dict):
             if not url:
                 return
             # Try to find matching extractor for the URL and take its ie_key
-            for ie_key, ie in self._ies.items():
-                if ie.suitable(url):
-                    extractor = ie_key
-                    break
-            else:
+            extractor = self._suitable_ie_key(url)
+            if extractor is None:
                 return
         return make_archive_id(extractor, video_id)
 
@@ -3846,7 +4210,7 @@ def record_download_archive(self, info_dict):
         assert vid_id
 
         self.write_debug(f'Adding to archive: {vid_id}')
-        if is_path_like(fn):
+        if is_path_like(fn) and not isinstance(self.archive, SQLiteArchive):
             with locked_file(fn, 'a', encoding='utf-8') as archive_file:
                 archive_file.write(vid_id + '\n')
         self.archive.add(vid_id)
@@ -4316,8 +4680,10 @@ def build_request_director(self, handlers, preferences=None):
                 proxies=proxies,
                 prefer_system_certs='no-certifi' in self.params['compat_opts'],
                 verify=not self.params.get('nocheckcertificate'),
+                dns_cache=self._dns_cache,
                 **traverse_obj(self.params, {
                     'verbose': 'debug_printtraffic',
+                    'happy_eyeballs': 'happy_eyeballs',
                     'source_address': 'source_address',
                     'timeout': 'socket_timeout',
                     'legacy_ssl_support': 'legacyserverconnect',
@@ -4335,10 +4701,38 @@ def build_request_director(self, handlers, preferences=None):
             director.preferences.add(lambda rh, _: 500 if rh.RH_KEY == 'Urllib' else 0)
         return director
 
+    @functools.cached_property
+    def _dns_cache(self):
+        """DNSCache shared by the request handlers of all request directors"""
+        ttl = self.params.get('dns_cache_ttl')
+        if ttl is None:
+            return DNSCache()
+        return DNSCache(ttl) if ttl > 0 else None
+
     @functools.cached_property
     def _request_director(self):
         return self.build_request_director(_REQUEST_HANDLERS.values(), _RH_PREFERENCES)
 
+    def get_connection_stats(self):
+        """
+        Statistics of the connections used so far, as {'host:port': {field: value}}
+
+        See yt_dlp.networking._helper.ConnectionStats for the fields
+        """
+        if '_request_director' not in self.__dict__:
+            return {}
+        return self._request_director.get_connection_stats()
+
+    def _report_connection_stats(self):
+        for host, stats in self.get_connection_stats().items():
+            new = stats['new_connections']
+            average = lambda field, count: f'{stats[field] / count * 1000:.0f}ms' if count else '-'
+            self.write_debug(
+                f'Connections to {host}: {stats["requests"]} requests, {new} new, '
+                f'{stats["reused_connections"]} reused; average DNS {average("dns_time", new)}, '
+                f'connect {average("connect_time", new)}, TLS {average("tls_time", new)}, '
+                f'first byte {average("ttfb", stats["requests"])}')
+
     def encode(self, s):
         if isinstance(s, bytes):
             return s  # Already encoded
@@ -4372,7 +4766,8 @@ def _write_info_json(self, label, ie_result, infofn, overwrite=None):
 
         self.to_screen(f'[info] Writing {label} metadata as JSON to: {infofn}')
         try:
-            write_json_file(self.sanitize_info(ie_result, self.params.get('clean_infojson', True)), infofn)
+            write_json_file(None, infofn, chunks=self._iter_json(
+                ie_result, self.params.get('clean_infojson', True), ensure_ascii=False))
             return True
         except OSError:
             self.report_error(f'Cannot write {label} metadata to JSON file {infofn}')
@@ -9,6 +9,7 @@
 import collections
 import getpass
 import itertools
+import json
 import optparse
 import os
 import re
@@ -79,24 +80,31 @@ def _exit(status=0, *args):
     raise SystemExit(status)
 
 
-def get_urls(urls, batchfile, verbose):
+def get_urls(urls, batchfile, verbose, lazy=False):
     """
     @param verbose      -1: quiet, 0: normal, 1: verbose
+    @param lazy         Return an iterator that reads the batch file as the URLs are needed,
+                        or an empty list if there are no URLs
     """
     batch_urls = []
     if batchfile is not None:
         try:
             batch_urls = read_batch_urls(
                 read_stdin(None if verbose == -1 else 'URLs') if batchfile == '-'
-                else open(expand_path(batchfile), encoding='utf-8', errors='ignore'))
-            if verbose == 1:
+                else open(expand_path(batchfile), encoding='utf-8', errors='ignore'), lazy=lazy)
+            if verbose == 1 and not lazy:
                 write_string('[debug] Batch file urls: ' + repr(batch_urls) + '\n')
         except OSError:
             _exit(f'ERROR: batch file {batchfile} could not be read')
     _enc = preferredencoding()
-    return [
+    urls = (
         url.strip().decode(_enc, 'ignore') if isinstance(url, bytes) else url.strip()
-        for url in batch_urls + urls]
+        for url in itertools.chain(batch_urls, urls))
+    if not lazy:
+        return list(urls)
+    # Peek, so that an empty iterator is falsy
+    first = next(urls, None)
+    return [] if first is None else itertools.chain((first,), urls)
 
 
 def print_extractor_information(opts, urls):
@@ -217,6 +225,10 @@ def validate_minmax(min_val, max_val, min_name, max_name=None):
     validate_positive('autonumber start', opts.autonumber_start)
     validate_positive('autonumber size', opts.autonumber_size, True)
     validate_positive('concurrent fragments', opts.concurrent_fragment_downloads, True)
+    validate_positive('http connections', opts.http_connections, True)
+    validate_positive('concurrent extractions', opts.concurrent_extractions, True)
+    validate_positive('prefetch playlist pages', opts.prefetch_playlist_pages)
+    validate_positive('ndjson workers', opts.ndjson_workers, True)
     validate_positive('playlist start', opts.playliststart, True)
     if opts.playlistend != -1:
         validate_minmax(opts.playliststart, opts.playlistend, 'playlist start', 'playlist end')
@@ -226,6 +238,7 @@ def validate_minmax(min_val, max_val, min_name, max_name=None):
     validate_positive('requests sleep interval', opts.sleep_interval_requests)
     validate_positive('sleep interval', opts.sleep_interval)
     validate_positive('max sleep interval', opts.max_sleep_interval)
+    validate_positive('DNS cache TTL', opts.dns_cache_ttl)
     if opts.sleep_interval is None:
         validate(
             opts.max_sleep_interval is None, 'min sleep interval',
@@ -320,6 +333,7 @@ def validate_bytes(name, value, strict_positive=False):
     opts.max_filesize = validate_bytes('max filesize', opts.max_filesize)
     opts.buffersize = validate_bytes('buffer size', opts.buffersize, True)
     opts.http_chunk_size = validate_bytes('http chunk size', opts.http_chunk_size)
+    opts.cache_max_size = validate_bytes('cache max size', opts.cache_max_size)
 
     # Output templates
     def validate_outtmpl(tmpl, msg):
@@ -741,7 +755,7 @@ def get_postprocessors(opts):
 def parse_options(argv=None):
     """@returns ParsedOptions(parser, opts, urls, ydl_opts)"""
     parser, opts, urls = parseOpts(argv)
-    urls = get_urls(urls, opts.batchfile, -1 if opts.quiet and not opts.verbose else opts.verbose)
+    urls = get_urls(urls, opts.batchfile, -1 if opts.quiet and not opts.verbose else opts.verbose, lazy=opts.ndjson)
 
     set_compat_opts(opts)
     try:
@@ -753,7 +767,7 @@ def parse_options(argv=None):
 
     print_only = bool(opts.forceprint) and all(k not in opts.forceprint for k in POSTPROCESS_WHEN[3:])
     any_getting = any(getattr(opts, k) for k in (
-        'dumpjson', 'dump_single_json', 'getdescription', 'getduration', 'getfilename',
+        'dumpjson', 'dump_single_json', 'ndjson', 'getdescription', 'getduration', 'getfilename',
         'getformat', 'getid', 'getthumbnail', 'gettitle', 'geturl',
     ))
     if opts.quiet is None:
@@ -845,10 +859,14 @@ def parse_options(argv=None):
         'retry_sleep_functions': opts.retry_sleep,
         'skip_unavailable_fragments': opts.skip_unavailable_fragments,
         'keep_fragments': opts.keep_fragments,
+        'in_memory_fragments': opts.in_memory_fragments,
         'concurrent_fragment_downloads': opts.concurrent_fragment_downloads,
+        'adaptive_fragment_concurrency': opts.adaptive_fragment_concurrency,
+        'async_fragments': opts.async_fragments,
         'buffersize': opts.buffersize,
         'noresizebuffer': opts.noresizebuffer,
         'http_chunk_size': opts.http_chunk_size,
+        'http_connections': opts.http_connections,
         'continuedl': opts.continue_dl,
         'noprogress': opts.quiet if opts.noprogress is None else opts.noprogress,
         'progress_with_newline': opts.progress_with_newline,
@@ -859,6 +877,9 @@ def parse_options(argv=None):
         'playlistreverse': opts.playlist_reverse,
         'playlistrandom': opts.playlist_random,
         'lazy_playlist': opts.lazy_playlist,
+        'concurrent_extractions': opts.concurrent_extractions,
+        'prefetch_playlist_pages': opts.prefetch_playlist_pages,
+        'spool_playlist_entries': opts.spool_playlist_entries,
         'noplaylist': opts.noplaylist,
         'logtostderr': opts.outtmpl.get('default') == '-',
         'consoletitle': opts.consoletitle,
@@ -898,6 +919,7 @@ def parse_options(argv=None):
         'max_views': opts.max_views,
         'daterange': opts.date,
         'cachedir': opts.cachedir,
+        'cache_max_size': opts.cache_max_size,
         'age_limit': opts.age_limit,
         'download_archive': opts.download_archive,
         'break_on_existing': opts.break_on_existing,
@@ -928,6 +950,8 @@ def parse_options(argv=None):
         'postprocessors': postprocessors,
         'fixup': opts.fixup,
         'source_address': opts.source_address,
+        'dns_cache_ttl': opts.dns_cache_ttl,
+        'happy_eyeballs': opts.happy_eyeballs,
         'impersonate': opts.impersonate,
         'sleep_interval_requests': opts.sleep_interval_requests,
         'sleep_interval': opts.sleep_interval,
@@ -1066,6 +1090,10 @@ def make_row(target, handler):
                 if all_urls:
                     ydl.report_warning('URLs are ignored due to --load-info-json')
                 return ydl.download_with_info_file(expand_path(opts.load_info_filename))
+            elif opts.ndjson:
+                for result in ydl.extract_batch(all_urls, opts.ndjson_workers):
+                    ydl.to_stdout(json.dumps(result))
+                return ydl._download_retcode
             else:
                 return ydl.download(all_urls)
         except DownloadCancelled:
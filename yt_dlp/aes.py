@@ -1,10 +1,22 @@
 import base64
+import struct
 from math import ceil
 
 from .compat import compat_ord
-from .dependencies import Cryptodome
+from .dependencies import Cryptodome, cryptography
 
+if not Cryptodome.AES and cryptography:
+    # Only imported when it will be used, since this loads the OpenSSL bindings
+    try:
+        from cryptography.exceptions import InvalidTag
+        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+    except (ImportError, OSError):
+        cryptography = None
+
+# The fastest available implementation is used for the *_bytes functions
 if Cryptodome.AES:
+    AES_BACKEND = 'pycryptodome'
+
     def aes_cbc_decrypt_bytes(data, key, iv):
         """ Decrypt bytes with AES-CBC using pycryptodome """
         return Cryptodome.AES.new(key, Cryptodome.AES.MODE_CBC, iv).decrypt(data)
@@ -13,10 +25,28 @@ def aes_gcm_decrypt_and_verify_bytes(data, key, tag, nonce):
         """ Decrypt bytes with AES-GCM using pycryptodome """
         return Cryptodome.AES.new(key, Cryptodome.AES.MODE_GCM, nonce).decrypt_and_verify(data, tag)
 
+elif cryptography:
+    AES_BACKEND = 'cryptography'
+
+    def aes_cbc_decrypt_bytes(data, key, iv):
+        """ Decrypt bytes with AES-CBC using cryptography """
+        decryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).decryptor()
+        return decryptor.update(data) + decryptor.finalize()
+
+    def aes_gcm_decrypt_and_verify_bytes(data, key, tag, nonce):
+        """ Decrypt bytes with AES-GCM using cryptography """
+        decryptor = Cipher(algorithms.AES(key), modes.GCM(nonce, tag)).decryptor()
+        try:
+            return decryptor.update(data) + decryptor.finalize()
+        except InvalidTag:
+            raise ValueError('Mismatching authentication tag')
+
 else:
+    AES_BACKEND = 'native'
+
     def aes_cbc_decrypt_bytes(data, key, iv):
         """ Decrypt bytes with AES-CBC using native implementation since pycryptodome is unavailable """
-        return bytes(aes_cbc_decrypt(*map(list, (data, key, iv))))
+        return _aes_cbc_decrypt_words(bytes(data), bytes(key), bytes(iv))
 
     def aes_gcm_decrypt_and_verify_bytes(data, key, tag, nonce):
         """ Decrypt bytes with AES-GCM using native implementation since pycryptodome is unavailable """
@@ -157,19 +187,68 @@ def aes_cbc_decrypt(data, key, iv):
     @param {int[]} iv          16-Byte IV
     @returns {int[]}           decrypted data
     """
-    expanded_key = key_expansion(key)
-    block_count = ceil(len(data) / BLOCK_SIZE_BYTES)
+    return list(_aes_cbc_decrypt_words(bytes(data), bytes(key), bytes(iv)))
 
-    decrypted_data = []
-    previous_cipher_block = iv
-    for i in range(block_count):
-        block = data[i * BLOCK_SIZE_BYTES: (i + 1) * BLOCK_SIZE_BYTES]
-        block += [0] * (BLOCK_SIZE_BYTES - len(block))
 
-        decrypted_block = aes_decrypt(block, expanded_key)
-        decrypted_data += xor(decrypted_block, previous_cipher_block)
-        previous_cipher_block = block
-    return decrypted_data[:len(data)]
+def _aes_cbc_decrypt_words(data, key, iv):
+    """
+    Decrypt with aes in CBC mode, processing whole blocks as 32-bit words
+    using the T-table formulation of the equivalent inverse cipher
+
+    @param {bytes} data        cipher
+    @param {bytes} key         16/24/32-Byte cipher key
+    @param {bytes} iv          16-Byte IV
+    @returns {bytes}           decrypted data
+    """
+    data_len = len(data)
+    if data_len % BLOCK_SIZE_BYTES:
+        data += bytes(BLOCK_SIZE_BYTES - data_len % BLOCK_SIZE_BYTES)
+
+    round_keys = _decryption_round_keys(key)
+    rounds = len(round_keys) - 1
+    first_key, middle_keys, last_key = round_keys[0], round_keys[1:rounds], round_keys[rounds]
+    td0, td1, td2, td3, sbox_inv = _TD0, _TD1, _TD2, _TD3, SBOX_INV
+
+    decrypted = []
+    p0, p1, p2, p3 = struct.unpack('>4I', iv)
+    for c0, c1, c2, c3 in struct.iter_unpack('>4I', data):
+        s0, s1, s2, s3 = c0 ^ first_key[0], c1 ^ first_key[1], c2 ^ first_key[2], c3 ^ first_key[3]
+        for k0, k1, k2, k3 in middle_keys:
+            s0, s1, s2, s3 = (
+                td0[s0 >> 24] ^ td1[(s3 >> 16) & 0xFF] ^ td2[(s2 >> 8) & 0xFF] ^ td3[s1 & 0xFF] ^ k0,
+                td0[s1 >> 24] ^ td1[(s0 >> 16) & 0xFF] ^ td2[(s3 >> 8) & 0xFF] ^ td3[s2 & 0xFF] ^ k1,
+                td0[s2 >> 24] ^ td1[(s1 >> 16) & 0xFF] ^ td2[(s0 >> 8) & 0xFF] ^ td3[s3 & 0xFF] ^ k2,
+                td0[s3 >> 24] ^ td1[(s2 >> 16) & 0xFF] ^ td2[(s1 >> 8) & 0xFF] ^ td3[s0 & 0xFF] ^ k3)
+        decrypted.extend((
+            ((sbox_inv[s0 >> 24] << 24) | (sbox_inv[(s3 >> 16) & 0xFF] << 16)
+             | (sbox_inv[(s2 >> 8) & 0xFF] << 8) | sbox_inv[s1 & 0xFF]) ^ last_key[0] ^ p0,
+            ((sbox_inv[s1 >> 24] << 24) | (sbox_inv[(s0 >> 16) & 0xFF] << 16)
+             | (sbox_inv[(s3 >> 8) & 0xFF] << 8) | sbox_inv[s2 & 0xFF]) ^ last_key[1] ^ p1,
+            ((sbox_inv[s2 >> 24] << 24) | (sbox_inv[(s1 >> 16) & 0xFF] << 16)
+             | (sbox_inv[(s0 >> 8) & 0xFF] << 8) | sbox_inv[s3 & 0xFF]) ^ last_key[2] ^ p2,
+            ((sbox_inv[s3 >> 24] << 24) | (sbox_inv[(s2 >> 16) & 0xFF] << 16)
+             | (sbox_inv[(s1 >> 8) & 0xFF] << 8) | sbox_inv[s0 & 0xFF]) ^ last_key[3] ^ p3,
+        ))
+        p0, p1, p2, p3 = c0, c1, c2, c3
+
+    return struct.pack(f'>{len(decrypted)}I', *decrypted)[:data_len]
+
+
+def _decryption_round_keys(key):
+    """
+    Generate the round keys of the equivalent inverse cipher
+
+    @param {bytes} key   16/24/32-Byte cipher key
+    @returns {tuple}     round keys as 4-tuples of 32-bit words, in decryption order
+    """
+    words = struct.unpack(f'>{(len(key) // 4 + 7) * 4}I', bytes(key_expansion(list(key))))
+    round_keys = [words[i:i + 4] for i in range(0, len(words), 4)][::-1]
+    # InvMixColumns is applied to all but the first and last round keys; SBOX cancels the SBOX_INV in the tables
+    for i in range(1, len(round_keys) - 1):
+        round_keys[i] = tuple(
+            _TD0[SBOX[w >> 24]] ^ _TD1[SBOX[(w >> 16) & 0xFF]] ^ _TD2[SBOX[(w >> 8) & 0xFF]] ^ _TD3[SBOX[w & 0xFF]]
+            for w in round_keys[i])
+    return tuple(round_keys)
 
 
 def aes_cbc_encrypt(data, key, iv, *, padding_mode='pkcs7'):
@@ -387,6 +466,21 @@ def aes_decrypt_text(data, password, key_size_bytes):
                       0x67, 0x4a, 0xed, 0xde, 0xc5, 0x31, 0xfe, 0x18, 0x0d, 0x63, 0x8c, 0x80, 0xc0, 0xf7, 0x70, 0x07)
 
 
+def _gf_multiply(a, b):
+    return 0 if a == 0 or b == 0 else RIJNDAEL_EXP_TABLE[(RIJNDAEL_LOG_TABLE[a] + RIJNDAEL_LOG_TABLE[b]) % 0xFF]
+
+
+def _make_decryption_tables():
+    td0 = tuple(
+        (_gf_multiply(s, 0xE) << 24) | (_gf_multiply(s, 0x9) << 16) | (_gf_multiply(s, 0xD) << 8) | _gf_multiply(s, 0xB)
+        for s in SBOX_INV)
+    rotate_right = lambda table, n: tuple(((w >> n) | (w << (32 - n))) & 0xFFFFFFFF for w in table)
+    return td0, rotate_right(td0, 8), rotate_right(td0, 16), rotate_right(td0, 24)
+
+
+_TD0, _TD1, _TD2, _TD3 = _make_decryption_tables()
+
+
 def key_expansion(data):
     """
     Generate key schedule
@@ -0,0 +1,109 @@
+import contextlib
+import os
+import threading
+
+from .dependencies import sqlite3
+from .utils import locked_file
+
+SQLITE_EXTENSIONS = ('.sqlite', '.sqlite3', '.db')
+SQLITE_HEADER = b'SQLite format 3\x00'
+
+
+def is_sqlite_archive(fn):
+    """
+    Existing archives are detected by their content, so that text archives
+    with a SQLite extension keep working. New (or empty) archives use SQLite
+    if the file name has one of SQLITE_EXTENSIONS
+    """
+    fn = os.fspath(fn)
+    try:
+        with open(fn, 'rb') as f:
+            header = f.read(len(SQLITE_HEADER))
+    except OSError:
+        header = b''
+    if header:
+        return header == SQLITE_HEADER
+    return fn.lower().endswith(SQLITE_EXTENSIONS)
+
+
+class SQLiteArchive:
+    """
+    Download archive stored in an indexed SQLite database
+
+    Lookups use the primary key index instead of loading all IDs into memory,
+    and writes are committed immediately, so that several processes can share
+    the same archive. When the database is created, the IDs of the text
+    archive with the same name minus the extension (if any) are imported
+    """
+
+    _BATCH_SIZE = 10000
+
+    def __init__(self, fn, write_debug=None):
+        if not sqlite3:
+            raise ImportError('SQLite download archives require Python to be compiled with sqlite3 support')
+        self.filename = os.fspath(fn)
+        self._write_debug = write_debug or (lambda _: None)
+        self._lock = threading.Lock()
+
+        is_new = not os.path.exists(self.filename)
+        self._conn = sqlite3.connect(self.filename, timeout=30, isolation_level=None, check_same_thread=False)
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS archive (id TEXT PRIMARY KEY NOT NULL) WITHOUT ROWID')
+
+        text_fn = os.path.splitext(self.filename)[0]
+        if is_new and text_fn != self.filename and os.path.isfile(text_fn):
+            self.import_text(text_fn)
+
+    def import_text(self, fn):
+        """Import the IDs of a text download archive. Returns the number of lines read"""
+        self._write_debug(f'Importing archive file {fn!r} into {self.filename!r}')
+        count = 0
+        with locked_file(fn, 'r', encoding='utf-8') as archive_file:
+            batch = []
+            for line in archive_file:
+                line = line.strip()
+                if line:
+                    batch.append((line,))
+                if len(batch) >= self._BATCH_SIZE:
+                    count += self._insert_many(batch)
+                    batch = []
+            count += self._insert_many(batch)
+        return count
+
+    def _insert_many(self, rows):
+        if not rows:
+            return 0
+        with self._lock, self._transaction():
+            self._conn.executemany('INSERT OR IGNORE INTO archive (id) VALUES (?)', rows)
+        return len(rows)
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        self._conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            self._conn.execute('ROLLBACK')
+            raise
+        self._conn.execute('COMMIT')
+
+    def __contains__(self, vid_id):
+        with self._lock:
+            return self._conn.execute('SELECT 1 FROM archive WHERE id = ?', (vid_id,)).fetchone() is not None
+
+    def __bool__(self):
+        with self._lock:
+            return self._conn.execute('SELECT 1 FROM archive LIMIT 1').fetchone() is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM archive').fetchone()[0]
+
+    def add(self, vid_id):
+        with self._lock:
+            self._conn.execute('INSERT OR IGNORE INTO archive (id) VALUES (?)', (vid_id,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
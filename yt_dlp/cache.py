@@ -1,18 +1,42 @@
+import collections
 import contextlib
+import copy
 import json
 import os
 import re
 import shutil
+import threading
+import time
 import traceback
 import urllib.parse
 
-from .utils import expand_path, traverse_obj, version_tuple, write_json_file
+from .utils import expand_path, float_or_none, traverse_obj, version_tuple, write_json_file
 from .version import __version__
 
 
 class Cache:
+    """
+    Filesystem cache of JSON data, stored in one file per key
+
+    Loaded entries are kept in memory for as long as their file is unchanged.
+    Writes are atomic, so the cache directory can be shared between processes.
+    If the "cache_max_size" param is set, the least recently used files are
+    deleted when the total size of the cache exceeds it
+    """
+
+    _MEMORY_ENTRIES = 256
+    # The total size is tracked from the stores of this instance, and only
+    # recomputed from the files every this many stores, or when it exceeds
+    # cache_max_size, since other processes may be writing to the cache too
+    _SIZE_SCAN_INTERVAL = 100
+
     def __init__(self, ydl):
         self._ydl = ydl
+        self._lock = threading.Lock()
+        self._memory = collections.OrderedDict()
+        self.stats = {'hits': 0, 'memory_hits': 0, 'misses': 0}
+        self._size = None
+        self._stores_since_scan = 0
 
     def _get_root_dir(self):
         res = self._ydl.params.get('cachedir')
@@ -30,20 +54,35 @@ def _get_cache_fn(self, section, key, dtype):
     def enabled(self):
         return self._ydl.params.get('cachedir') is not False
 
-    def store(self, section, key, data, dtype='json'):
+    def store(self, section, key, data, dtype='json', *, ttl=None):
+        """@param ttl  Number of seconds after which the entry expires"""
         assert dtype in ('json',)
 
         if not self.enabled:
             return
 
         fn = self._get_cache_fn(section, key, dtype)
+        cache_data = {'yt-dlp_version': __version__, 'data': data}
+        if ttl is not None:
+            cache_data['expires'] = time.time() + ttl
+        old_size = self._file_size(fn)
         try:
             os.makedirs(os.path.dirname(fn), exist_ok=True)
             self._ydl.write_debug(f'Saving {section}.{key} to cache')
-            write_json_file({'yt-dlp_version': __version__, 'data': data}, fn)
+            write_json_file(cache_data, fn)
         except Exception:
             tb = traceback.format_exc()
             self._ydl.report_warning(f'Writing cache to {fn!r} failed: {tb}')
+        with self._lock:
+            self._memory.pop(fn, None)
+        self._enforce_max_size(self._file_size(fn) - old_size)
+
+    @staticmethod
+    def _file_size(fn):
+        try:
+            return os.path.getsize(fn)
+        except OSError:
+            return 0
 
     def _validate(self, data, min_ver):
         version = traverse_obj(data, 'yt-dlp_version')
@@ -53,6 +92,30 @@ def _validate(self, data, min_ver):
             return data['data']
         self._ydl.write_debug(f'Discarding old cache from version {version} (needs {min_ver})')
 
+    def _read(self, cache_fn):
+        """Return the parsed contents of the file, from memory if it has not changed since it was read"""
+        stat = os.stat(cache_fn)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if self._ydl.params.get('cache_max_size') is not None:
+            # The access time orders the files for eviction; the modification time is kept
+            with contextlib.suppress(OSError):
+                os.utime(cache_fn, ns=(time.time_ns(), stat.st_mtime_ns))
+
+        with self._lock:
+            cached = self._memory.get(cache_fn)
+            if cached and cached[0] == signature:
+                self._memory.move_to_end(cache_fn)
+                self.stats['memory_hits'] += 1
+                return cached[1]
+
+        with open(cache_fn, encoding='utf-8') as cachef:
+            data = json.load(cachef)
+        with self._lock:
+            self._memory[cache_fn] = (signature, data)
+            if len(self._memory) > self._MEMORY_ENTRIES:
+                self._memory.popitem(last=False)
+        return data
+
     def load(self, section, key, dtype='json', default=None, *, min_ver=None):
         assert dtype in ('json',)
 
@@ -62,9 +125,16 @@ def load(self, section, key, dtype='json', default=None, *, min_ver=None):
         cache_fn = self._get_cache_fn(section, key, dtype)
         with contextlib.suppress(OSError):
             try:
-                with open(cache_fn, encoding='utf-8') as cachef:
-                    self._ydl.write_debug(f'Loading {section}.{key} from cache')
-                    return self._validate(json.load(cachef), min_ver)
+                data = self._read(cache_fn)
+                self._ydl.write_debug(f'Loading {section}.{key} from cache')
+                if traverse_obj(data, ('expires', {float_or_none}), default=float('inf')) < time.time():
+                    self._ydl.write_debug(f'Discarding expired cache {section}.{key}')
+                    os.remove(cache_fn)
+                else:
+                    data = self._validate(data, min_ver)
+                    self._count('hits' if data is not None else 'misses')
+                    # The cached object must not be modified by the caller
+                    return copy.deepcopy(data)
             except (ValueError, KeyError):
                 try:
                     file_size = os.path.getsize(cache_fn)
@@ -72,8 +142,55 @@ def load(self, section, key, dtype='json', default=None, *, min_ver=None):
                     file_size = str(oe)
                 self._ydl.report_warning(f'Cache retrieval from {cache_fn} failed ({file_size})')
 
+        self._count('misses')
         return default
 
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _enforce_max_size(self, size_change):
+        max_size = self._ydl.params.get('cache_max_size')
+        if max_size is None:
+            return
+
+        with self._lock:
+            self._stores_since_scan += 1
+            if self._size is not None and self._stores_since_scan < self._SIZE_SCAN_INTERVAL:
+                self._size += size_change
+                if self._size <= max_size:
+                    return
+            self._stores_since_scan = 0
+
+        files, total_size = [], 0
+        for root, _, filenames in os.walk(self._get_root_dir()):
+            for filename in filenames:
+                if filename.endswith('.tmp'):  # Being written by write_json_file
+                    continue
+                fn = os.path.join(root, filename)
+                with contextlib.suppress(OSError):
+                    stat = os.stat(fn)
+                    files.append((stat.st_atime_ns, stat.st_size, fn))
+                    total_size += stat.st_size
+        if total_size > max_size:
+            total_size = self._evict(files, total_size, max_size)
+        with self._lock:
+            self._size = total_size
+
+    def _evict(self, files, total_size, max_size):
+        """Remove the least recently used files until the total size is at most max_size"""
+        # Other processes may be removing the same files
+        for _, size, fn in sorted(files):
+            with contextlib.suppress(OSError):
+                os.remove(fn)
+                self._ydl.write_debug(f'Removed {fn!r} from cache to keep it under {max_size} bytes')
+            total_size -= size
+            with self._lock:
+                self._memory.pop(fn, None)
+            if total_size <= max_size:
+                break
+        return total_size
+
     def remove(self):
         if not self.enabled:
             self._ydl.to_screen('Cache is disabled (Did you combine --no-cache-dir and --rm-cache-dir?)')
@@ -88,4 +205,7 @@ def remove(self):
         if os.path.exists(cachedir):
             self._ydl.to_screen('.', skip_eol=True)
             shutil.rmtree(cachedir)
+        with self._lock:
+            self._memory.clear()
+            self._size = None
         self._ydl.to_screen('.')
@@ -79,8 +79,19 @@
 except ImportError:
     curl_cffi = None
 
+try:
+    import h2
+except ImportError:
+    h2 = None
+
 from . import Cryptodome
 
+try:
+    # The cipher bindings are only imported by aes.py when they are used
+    import cryptography
+except ImportError:
+    cryptography = None
+
 try:
     import yt_dlp_ejs
 except ImportError:
@@ -0,0 +1,311 @@
+import asyncio
+import collections
+import io
+import re
+import ssl
+import urllib.parse
+import zlib
+
+from ..networking import Response
+from ..networking._helper import make_ssl_context
+from ..networking.exceptions import (
+    CertificateVerifyError,
+    HTTPError,
+    IncompleteRead,
+    SSLError,
+    TransportError,
+)
+from ..utils import extract_basic_auth, sanitize_url
+from ..utils.networking import HTTPHeaderDict, clean_headers, normalize_url, select_proxy
+
+# Same as in http.client
+_is_legal_header_name = re.compile(rb'[^:\s][^:\r\n]*').fullmatch
+_is_illegal_header_value = re.compile(rb'\n(?![ \t])|\r(?![ \t\n])').search
+
+
+def async_unsupported_reason(ydl, params, info_dict, url):
+    """Return why AsyncHTTPClient can not be used for the download, or None if it can"""
+    if urllib.parse.urlparse(url).scheme not in ('http', 'https'):
+        return 'unsupported url scheme'
+    if select_proxy(url, ydl.proxies):
+        return 'proxies are not supported'
+    if params.get('impersonate'):
+        return 'impersonation is not supported'
+    if info_dict.get('request_data') is not None:
+        return 'request data is not supported'
+    if info_dict.get('is_live'):
+        return 'live streams are not supported'
+    if params.get('keep_fragments'):
+        return 'fragments are not written to disk'
+    if params.get('ratelimit') or params.get('throttledratelimit'):
+        return 'rate limits are not supported'
+    return None
+
+
+class _Connection:
+    def __init__(self, reader, writer):
+        self.reader, self.writer = reader, writer
+
+    def close(self):
+        self.writer.close()
+
+
+class AsyncHTTPClient:
+    """
+    Minimal HTTP/1.1 client on asyncio streams, for downloading many fragments on one event loop
+
+    Idle connections are kept alive and reused per host. The request headers, cookies
+    and SSL settings are the same as those of the request handlers of the YoutubeDL instance.
+    Cookies set by the responses are not stored.
+    The timeout applies to each read and write, not to the whole request
+    """
+
+    MAX_REDIRECTS = 10
+    MAX_HEADER_LINES = 100
+    READ_SIZE = 2 ** 16
+    MAX_IDLE_CONNECTIONS = 32
+
+    def __init__(self, ydl):
+        self.ydl = ydl
+        self.timeout = float(ydl.params.get('socket_timeout') or 20)
+        self._headers = HTTPHeaderDict(ydl.params.get('http_headers'))
+        clean_headers(self._headers)
+        self._ssl_context = None
+        self._idle = collections.defaultdict(list)
+
+    def _get_ssl_context(self):
+        if self._ssl_context is None:
+            params = self.ydl.params
+            self._ssl_context = make_ssl_context(
+                verify=not params.get('nocheckcertificate'),
+                client_certificate=params.get('client_certificate'),
+                client_certificate_key=params.get('client_certificate_key'),
+                client_certificate_password=params.get('client_certificate_password'),
+                legacy_support=params.get('legacyserverconnect'),
+                use_certifi='no-certifi' not in params.get('compat_opts', []))
+        return self._ssl_context
+
+    async def _connect(self, scheme, host, port):
+        source_address = self.ydl.params.get('source_address')
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(
+                host, port, ssl=self._get_ssl_context() if scheme == 'https' else None,
+                local_addr=(source_address, 0) if source_address else None,
+                happy_eyeballs_delay=0.25 if self.ydl.params.get('happy_eyeballs') else None,
+                limit=2 ** 20), self.timeout)
+        except ssl.SSLCertVerificationError as e:
+            raise CertificateVerifyError(cause=e) from e
+        except ssl.SSLError as e:
+            raise SSLError(cause=e) from e
+        except (OSError, asyncio.TimeoutError) as e:
+            raise TransportError(cause=e) from e
+        return _Connection(reader, writer)
+
+    def _release(self, key, connection):
+        idle = self._idle[key]
+        if len(idle) < self.MAX_IDLE_CONNECTIONS:
+            idle.append(connection)
+        else:
+            connection.close()
+
+    async def fetch(self, url, headers=None):
+        """
+        GET the url, following redirects
+        @returns (response headers, body)
+        @raises  HTTPError, TransportError
+        """
+        url, basic_auth_header = extract_basic_auth(url)
+        headers = HTTPHeaderDict(self._headers, headers)
+        clean_headers(headers)
+        if basic_auth_header:
+            headers['Authorization'] = basic_auth_header
+        url = sanitize_url(url)
+
+        for _ in range(self.MAX_REDIRECTS + 1):
+            status, reason, response_headers, body = await self._request(url, headers)
+            location = response_headers.get('Location')
+            if status in (301, 302, 303, 307, 308) and location:
+                new_url = urllib.parse.urljoin(url, location)
+                # Like requests, do not leak credentials to another origin
+                if self._origin(new_url) != self._origin(url):
+                    for name in ('Authorization', 'Cookie'):
+                        headers.pop(name, None)
+                url = new_url
+                continue
+            if status >= 400:
+                raise HTTPError(Response(io.BytesIO(body), url, response_headers, status, reason))
+            return response_headers, body
+        raise HTTPError(Response(io.BytesIO(body), url, response_headers, status, reason), redirect_loop=True)
+
+    @staticmethod
+    def _origin(url):
+        parsed = urllib.parse.urlparse(url)
+        return parsed.scheme, parsed.hostname, parsed.port or (443 if parsed.scheme == 'https' else 80)
+
+    @staticmethod
+    def _build_request(path, headers):
+        try:
+            lines = [f'GET {path} HTTP/1.1'.encode('ascii')]
+            for name, value in headers.items():
+                name, value = name.encode('ascii'), str(value).encode('latin-1')
+                if not _is_legal_header_name(name):
+                    raise ValueError(f'Invalid header name {name!r}')
+                if _is_illegal_header_value(value):
+                    raise ValueError(f'Invalid header value {value!r}')
+                lines.append(b'%s: %s' % (name, value))
+        except ValueError as e:  # includes UnicodeEncodeError
+            raise TransportError(f'Unable to build request: {e}', cause=e) from e
+        return b'\r\n'.join([*lines, b'', b''])
+
+    async def _request(self, url, headers):
+        try:
+            url = normalize_url(url)
+            scheme, host, port = self._origin(url)
+        except ValueError as e:  # includes UnicodeError
+            raise TransportError(f'Invalid url: {e}', cause=e) from e
+        # Redirects may lead to a url that AsyncHTTPClient can not request
+        if scheme not in ('http', 'https'):
+            raise TransportError(f'Unsupported url scheme {scheme!r}')
+        if select_proxy(url, self.ydl.proxies):
+            raise TransportError(f'{url} can only be requested through a proxy')
+        parsed = urllib.parse.urlparse(url)
+        headers = HTTPHeaderDict(headers)
+        cookie_header = self.ydl.cookiejar.get_cookie_header(url)
+        if cookie_header:
+            headers['Cookie'] = cookie_header
+        headers.setdefault('Accept-Encoding', 'gzip, deflate')
+        headers['Host'] = parsed.netloc.rpartition('@')[2]
+        headers['Connection'] = 'keep-alive'
+        path = parsed.path or '/'
+        if parsed.query:
+            path = f'{path}?{parsed.query}'
+        if not host or re.search(r'\s', path):
+            raise TransportError(f'Invalid url {url!r}')
+        data = self._build_request(path, headers)
+
+        key = (scheme, host, port)
+        # An idle connection may have been closed by the server; only then is the request resent
+        while self._idle[key]:
+            connection = self._idle[key].pop()
+            try:
+                return await self._exchange(key, connection, data)
+            except _StaleConnection:
+                continue
+        return await self._exchange(key, await self._connect(scheme, host, port), data, reused=False)
+
+    async def _exchange(self, key, connection, data, reused=True):
+        try:
+            response = await self._send_and_receive(connection, data, reused)
+        except BaseException as e:
+            connection.close()
+            if isinstance(e, asyncio.TimeoutError):
+                raise TransportError('Read timed out', cause=e) from e
+            if isinstance(e, (ssl.SSLError, OSError)):
+                raise TransportError(cause=e) from e
+            raise
+        status, reason, headers, body, keep_alive = response
+        if keep_alive:
+            self._release(key, connection)
+        else:
+            connection.close()
+        return status, reason, headers, body
+
+    async def _send_and_receive(self, connection, data, reused):
+        reader, writer = connection.reader, connection.writer
+        # Time out on inactivity rather than on the duration of the whole response
+        timed = lambda awaitable: asyncio.wait_for(awaitable, self.timeout)
+        try:
+            writer.write(data)
+            await timed(writer.drain())
+            status_line = await timed(reader.readline())
+        except (ConnectionError, asyncio.IncompleteReadError):
+            if reused:
+                raise _StaleConnection
+            raise
+        if not status_line:
+            if reused:
+                raise _StaleConnection
+            raise TransportError('Remote end closed connection without response')
+
+        version, _, rest = status_line.decode('latin-1').rstrip('\r\n').partition(' ')
+        status, _, reason = rest.partition(' ')
+        if not version.startswith('HTTP/') or not status.isdigit():
+            raise TransportError(f'Invalid status line {status_line!r}')
+        status = int(status)
+
+        headers = HTTPHeaderDict()
+        for _ in range(self.MAX_HEADER_LINES):
+            line = await timed(reader.readline())
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip()] = value.strip()
+        else:
+            raise TransportError('Too many headers')
+
+        keep_alive = version != 'HTTP/1.0' and headers.get('Connection', '').lower() != 'close'
+        if status in (204, 304) or 100 <= status < 200:
+            body = b''
+        elif headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            body = await self._read_chunked(reader, timed)
+        elif headers.get('Content-Length', '').isdigit():
+            body = await self._read_into(reader, timed, bytearray(), int(headers['Content-Length']))
+        else:
+            body = await self._read_into(reader, timed, bytearray())
+            keep_alive = False
+        return status, reason, headers, self._decode(body, headers), keep_alive
+
+    async def _read_into(self, reader, timed, buffer, size=None):
+        """Read size bytes, or until EOF if size is None, into buffer"""
+        end = None if size is None else len(buffer) + size
+        while end is None or len(buffer) < end:
+            data = await timed(reader.read(self.READ_SIZE if end is None else min(end - len(buffer), self.READ_SIZE)))
+            if not data:
+                if end is not None:
+                    raise IncompleteRead(len(buffer), end - len(buffer))
+                break
+            buffer += data
+        return bytes(buffer)
+
+    async def _read_chunked(self, reader, timed):
+        body = bytearray()
+        try:
+            while True:
+                size = int((await timed(reader.readline())).split(b';')[0].strip() or b'x', 16)
+                if not size:
+                    break
+                await self._read_into(reader, timed, body, size)
+                if (await timed(reader.readline())) not in (b'\r\n', b'\n'):
+                    raise ValueError('missing chunk terminator')
+            while (await timed(reader.readline())) not in (b'\r\n', b'\n', b''):  # trailers
+                pass
+        except ValueError as e:
+            raise TransportError('Invalid chunked encoding', cause=e) from e
+        return bytes(body)
+
+    @staticmethod
+    def _decode(body, headers):
+        for encoding in reversed(headers.get('Content-Encoding', '').lower().replace(' ', '').split(',')):
+            try:
+                if encoding in ('gzip', 'x-gzip'):
+                    body = zlib.decompress(body, zlib.MAX_WBITS | 16)
+                elif encoding == 'deflate':
+                    try:
+                        body = zlib.decompress(body)
+                    except zlib.error:
+                        body = zlib.decompress(body, -zlib.MAX_WBITS)
+                elif encoding not in ('', 'identity'):
+                    raise TransportError(f'Unsupported content encoding {encoding}')
+            except zlib.error as e:
+                raise TransportError('Unable to decode response', cause=e) from e
+        return body
+
+    def close(self):
+        for connections in self._idle.values():
+            for connection in connections:
+                connection.close()
+        self._idle.clear()
+
+
+class _StaleConnection(Exception):
+    pass
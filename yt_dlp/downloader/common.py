@@ -72,6 +72,8 @@ class FileDownloader:
     http_chunk_size:    Size of a chunk for chunk-based HTTP downloading. May be
                         useful for bypassing bandwidth throttling imposed by
                         a webserver (experimental)
+    http_connections:   Number of connections used to download a single file
+                        over HTTP as concurrent byte ranges
     progress_template:  See YoutubeDL.py
     retry_sleep_functions: See YoutubeDL.py
 
@@ -1,17 +1,23 @@
+import asyncio
+import collections
 import concurrent.futures
 import contextlib
+import io
 import json
 import math
 import os
 import struct
+import threading
 import time
+import urllib.parse
 
+from .async_http import AsyncHTTPClient, async_unsupported_reason
 from .common import FileDownloader
 from .http import HttpFD
 from ..aes import aes_cbc_decrypt_bytes, unpad_pkcs7
 from ..networking import Request
-from ..networking.exceptions import HTTPError, IncompleteRead
-from ..utils import DownloadError, RetryManager, traverse_obj
+from ..networking.exceptions import HTTPError, IncompleteRead, TransportError
+from ..utils import DownloadError, RetryManager, timeconvert, traverse_obj
 from ..utils.networking import HTTPHeaderDict
 from ..utils.progress import ProgressCalculator
 
@@ -23,6 +29,120 @@ def to_screen(self, *args, **kargs):
     to_console_title = to_screen
 
 
+class _FragmentBuffer(io.BytesIO):
+    def close(self):
+        # HttpFD closes the stream once the fragment is complete; keep its content
+        self.content = self.getvalue()
+        super().close()
+
+
+class MemoryFragmentDownloader(HttpQuietDownloader):
+    """
+    Downloads fragments into in-memory buffers instead of temporary files
+
+    Buffers are keyed by the fragment filename, so that FragmentFD can use the
+    same bookkeeping as with on-disk fragments
+    """
+
+    def __init__(self, ydl, params):
+        super().__init__(ydl, params)
+        self._buffers = {}
+        self._lock = threading.Lock()
+
+    def temp_name(self, filename):
+        return filename
+
+    def filesize_or_none(self, filename):
+        with self._lock:
+            buffer = self._buffers.get(filename)
+        if buffer is None:
+            return 0
+        return len(buffer.content if buffer.closed else buffer.getvalue())
+
+    def sanitize_open(self, filename, open_mode):
+        with self._lock:
+            buffer = self._buffers.get(filename)
+            if 'a' in open_mode and buffer is not None:
+                content = buffer.content if buffer.closed else buffer.getvalue()
+                buffer = _FragmentBuffer(content)
+                buffer.seek(0, io.SEEK_END)
+            else:
+                buffer = _FragmentBuffer()
+            self._buffers[filename] = buffer
+        return buffer, filename
+
+    def try_rename(self, old_filename, new_filename):
+        if old_filename == new_filename:
+            return
+        with self._lock:
+            self._buffers[new_filename] = self._buffers.pop(old_filename)
+
+    def try_remove(self, filename):
+        with self._lock:
+            self._buffers.pop(filename, None)
+
+    def try_utime(self, filename, last_modified_hdr):
+        return timeconvert(last_modified_hdr) if last_modified_hdr else None
+
+    def pop_fragment(self, filename):
+        """Remove the buffer of a downloaded fragment and return its content"""
+        with self._lock:
+            buffer = self._buffers.pop(filename, None)
+        if buffer is None:
+            return None
+        return buffer.content if buffer.closed else buffer.getvalue()
+
+
+class AdaptiveConcurrency:
+    """
+    Controls the number of in-flight fragment downloads, similar to TCP congestion control
+
+    The window grows exponentially (slow start) and then linearly while the aggregate
+    throughput measured over each round of `window` completed fragments keeps improving.
+    Any fragment error halves the window.
+    """
+
+    # Minimum throughput improvement needed to keep growing the window
+    GROWTH_THRESHOLD = 1.05
+
+    def __init__(self, max_window, initial_window=2):
+        self.max_window = max(max_window, 1)
+        self.window = min(initial_window, self.max_window)
+        self.ssthresh = self.max_window
+        self._lock = threading.Lock()
+        self._best_throughput = None
+        self._start_round()
+
+    def _start_round(self):
+        self._round_bytes = self._round_count = 0
+        self._round_start = time.monotonic()
+
+    def on_success(self, downloaded_bytes):
+        with self._lock:
+            self._round_bytes += downloaded_bytes
+            self._round_count += 1
+            if self._round_count < self.window:
+                return
+            elapsed = time.monotonic() - self._round_start
+            throughput = self._round_bytes / elapsed if elapsed > 0 else math.inf
+            if self._best_throughput is None or throughput >= self._best_throughput * self.GROWTH_THRESHOLD:
+                self._best_throughput = throughput
+                if self.window < self.ssthresh:
+                    self.window = min(self.window * 2, self.ssthresh)
+                else:
+                    self.window = min(self.window + 1, self.max_window)
+            else:
+                # More parallelism no longer helps; leave slow start and hold the window
+                self.ssthresh = self.window
+            self._start_round()
+
+    def on_error(self):
+        with self._lock:
+            self.window = self.ssthresh = max(self.window // 2, 1)
+            self._best_throughput = None
+            self._start_round()
+
+
 class FragmentFD(FileDownloader):
     """
     A base file downloader class for fragmented media (e.g. f4m/m3u8 manifests).
@@ -36,6 +156,14 @@ class FragmentFD(FileDownloader):
     keep_fragments:     Keep downloaded fragments on disk after downloading is
                         finished
     concurrent_fragment_downloads:  The number of threads to use for native hls and dash downloads
+    adaptive_fragment_concurrency:  Adjust the number of concurrent fragment downloads
+                        between 1 and concurrent_fragment_downloads based on the
+                        measured throughput and errors
+    in_memory_fragments: Download fragments into memory instead of temporary
+                        files. Ignored if keep_fragments is set
+    async_fragments:    Download the fragments of http(s) URLs on an asyncio
+                        event loop instead of threads. Falls back to threads
+                        if the download needs a feature that is not supported
     _no_ytdl_file:      Don't use .ytdl file
 
     For each incomplete fragment download yt-dlp keeps on disk a special
@@ -115,10 +243,11 @@ def _download_fragment(self, ctx, frag_url, info_dict, headers=None, request_dat
             'http_headers': headers or info_dict.get('http_headers'),
             'request_data': request_data,
             'ctx_id': ctx.get('ctx_id'),
+            'is_fragment': True,
         }
         frag_resume_len = 0
         if ctx['dl'].params.get('continuedl', True):
-            frag_resume_len = self.filesize_or_none(self.temp_name(fragment_filename))
+            frag_resume_len = ctx['dl'].filesize_or_none(ctx['dl'].temp_name(fragment_filename))
         fragment_info_dict['frag_resume_len'] = ctx['frag_resume_len'] = frag_resume_len
 
         success, _ = ctx['dl'].download(fragment_filename, fragment_info_dict)
@@ -132,6 +261,8 @@ def _download_fragment(self, ctx, frag_url, info_dict, headers=None, request_dat
     def _read_fragment(self, ctx):
         if not ctx.get('fragment_filename_sanitized'):
             return None
+        if ctx.get('in_memory'):
+            return ctx['dl'].pop_fragment(ctx['fragment_filename_sanitized'])
         try:
             down, frag_sanitized = self.sanitize_open(ctx['fragment_filename_sanitized'], 'rb')
         except FileNotFoundError:
@@ -150,7 +281,9 @@ def _append_fragment(self, ctx, frag_content):
         finally:
             if self.__do_ytdl_file(ctx):
                 self._write_ytdl_file(ctx)
-            if not self.params.get('keep_fragments', False):
+            if ctx.get('in_memory'):
+                ctx['dl'].try_remove(ctx['fragment_filename_sanitized'])
+            elif not self.params.get('keep_fragments', False):
                 self.try_remove(ctx['fragment_filename_sanitized'])
             del ctx['fragment_filename_sanitized']
 
@@ -164,10 +297,12 @@ def _prepare_frag_download(self, ctx):
             total_frags_str = 'unknown (live)'
         self.to_screen(f'[{self.FD_NAME}] Total fragments: {total_frags_str}')
         self.report_destination(ctx['filename'])
-        dl = HttpQuietDownloader(self.ydl, {
+        in_memory = self.params.get('in_memory_fragments') and not self.params.get('keep_fragments')
+        dl = (MemoryFragmentDownloader if in_memory else HttpQuietDownloader)(self.ydl, {
             **self.params,
             'noprogress': True,
             'test': False,
+            'http_connections': 1,
             'sleep_interval': 0,
             'max_sleep_interval': 0,
             'sleep_interval_subtitles': 0,
@@ -216,6 +351,7 @@ def _prepare_frag_download(self, ctx):
 
         ctx.update({
             'dl': dl,
+            'in_memory': in_memory,
             'dest_stream': dest_stream,
             'tmpfilename': tmpfilename,
             # Total complete fragments downloaded so far in bytes
@@ -369,6 +505,9 @@ def download_and_append_fragments_multiple(self, *args, **kwargs):
         @params (ctx1, fragments1, info_dict1), (ctx2, fragments2, info_dict2), ...
                 all args must be either tuple or list
         """
+        args, use_async = self._check_async_engine(args)
+        if use_async:
+            return self._download_and_append_fragments_async(*args, **kwargs)
         interrupt_trigger = [True]
         max_progress = len(args)
         if max_progress == 1:
@@ -428,11 +567,44 @@ def interrupt_trigger_iter(fg):
         # so returning a intermediate result here instead of KeyboardInterrupt on live
         return result
 
+    @staticmethod
+    def _bounded_map(pool, func, iterable, window, max_buffered):
+        """
+        Like pool.map, but only keeps window() calls in flight and yields the
+        results in order from a reorder buffer of at most max_buffered results
+        """
+        iterator = iter(iterable)
+        pending = collections.deque()
+        exhausted = False
+        while True:
+            running = sum(not future.done() for future in pending)
+            while not exhausted and running < window() and len(pending) < max_buffered:
+                item = next(iterator, None)
+                if item is None:
+                    exhausted = True
+                    break
+                pending.append(pool.submit(func, item))
+                running += 1
+            if not pending:
+                return
+            if not pending[0].done():
+                concurrent.futures.wait(
+                    [future for future in pending if not future.done()],
+                    return_when=concurrent.futures.FIRST_COMPLETED)
+                continue
+            yield pending.popleft().result()
+
     def download_and_append_fragments(
             self, ctx, fragments, info_dict, *, is_fatal=(lambda idx: False),
             pack_func=(lambda content, idx: content), finish_func=None,
             tpe=None, interrupt_trigger=(True, )):
 
+        if tpe is None:
+            [(ctx, fragments, info_dict)], use_async = self._check_async_engine([(ctx, fragments, info_dict)])
+            if use_async:
+                return self._download_and_append_fragments_async(
+                    (ctx, fragments, info_dict), is_fatal=is_fatal, pack_func=pack_func, finish_func=finish_func)
+
         if not self.params.get('skip_unavailable_fragments', True):
             is_fatal = lambda _: True
 
@@ -451,6 +623,8 @@ def download_fragment(fragment, ctx):
             fatal = is_fatal(fragment.get('index') or (frag_index - 1))
 
             def error_callback(err, count, retries):
+                if concurrency:
+                    concurrency.on_error()
                 if fatal and count > retries:
                     ctx['dest_stream'].close()
                 self.report_retry(err, count, retries, frag_index, fatal)
@@ -484,20 +658,36 @@ def append_fragment(frag_content, frag_index, ctx):
 
         max_workers = math.ceil(
             self.params.get('concurrent_fragment_downloads', 1) / ctx.get('max_progress', 1))
+        concurrency = None
+        if max_workers > 1 and self.params.get('adaptive_fragment_concurrency'):
+            concurrency = AdaptiveConcurrency(max_workers)
+
         if max_workers > 1:
             def _download_fragment(fragment):
                 ctx_copy = ctx.copy()
+                ctx_copy.pop('fragment_filename_sanitized', None)
                 download_fragment(fragment, ctx_copy)
-                return fragment, fragment['frag_index'], ctx_copy.get('fragment_filename_sanitized')
+                frag_filename = ctx_copy.get('fragment_filename_sanitized')
+                if concurrency and frag_filename:
+                    concurrency.on_success(ctx['dl'].filesize_or_none(frag_filename))
+                # Read and decrypt in the worker, so that it overlaps with appending the preceding fragments
+                frag_content = decrypt_fragment(fragment, self._read_fragment(ctx_copy))
+                return fragment['frag_index'], ctx_copy.get('fragment_filename_sanitized'), frag_content
 
             with tpe or concurrent.futures.ThreadPoolExecutor(max_workers) as pool:
                 try:
-                    for fragment, frag_index, frag_filename in pool.map(_download_fragment, fragments):
+                    # Bound the number of fragments held in memory while waiting to be appended
+                    if concurrency:
+                        window, max_window = (lambda: concurrency.window), concurrency.max_window
+                    else:
+                        window, max_window = (lambda: max_workers), max_workers
+                    for frag_index, frag_filename, frag_content in self._bounded_map(
+                            pool, _download_fragment, fragments, window, 2 * max_window):
                         ctx.update({
                             'fragment_filename_sanitized': frag_filename,
                             'fragment_index': frag_index,
                         })
-                        if not append_fragment(decrypt_fragment(fragment, self._read_fragment(ctx)), frag_index, ctx):
+                        if not append_fragment(frag_content, frag_index, ctx):
                             return False
                 except KeyboardInterrupt:
                     self._finish_multiline_status()
@@ -524,3 +714,192 @@ def _download_fragment(fragment):
             ctx['dest_stream'].write(finish_func())
             ctx['dest_stream'].flush()
         return self._finish_frag_download(ctx, info_dict)
+
+    def _check_async_engine(self, args):
+        """
+        @returns (args, whether to use the asyncio engine)
+        The fragments in the returned args are lists, if they can be downloaded by the asyncio engine
+        """
+        if not self.params.get('async_fragments'):
+            return args, False
+        reason = self._async_unsupported_reason(args)
+        if reason:
+            self.write_debug(f'Downloading fragments with threads: {reason}')
+            return args, False
+        args = [(ctx, list(fragments), info_dict) for ctx, fragments, info_dict in args]
+        reason = self._async_unsupported_reason(args)
+        if reason:
+            self.write_debug(f'Downloading fragments with threads: {reason}')
+        return args, not reason
+
+    def _async_unsupported_reason(self, args):
+        with contextlib.suppress(RuntimeError):
+            asyncio.get_running_loop()
+            return 'an event loop is already running'
+        for ctx, fragments, info_dict in args:
+            # Fragments of live streams may be generated indefinitely
+            if ctx.get('live'):
+                return 'live streams are not supported'
+            if not isinstance(fragments, list):
+                continue
+            # The proxy to use only depends on the scheme and host
+            urls = {urllib.parse.urlparse(fragment['url'])[:2]: fragment['url'] for fragment in fragments}
+            for url in urls.values():
+                reason = async_unsupported_reason(self.ydl, self.params, info_dict, url)
+                if reason:
+                    return reason
+        return None
+
+    @staticmethod
+    async def _async_bounded_map(func, iterable, window, max_buffered):
+        """Like _bounded_map, but runs the coroutines func(item) as tasks of the running event loop"""
+        iterator = iter(iterable)
+        pending = collections.deque()
+        exhausted = False
+        try:
+            while True:
+                running = sum(not task.done() for task in pending)
+                while not exhausted and running < window() and len(pending) < max_buffered:
+                    item = next(iterator, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    pending.append(asyncio.ensure_future(func(item)))
+                    running += 1
+                if not pending:
+                    return
+                if not pending[0].done():
+                    await asyncio.wait(
+                        [task for task in pending if not task.done()], return_when=asyncio.FIRST_COMPLETED)
+                    continue
+                yield pending.popleft().result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _download_and_append_fragments_async(self, *args, **kwargs):
+        """
+        Download the fragments of all (ctx, fragments, info_dict) in args on one event loop
+
+        Unlike with threads, the number of concurrent fragment downloads is
+        not limited by thread overhead, so concurrent_fragment_downloads can be in the hundreds
+        """
+        max_progress = len(args)
+        if max_progress > 1:
+            self._prepare_multiline_status(max_progress)
+            for idx, (ctx, _, _) in enumerate(args):
+                ctx['max_progress'] = max_progress
+                ctx['progress_idx'] = idx
+        client = AsyncHTTPClient(self.ydl)
+
+        async def download_all():
+            try:
+                results = await asyncio.gather(*(
+                    self._async_download_and_append_fragments(client, ctx, fragments, info_dict, **kwargs)
+                    for ctx, fragments, info_dict in args))
+            finally:
+                client.close()
+            return all(results)
+
+        try:
+            return asyncio.run(download_all())
+        except KeyboardInterrupt:
+            self._finish_multiline_status()
+            self.report_error('Interrupted by user', is_error=False, tb=False)
+            raise
+
+    async def _async_download_and_append_fragments(
+            self, client, ctx, fragments, info_dict, *, is_fatal=(lambda idx: False),
+            pack_func=(lambda content, idx: content), finish_func=None):
+
+        if not self.params.get('skip_unavailable_fragments', True):
+            is_fatal = lambda _: True
+
+        max_downloads = math.ceil(
+            self.params.get('concurrent_fragment_downloads', 1) / ctx.get('max_progress', 1))
+        concurrency = None
+        if max_downloads > 1 and self.params.get('adaptive_fragment_concurrency'):
+            concurrency = AdaptiveConcurrency(max_downloads)
+        decrypt_fragment = self.decrypter(info_dict)
+
+        async def download_fragment(fragment):
+            frag_index = fragment['frag_index']
+            headers = HTTPHeaderDict(info_dict.get('http_headers'))
+            byte_range = fragment.get('byte_range')
+            if byte_range:
+                headers['Range'] = 'bytes=%d-%d' % (byte_range['start'], byte_range['end'] - 1)
+                headers.setdefault('Accept-Encoding', 'identity')
+
+            # Never skip the first fragment
+            fatal = is_fatal(fragment.get('index') or (frag_index - 1))
+            retry_report = None
+
+            def error_callback(err, count, retries):
+                nonlocal retry_report
+                if concurrency:
+                    concurrency.on_error()
+                if fatal and count > retries:
+                    ctx['dest_stream'].close()
+                retry_report = (err, count, retries)
+
+            async def report_retry():
+                nonlocal retry_report
+                # Sleeping between retries must not block the other downloads
+                err, count, retries = retry_report
+                retry_report = None
+                await asyncio.to_thread(self.report_retry, err, count, retries, frag_index, fatal)
+
+            frag_content, started = None, time.time()
+            for retry in RetryManager(self.params.get('fragment_retries'), error_callback):
+                if retry_report:
+                    await report_retry()
+                try:
+                    ctx['fragment_count'] = fragment.get('fragment_count')
+                    response_headers, frag_content = await client.fetch(fragment['url'], headers)
+                except (HTTPError, TransportError) as err:
+                    retry.error = err
+                    continue
+            if retry_report:
+                await report_retry()
+            if frag_content is None:
+                return frag_index, None
+
+            if response_headers.get('Last-Modified'):
+                ctx['fragment_filetime'] = timeconvert(response_headers['Last-Modified'])
+            if concurrency:
+                concurrency.on_success(len(frag_content))
+            frag_filename = '%s-Frag%d' % (ctx['tmpfilename'], frag_index)
+            ctx['dl']._hook_progress({
+                'status': 'finished',
+                'downloaded_bytes': len(frag_content),
+                'total_bytes': len(frag_content),
+                'filename': frag_filename,
+                'tmpfilename': frag_filename,
+                'elapsed': time.time() - started,
+                'ctx_id': ctx.get('ctx_id'),
+            }, {'url': fragment['url'], 'http_headers': headers, 'ctx_id': ctx.get('ctx_id'), 'is_fragment': True})
+            # Decrypting, and fetching the key, must not block the other downloads either
+            return frag_index, await asyncio.to_thread(decrypt_fragment, fragment, frag_content)
+
+        if concurrency:
+            window, max_window = (lambda: concurrency.window), concurrency.max_window
+        else:
+            window, max_window = (lambda: max_downloads), max_downloads
+        async for frag_index, frag_content in self._async_bounded_map(
+                download_fragment, fragments, window, 2 * max_window):
+            ctx['fragment_index'] = frag_index
+            if frag_content:
+                # Fragments are only kept in memory; _append_fragment still does the bookkeeping
+                ctx['fragment_filename_sanitized'] = '%s-Frag%d' % (ctx['tmpfilename'], frag_index)
+                self._append_fragment(ctx, pack_func(frag_content, frag_index))
+            elif not is_fatal(frag_index - 1):
+                self.report_skip_fragment(frag_index, 'fragment not found')
+            else:
+                ctx['dest_stream'].close()
+                self.report_error(f'fragment {frag_index} not found, unable to continue')
+                return False
+
+        if finish_func is not None:
+            ctx['dest_stream'].write(finish_func())
+            ctx['dest_stream'].flush()
+        return self._finish_frag_download(ctx, info_dict)
@@ -1,5 +1,8 @@
+import concurrent.futures
+import json
 import os
 import random
+import threading
 import time
 
 from .common import FileDownloader
@@ -20,7 +23,22 @@
 from ..utils.networking import HTTPHeaderDict
 
 
+class _ByteRange:
+    def __init__(self, start, end):
+        self.pos, self.end = start, end  # end is exclusive
+        self.active = False
+
+    @property
+    def remaining(self):
+        return self.end - self.pos
+
+
 class HttpFD(FileDownloader):
+    # Ranges smaller than this are not split between connections
+    _MIN_RANGE_SIZE = 1024 * 1024
+    _RANGE_BLOCK_SIZE = 64 * 1024
+    _RANGE_STATE_INTERVAL = 1
+
     def real_download(self, filename, info_dict):
         url = info_dict['url']
         request_data = info_dict.get('request_data', None)
@@ -28,6 +46,8 @@ def real_download(self, filename, info_dict):
         impersonate_target = self._get_impersonate_target(info_dict)
         if impersonate_target is not None:
             request_extensions['impersonate'] = impersonate_target
+        if info_dict.get('is_fragment'):
+            request_extensions['fragment'] = True
 
         class DownloadContext(dict):
             __getattr__ = dict.get
@@ -56,10 +76,15 @@ class DownloadContext(dict):
         # parse given Range
         req_start, req_end, _ = parse_http_range(headers.get('Range'))
 
+        if (not is_test and filename != '-' and req_start is None and request_data is None
+                and ((self.params.get('http_connections') or 1) > 1 or os.path.isfile(self.ytdl_filename(filename)))):
+            result = self._download_ranges(filename, info_dict, url, headers, request_extensions, chunk_size)
+            if result is not None:
+                return result
+
         if self.params.get('continuedl', True):
             # Establish possible resume length
-            if os.path.isfile(ctx.tmpfilename):
-                ctx.resume_len = os.path.getsize(ctx.tmpfilename)
+            ctx.resume_len = self.filesize_or_none(ctx.tmpfilename)
 
         ctx.is_resume = ctx.resume_len > 0
 
@@ -239,10 +264,7 @@ def retry(e):
                 if ctx.tmpfilename == '-':
                     ctx.resume_len = byte_counter
                 else:
-                    try:
-                        ctx.resume_len = os.path.getsize(ctx.tmpfilename)
-                    except FileNotFoundError:
-                        ctx.resume_len = 0
+                    ctx.resume_len = self.filesize_or_none(ctx.tmpfilename)
                 raise RetryDownload(e)
 
             while True:
@@ -374,3 +396,234 @@ def retry(e):
                 close_stream()
                 raise
         return False
+
+    def _download_ranges(self, filename, info_dict, url, headers, request_extensions, chunk_size):
+        """
+        Download the file as concurrent byte ranges into a preallocated file
+
+        The remaining ranges are kept in the .ytdl file so that the download can be resumed.
+        Connections that finish early split the largest remaining range (work stealing).
+        Returns None if the server does not support this, so that a regular download is done
+        """
+        tmpfilename = self.temp_name(filename)
+        ytdl_filename = self.ytdl_filename(filename)
+        connections = max(self.params.get('http_connections') or 1, 1)
+
+        def make_request(start=None, end=None):
+            request = Request(url, None, headers, extensions=request_extensions)
+            if start is not None:
+                request.headers['Range'] = f'bytes={start}-{end - 1}'
+            return request
+
+        # Check for Range support and the total size of the file
+        try:
+            probe = self.ydl.urlopen(make_request(0, 1))
+        except (HTTPError, TransportError) as err:
+            self.write_debug(f'Unable to probe for range support: {err}')
+            return None
+        try:
+            content_start, _, total_bytes = parse_http_range(probe.headers.get('Content-Range'))
+            last_modified = probe.headers.get('last-modified')
+        finally:
+            probe.close()
+        if content_start != 0 or not total_bytes:
+            self.write_debug('Server does not support byte ranges; using a single connection')
+            return None
+
+        for limit, compare, message in (
+                (self.params.get('min_filesize'), lambda limit: total_bytes < limit, 'smaller than min-filesize'),
+                (self.params.get('max_filesize'), lambda limit: total_bytes > limit, 'larger than max-filesize')):
+            if limit is not None and compare(limit):
+                self.to_screen(f'\r[download] File is {message} ({total_bytes} bytes). Aborting.')
+                return False
+
+        ranges = None
+        if self.params.get('continuedl', True) and os.path.isfile(ytdl_filename):
+            ranges = self._read_range_state(ytdl_filename, tmpfilename, total_bytes)
+            if ranges is not None:
+                self.report_resuming_byte(total_bytes - sum(rng.remaining for rng in ranges))
+        if ranges is None:
+            if os.path.isfile(tmpfilename) and not os.path.isfile(ytdl_filename) and self.params.get('continuedl', True):
+                # Partial download from a single connection; let the regular download resume it
+                return None
+            connections = min(connections, total_bytes // self._MIN_RANGE_SIZE)
+            if connections < 2:
+                return None
+            step = -(-total_bytes // connections)
+            ranges = [_ByteRange(start, min(start + step, total_bytes)) for start in range(0, total_bytes, step)]
+            stream, tmpfilename = self.sanitize_open(tmpfilename, 'wb')
+            try:
+                stream.truncate(total_bytes)
+            finally:
+                stream.close()
+
+        self.report_destination(filename)
+        lock = threading.Lock()
+        resume_len = total_bytes - sum(rng.remaining for rng in ranges)
+        state = {
+            'downloaded_bytes': resume_len,
+            'stop': False,
+            'saved': time.monotonic(),
+        }
+        start_time = time.time()
+
+        def save_state():
+            # Must be called with the lock held
+            self._write_range_state(ytdl_filename, total_bytes, ranges)
+            state['saved'] = time.monotonic()
+
+        def next_range():
+            with lock:
+                for rng in ranges:
+                    if not rng.active and rng.remaining > 0:
+                        rng.active = True
+                        return rng
+                # Steal the second half of the largest range still being downloaded
+                victim = max((rng for rng in ranges if rng.active), key=lambda rng: rng.remaining, default=None)
+                if not victim or victim.remaining < 2 * self._MIN_RANGE_SIZE:
+                    return None
+                stolen = _ByteRange(victim.pos + victim.remaining // 2, victim.end)
+                stolen.active = True
+                victim.end = stolen.pos
+                ranges.append(stolen)
+                return stolen
+
+        def report_progress():
+            # Must be called with the lock held
+            now = time.time()
+            downloaded = state['downloaded_bytes']
+            self._hook_progress({
+                'status': 'downloading',
+                'downloaded_bytes': downloaded,
+                'total_bytes': total_bytes,
+                'tmpfilename': tmpfilename,
+                'filename': filename,
+                'eta': self.calc_eta(start_time, now, total_bytes - resume_len, downloaded - resume_len),
+                'speed': self.calc_speed(start_time, now, downloaded - resume_len),
+                'elapsed': now - start_time,
+                'ctx_id': info_dict.get('ctx_id'),
+            }, info_dict)
+
+        def fetch(rng):
+            with lock:
+                start = rng.pos
+                request_end = min(rng.end, start + chunk_size) if chunk_size else rng.end
+            if start >= request_end:
+                return
+            data = self.ydl.urlopen(make_request(start, request_end))
+            try:
+                if parse_http_range(data.headers.get('Content-Range'))[0] != start:
+                    raise TransportError(f'Server did not honor the requested range starting at {start}')
+                # Each connection writes to its own region of the preallocated file
+                with open(tmpfilename, 'r+b') as stream:
+                    stream.seek(start)
+                    while not state['stop']:
+                        # Another connection may have taken over the end of this range
+                        with lock:
+                            to_read = min(self._RANGE_BLOCK_SIZE, rng.end - rng.pos, request_end - rng.pos)
+                        if to_read <= 0:
+                            break
+                        data_block = data.read(to_read)
+                        if not data_block:
+                            break
+                        stream.write(data_block)
+                        with lock:
+                            rng.pos += len(data_block)
+                            state['downloaded_bytes'] += len(data_block)
+                            if time.monotonic() - state['saved'] > self._RANGE_STATE_INTERVAL:
+                                stream.flush()
+                                save_state()
+                            report_progress()
+                        self.slow_down(start_time, time.time(), state['downloaded_bytes'] - resume_len)
+            finally:
+                data.close()
+            with lock:
+                if not state['stop'] and rng.pos < min(rng.end, request_end):
+                    raise ContentTooShortError(rng.pos - start, min(rng.end, request_end) - start)
+
+        def download_range(rng):
+            try:
+                while not state['stop'] and rng.remaining > 0:
+                    retry_manager = RetryManager(self.params.get('retries'), self.report_retry)
+                    for retry in retry_manager:
+                        try:
+                            fetch(rng)
+                        except HTTPError as err:
+                            if not 500 <= err.status < 600:
+                                raise
+                            retry.error = err
+                        except (TransportError, ContentTooShortError) as err:
+                            retry.error = err
+                    if retry_manager.error:
+                        # The error has already been reported; stop the other connections
+                        state['stop'] = True
+            finally:
+                with lock:
+                    rng.active = False
+                    if rng.remaining <= 0:
+                        ranges.remove(rng)
+
+        def worker():
+            while not state['stop']:
+                rng = next_range()
+                if rng is None:
+                    return
+                download_range(rng)
+
+        with concurrent.futures.ThreadPoolExecutor(connections, thread_name_prefix='http-range') as pool:
+            futures = [pool.submit(worker) for _ in range(connections)]
+            try:
+                for future in futures:
+                    future.result()
+            except BaseException:
+                state['stop'] = True
+                concurrent.futures.wait(futures)
+                raise
+            finally:
+                with lock:
+                    if ranges:
+                        save_state()
+
+        if ranges:
+            return False
+
+        self.try_remove(ytdl_filename)
+        self.try_rename(tmpfilename, filename)
+        if self.params.get('updatetime'):
+            info_dict['filetime'] = self.try_utime(filename, last_modified)
+        self._hook_progress({
+            'downloaded_bytes': total_bytes,
+            'total_bytes': total_bytes,
+            'filename': filename,
+            'status': 'finished',
+            'elapsed': time.time() - start_time,
+            'ctx_id': info_dict.get('ctx_id'),
+        }, info_dict)
+        return True
+
+    def _read_range_state(self, ytdl_filename, tmpfilename, total_bytes):
+        try:
+            stream, _ = self.sanitize_open(ytdl_filename, 'r')
+            try:
+                downloader = json.loads(stream.read())['downloader']
+            finally:
+                stream.close()
+            if 'ranges' not in downloader:
+                # Not written by a multi-connection download
+                return None
+            if downloader['total_bytes'] != total_bytes or self.filesize_or_none(tmpfilename) != total_bytes:
+                raise ValueError('file size changed')
+            return [_ByteRange(start, end) for start, end in downloader['ranges']]
+        except Exception as err:
+            self.report_warning(f'Unable to resume the download from .ytdl file ({err}). Restarting from the beginning ...')
+            return None
+
+    def _write_range_state(self, ytdl_filename, total_bytes, ranges):
+        stream, _ = self.sanitize_open(ytdl_filename, 'w')
+        try:
+            stream.write(json.dumps({'downloader': {
+                'total_bytes': total_bytes,
+                'ranges': [[rng.pos, rng.end] for rng in ranges if rng.remaining > 0],
+            }}))
+        finally:
+            stream.close()
@@ -0,0 +1,260 @@
+import collections
+import functools
+import itertools
+import re
+
+from .common import InfoExtractor
+from ..globals import LAZY_EXTRACTORS
+from ..utils import variadic
+
+try:
+    # Python 3.11+
+    import re._constants as sre_constants
+    import re._parser as sre_parse
+except ImportError:
+    import sre_constants
+    import sre_parse
+
+# Maximum number of alternative strings to expand a run of literals into
+_MAX_ALTERNATIVES = 16
+# Literals are indexed by one of their substrings of this length
+_GRAM_SIZE = 4
+# Parts of literals that do not help to tell sites apart
+_BOILERPLATE_RE = re.compile(r'https?://|://|www\.')
+
+_ZERO_WIDTH = {sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT}
+_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, getattr(sre_constants, 'POSSESSIVE_REPEAT', None)}
+_GROUPS = {sre_constants.SUBPATTERN, getattr(sre_constants, 'ATOMIC_GROUP', None)}
+
+
+def _group_items(op, av):
+    return av[-1] if op == sre_constants.SUBPATTERN else av
+
+
+def _finite(op, av):
+    """Return the set of strings the element can match, or None if it is too large"""
+    if op == sre_constants.LITERAL:
+        return {chr(av)} if av < 128 else None
+    elif op in _ZERO_WIDTH:
+        return {''}
+    elif op == sre_constants.IN:
+        if any(item_op != sre_constants.LITERAL or item_av >= 128 for item_op, item_av in av):
+            return None
+        return {chr(item_av) for _, item_av in av}
+    elif op in _GROUPS:
+        return _finite_sequence(_group_items(op, av))
+    elif op == sre_constants.BRANCH:
+        result = set()
+        for items in av[1]:
+            options = _finite_sequence(items)
+            if options is None:
+                return None
+            result |= options
+        return result if len(result) <= _MAX_ALTERNATIVES else None
+    elif op in _REPEATS:
+        low, high, items = av
+        options = _finite_sequence(items)
+        if options is None or high > 2:
+            return None
+        result = set()
+        for count in range(low, high + 1):
+            result |= _product(*[options] * count)
+        return result if len(result) <= _MAX_ALTERNATIVES else None
+    return None
+
+
+def _product(*option_sets):
+    result = {''}
+    for options in option_sets:
+        result = {a + b for a in result for b in options}
+    return result
+
+
+def _finite_sequence(items):
+    result = {''}
+    for op, av in items:
+        options = _finite(op, av)
+        if options is None:
+            return None
+        result = _product(result, options)
+        if len(result) > _MAX_ALTERNATIVES:
+            return None
+    return result
+
+
+def _literal_sets(items):
+    """
+    Yield sets of strings such that every match of the sequence contains
+    at least one string of each set
+    """
+    current = {''}
+    for op, av in items:
+        options = _finite(op, av)
+        if options is None:
+            yield current
+            current = {''}
+            if op in _GROUPS:
+                yield from _literal_sets(_group_items(op, av))
+            elif op in _REPEATS and av[0] >= 1:
+                yield from _literal_sets(av[2])
+            elif op == sre_constants.BRANCH:
+                alternatives = [_best(_literal_sets(branch)) for branch in av[1]]
+                if all(alternatives):
+                    yield set().union(*alternatives)
+            continue
+        product = _product(current, options)
+        if len(product) > _MAX_ALTERNATIVES:
+            yield current
+            product = options
+        current = product
+    yield current
+
+
+def _core(string):
+    # Any part of a required string is also required
+    return max(_BOILERPLATE_RE.split(string), key=len)
+
+
+def _score(strings):
+    return min(len(_core(string)) for string in strings)
+
+
+def _best(literal_sets):
+    best = max(literal_sets, key=lambda strings: (_score(strings), -len(strings)), default=None)
+    if best is None or _score(best) < _GRAM_SIZE:
+        return None
+    return best
+
+
+def literals_from_regex(regex):
+    """
+    Find literal strings one of which must be contained in every string that
+    matches the regex. The strings are casefolded. Returns None if none were found
+    """
+    strings = _best(_literal_sets(sre_parse.parse(regex)))
+    return strings and tuple(sorted({_core(string).casefold() for string in strings}))
+
+
+def _compute_literals(ie):
+    # Extractors that override URL matching are always tried
+    if (ie.suitable.__func__ is not InfoExtractor.suitable.__func__
+            or ie._match_valid_url.__func__ is not InfoExtractor._match_valid_url.__func__):
+        return None
+    elif ie._VALID_URL is False:
+        return ()
+    elif not ie._VALID_URL:
+        return None
+
+    result = set()
+    for regex in variadic(ie._VALID_URL):
+        literals = literals_from_regex(regex)
+        if literals is None:
+            return None
+        result.update(literals)
+    return tuple(sorted(result))
+
+
+_LITERALS_CACHE = {}
+
+
+@functools.cache
+def _prebuilt_literals():
+    if not LAZY_EXTRACTORS.value:
+        return {}
+    try:
+        from .lazy_extractors import _URL_LITERALS
+    except ImportError:
+        return {}
+    return _URL_LITERALS
+
+
+def has_prebuilt_url_index():
+    return bool(_prebuilt_literals())
+
+
+def url_literals(ie):
+    """
+    Return the literals one of which is contained in every URL suitable for the
+    extractor, an empty tuple if it does not match any URL, or None if it must
+    always be tried
+    """
+    if not isinstance(ie, type):
+        ie = type(ie)
+    if ie not in _LITERALS_CACHE:
+        prebuilt = _prebuilt_literals()
+        if ie.__module__.endswith('.lazy_extractors') and ie.__name__ in prebuilt:
+            _LITERALS_CACHE[ie] = prebuilt[ie.__name__]
+        else:
+            _LITERALS_CACHE[ie] = _compute_literals(ie)
+    return _LITERALS_CACHE[ie]
+
+
+class URLIndex:
+    """
+    Index of extractors by the literal parts of their _VALID_URL
+
+    candidates() returns, in the original order, the keys of the extractors
+    whose suitable() may return True for a URL, without compiling their regexes
+    """
+
+    def __init__(self, ies):
+        """@param ies  Mapping of ie_key to the extractor class or instance"""
+        self._positions = {}
+        self._always = []
+        literals = {}
+        for position, (ie_key, ie) in enumerate(ies.items()):
+            self._positions[ie_key] = position
+            ie_literals = url_literals(ie)
+            if ie_literals is None:
+                self._always.append(ie_key)
+            else:
+                literals[ie_key] = ie_literals
+
+        grams = {
+            string: {string[i:i + _GRAM_SIZE] for i in range(len(string) - _GRAM_SIZE + 1)}
+            for ie_literals in literals.values() for string in ie_literals}
+        frequency = collections.Counter(itertools.chain.from_iterable(grams.values()))
+        self._buckets = collections.defaultdict(list)
+        for ie_key, ie_literals in literals.items():
+            for string in ie_literals:
+                # The rarest substring gives the smallest bucket
+                self._buckets[min(grams[string], key=frequency.__getitem__)].append((string, ie_key))
+
+    def __len__(self):
+        return len(self._positions)
+
+    def candidates(self, url):
+        url = url.casefold()
+        found = set(self._always)
+        for i in range(len(url) - _GRAM_SIZE + 1):
+            for string, ie_key in self._buckets.get(url[i:i + _GRAM_SIZE], ()):
+                if ie_key not in found and string in url:
+                    found.add(ie_key)
+        return sorted(found, key=self._positions.__getitem__)
+
+
+class URLResolver:
+    """
+    Find the first extractor whose suitable() is True for a URL
+
+    Results, including the fallback to the generic extractor, are kept in
+    a bounded LRU cache, so repeated URLs are not matched again
+    """
+
+    def __init__(self, ies, max_entries=4096):
+        """@param ies  Mapping of ie_key to the extractor class or instance"""
+        self._ies = ies
+        self.index = URLIndex(ies)
+        self._resolve = functools.lru_cache(maxsize=max_entries)(self._find)
+
+    def _find(self, url):
+        return next((ie_key for ie_key in self.index.candidates(url) if self._ies[ie_key].suitable(url)), None)
+
+    def resolve(self, url):
+        """Return the key of the extractor for the URL, or None if there is none"""
+        return self._resolve(url)
+
+    @property
+    def stats(self):
+        info = self._resolve.cache_info()
+        return {'hits': info.hits, 'misses': info.misses, 'entries': info.currsize}
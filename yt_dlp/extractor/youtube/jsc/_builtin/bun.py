@@ -45,6 +45,7 @@ class BunJCP(EJSBaseJCP, BuiltinIEContentProvider):
     JS_RUNTIME_NAME = 'bun'
     BUN_NPM_LIB_FILENAME = 'yt.solver.bun.lib.js'
     SUPPORTED_PROXY_SCHEMES = ['http', 'https']
+    _SUPPORTS_WORKERS = True
 
     def _iter_script_sources(self):
         yield from super()._iter_script_sources()
@@ -111,7 +112,7 @@ def _get_env_options(self) -> dict[str, str]:
 
         return options
 
-    def _run_js_runtime(self, stdin: str, /) -> str:
+    def _bun_options(self):
         # https://bun.com/docs/cli/run
         options = ['--no-addons', '--prefer-offline']
         if self._lib_script.variant == ScriptVariant.BUN_NPM:
@@ -119,7 +120,13 @@ def _run_js_runtime(self, stdin: str, /) -> str:
             options.append('--install=fallback')
         else:
             options.append('--no-install')
-        cmd = [self.runtime_info.path, '--bun', 'run', *options, '-']
+        return options
+
+    def _worker_cmd(self, script_path, /):
+        return [self.runtime_info.path, '--bun', 'run', *self._bun_options(), script_path], self._get_env_options()
+
+    def _run_js_runtime(self, stdin: str, /) -> str:
+        cmd = [self.runtime_info.path, '--bun', 'run', *self._bun_options(), '-']
         self.logger.debug(f'Running bun: {shlex.join(cmd)}')
 
         with Popen(
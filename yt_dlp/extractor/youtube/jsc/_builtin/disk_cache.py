@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import time
+
+from yt_dlp.extractor.youtube.jsc.cache import (
+    JsChallengeCacheProvider,
+    register_preference,
+    register_provider,
+)
+from yt_dlp.extractor.youtube.jsc.provider import JsChallengeRequest
+from yt_dlp.extractor.youtube.pot._provider import BuiltinIEContentProvider
+
+
+@register_provider
+class DiskJCCP(JsChallengeCacheProvider, BuiltinIEContentProvider):
+    """Store the results in the yt-dlp cache directory, which can be shared between processes"""
+    PROVIDER_NAME = 'disk'
+    _CACHE_SECTION = 'youtube-jsc'
+
+    def is_available(self) -> bool:
+        return self.ie.cache.enabled
+
+    def get(self, key: str) -> str | None:
+        return self.ie.cache.load(self._CACHE_SECTION, key)
+
+    def store(self, key: str, value: str, expires_at: int):
+        self.ie.cache.store(self._CACHE_SECTION, key, value, ttl=expires_at - time.time())
+
+    def delete(self, key: str):
+        self.ie.cache.store(self._CACHE_SECTION, key, None)
+
+
+@register_preference(DiskJCCP)
+def disk_cache_preference(provider: JsChallengeCacheProvider, request: JsChallengeRequest) -> int:
+    return 100
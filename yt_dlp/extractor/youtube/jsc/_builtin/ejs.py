@@ -1,14 +1,23 @@
 from __future__ import annotations
 
 import collections
+import contextlib
 import dataclasses
 import enum
 import functools
 import hashlib
 import json
+import os
+import tempfile
 
 from yt_dlp.dependencies import yt_dlp_ejs as _has_ejs
 from yt_dlp.extractor.youtube.jsc._builtin import vendor
+from yt_dlp.extractor.youtube.jsc._builtin.worker import (
+    WORKER_SCRIPT,
+    JsRuntimeWorker,
+    JsRuntimeWorkerError,
+    JsRuntimeWorkerPool,
+)
 from yt_dlp.extractor.youtube.jsc.provider import (
     JsChallengeProvider,
     JsChallengeProviderError,
@@ -21,7 +30,7 @@
 )
 from yt_dlp.extractor.youtube.pot._provider import configuration_arg
 from yt_dlp.extractor.youtube.pot.provider import provider_bug_report_message
-from yt_dlp.utils import version_tuple
+from yt_dlp.utils import int_or_none, version_tuple
 from yt_dlp.utils._jsruntime import JsRuntimeInfo
 
 if _has_ejs:
@@ -106,6 +115,10 @@ class EJSBaseJCP(JsChallengeProvider):
     # currently disabled as files are large and we do not support rotation
     _ENABLE_PREPROCESSED_PLAYER_CACHE = False
 
+    # Set by the runtimes that implement _worker_cmd
+    _SUPPORTS_WORKERS = False
+    _WORKER_TIMEOUT = 120
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._available = True
@@ -131,6 +144,10 @@ def __init__(self, *args, **kwargs):
             self.report_dev_option(f'You have set a custom EJS script version for EJS JCP Providers ({custom_version}).')
             self._SCRIPT_VERSION = custom_version
 
+        self._worker_count = int_or_none(self.ejs_setting('workers', ['0'])[0]) or 0
+        self._worker_pool = None
+        self._worker_script_path = None
+
     def ejs_setting(self, key, *args, **kwargs):
         return configuration_arg(self.ejs_settings, key, *args, **kwargs)
 
@@ -151,29 +168,14 @@ def _real_bulk_solve(self, /, requests: list[JsChallengeRequest]):
             grouped[request.input.player_url].append(request)
 
         for player_url, grouped_requests in grouped.items():
-            player = None
-            if self._ENABLE_PREPROCESSED_PLAYER_CACHE:
-                player = self.ie.cache.load(self._CACHE_SECTION, f'player:{player_url}')
-
-            if player:
-                cached = True
+            video_id = next((request.video_id for request in grouped_requests), None)
+            if self._worker_count > 0 and self._SUPPORTS_WORKERS:
+                output = self._solve_with_worker(video_id, player_url, grouped_requests)
             else:
-                cached = False
-                video_id = next((request.video_id for request in grouped_requests), None)
-                player = self._get_player(video_id, player_url)
-
-            # NB: This output belongs after the player request
-            self.logger.info(f'Solving JS challenges using {self.JS_RUNTIME_NAME}')
-
-            stdin = self._construct_stdin(player, cached, grouped_requests)
-            stdout = self._run_js_runtime(stdin)
-            output = json.loads(stdout)
+                output = self._solve_with_process(video_id, player_url, grouped_requests)
             if output['type'] == 'error':
                 raise JsChallengeProviderError(output['error'])
 
-            if self._ENABLE_PREPROCESSED_PLAYER_CACHE and (preprocessed := output.get('preprocessed_player')):
-                self.ie.cache.store(self._CACHE_SECTION, f'player:{player_url}', preprocessed)
-
             for request, response_data in zip(grouped_requests, output['responses'], strict=True):
                 if response_data['type'] == 'error':
                     yield JsChallengeProviderResponse(request, None, response_data['error'])
@@ -182,11 +184,94 @@ def _real_bulk_solve(self, /, requests: list[JsChallengeRequest]):
                         NChallengeOutput(response_data['data']) if request.type is JsChallengeType.N
                         else SigChallengeOutput(response_data['data']))))
 
-    def _construct_stdin(self, player: str, preprocessed: bool, requests: list[JsChallengeRequest], /) -> str:
-        json_requests = [{
+    def _solve_with_process(self, video_id, player_url, requests: list[JsChallengeRequest], /) -> dict:
+        player = None
+        if self._ENABLE_PREPROCESSED_PLAYER_CACHE:
+            player = self.ie.cache.load(self._CACHE_SECTION, f'player:{player_url}')
+
+        if player:
+            cached = True
+        else:
+            cached = False
+            player = self._get_player(video_id, player_url)
+
+        # NB: This output belongs after the player request
+        self.logger.info(f'Solving JS challenges using {self.JS_RUNTIME_NAME}')
+
+        stdin = self._construct_stdin(player, cached, requests)
+        stdout = self._run_js_runtime(stdin)
+        output = json.loads(stdout)
+
+        if self._ENABLE_PREPROCESSED_PLAYER_CACHE and (preprocessed := output.get('preprocessed_player')):
+            self.ie.cache.store(self._CACHE_SECTION, f'player:{player_url}', preprocessed)
+        return output
+
+    def _json_requests(self, requests: list[JsChallengeRequest], /) -> list[dict]:
+        return [{
             'type': request.type.value,
             'challenges': request.input.challenges,
         } for request in requests]
+
+    # region: worker processes
+
+    def _worker_cmd(self, script_path: str, /) -> tuple[list[str], dict[str, str] | None]:
+        """Return the command and environment to run the worker script with. To be implemented by subclasses"""
+        raise NotImplementedError
+
+    def _create_worker(self) -> JsRuntimeWorker:
+        if self._worker_script_path is None:
+            with tempfile.NamedTemporaryFile(
+                    'w', suffix='.mjs', prefix='yt-dlp-jsc-', delete=False, encoding='utf-8') as script_file:
+                script_file.write(self._construct_worker_script())
+            self._worker_script_path = script_file.name
+        cmd, env = self._worker_cmd(self._worker_script_path)
+        self.logger.debug(f'Starting {self.JS_RUNTIME_NAME} worker process')
+        return JsRuntimeWorker(cmd, env)
+
+    def _construct_worker_script(self, /) -> str:
+        return f'''\
+        {self._lib_script.code}
+        Object.assign(globalThis, lib);
+        {self._core_script.code}
+        {WORKER_SCRIPT}
+        '''
+
+    def _solve_with_worker(self, video_id, player_url, requests: list[JsChallengeRequest], /) -> dict:
+        if self._worker_pool is None:
+            self._worker_pool = JsRuntimeWorkerPool(self._create_worker, self._worker_count)
+        message = {'type': 'solve', 'player_url': player_url, 'requests': self._json_requests(requests)}
+
+        for retry in range(2):
+            try:
+                with self._worker_pool.worker(player_url) as worker:
+                    output = {'type': 'missing_player'}
+                    if player_url in worker.players:
+                        output = worker.request(message, self._WORKER_TIMEOUT)
+                    if output['type'] == 'missing_player':
+                        player = self._get_player(video_id, player_url)
+                        self.logger.info(f'Solving JS challenges using {self.JS_RUNTIME_NAME} worker')
+                        output = worker.request({**message, 'player': player}, self._WORKER_TIMEOUT)
+                        worker.players.add(player_url)
+                    return output
+            except JsRuntimeWorkerError as e:
+                if retry:
+                    raise
+                self.logger.warning(f'{e}. Restarting {self.JS_RUNTIME_NAME} worker process')
+
+    def close(self):
+        if self._worker_pool is not None:
+            self._worker_pool.close()
+            self._worker_pool = None
+        if self._worker_script_path is not None:
+            with contextlib.suppress(OSError):
+                os.remove(self._worker_script_path)
+            self._worker_script_path = None
+        super().close()
+
+    # endregion: worker processes
+
+    def _construct_stdin(self, player: str, preprocessed: bool, requests: list[JsChallengeRequest], /) -> str:
+        json_requests = self._json_requests(requests)
         data = {
             'type': 'preprocessed',
             'preprocessed_player': player,
@@ -22,8 +22,9 @@ class NodeJCP(EJSBaseJCP, BuiltinIEContentProvider):
     JS_RUNTIME_NAME = 'node'
 
     _ARGS = ['-']
+    _SUPPORTS_WORKERS = True
 
-    def _run_js_runtime(self, stdin: str, /) -> str:
+    def _runtime_args(self):
         args = []
 
         if self.ejs_setting('jitless', ['false']) != ['false']:
@@ -35,8 +36,13 @@ def _run_js_runtime(self, stdin: str, /) -> str:
             args.append('--no-warnings=ExperimentalWarning')
         else:
             args.append('--permission')
+        return args
+
+    def _worker_cmd(self, script_path, /):
+        return [self.runtime_info.path, *self._runtime_args(), f'--allow-fs-read={script_path}', script_path], None
 
-        cmd = [self.runtime_info.path, *args, *self._ARGS]
+    def _run_js_runtime(self, stdin: str, /) -> str:
+        cmd = [self.runtime_info.path, *self._runtime_args(), *self._ARGS]
         self.logger.debug(f'Running node: {shlex.join(cmd)}')
         with Popen(
             cmd,
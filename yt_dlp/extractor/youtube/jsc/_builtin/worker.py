@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import collections
+import contextlib
+import json
+import queue
+import subprocess
+import threading
+import time
+
+from yt_dlp.extractor.youtube.jsc.provider import JsChallengeProviderError
+from yt_dlp.utils import Popen
+
+# Appended to the challenge solver scripts. Runs with node, deno and bun.
+# Each message is a JSON document, preceded by its length in bytes on a line of its own.
+# The preprocessed players are kept in memory, so that each player is only parsed once
+WORKER_SCRIPT = '''
+import { Buffer } from 'node:buffer';
+import process from 'node:process';
+
+const MAX_PLAYERS = 8;
+const players = new Map();
+
+function send(message) {
+  const data = Buffer.from(JSON.stringify(message));
+  process.stdout.write(`${data.length}\\n`);
+  process.stdout.write(data);
+}
+
+function solve(message) {
+  const preprocessed = players.get(message.player_url);
+  let input;
+  if (preprocessed !== undefined) {
+    players.delete(message.player_url);
+    players.set(message.player_url, preprocessed);
+    input = { type: 'preprocessed', preprocessed_player: preprocessed, requests: message.requests };
+  } else if (message.player == null) {
+    return { type: 'missing_player' };
+  } else {
+    input = { type: 'player', player: message.player, requests: message.requests, output_preprocessed: true };
+  }
+  let output;
+  try {
+    output = jsc(input);
+  } catch (error) {
+    return { type: 'error', error: String(error && error.stack || error) };
+  }
+  if (output.preprocessed_player !== undefined) {
+    players.set(message.player_url, output.preprocessed_player);
+    if (players.size > MAX_PLAYERS) {
+      players.delete(players.keys().next().value);
+    }
+    delete output.preprocessed_player;
+  }
+  return output;
+}
+
+let chunks = [];
+let buffered = 0;
+let expected = null;
+
+process.stdin.on('data', (chunk) => {
+  chunks.push(chunk);
+  buffered += chunk.length;
+  while (true) {
+    if (expected === null) {
+      const data = Buffer.concat(chunks, buffered);
+      const newline = data.indexOf(10);
+      if (newline === -1) {
+        chunks = [data];
+        break;
+      }
+      expected = Number(data.subarray(0, newline).toString());
+      chunks = [data.subarray(newline + 1)];
+      buffered = chunks[0].length;
+    }
+    if (buffered < expected) {
+      break;
+    }
+    const data = Buffer.concat(chunks, buffered);
+    const message = JSON.parse(data.subarray(0, expected).toString());
+    chunks = [data.subarray(expected)];
+    buffered = chunks[0].length;
+    expected = null;
+    send(message.type === 'ping' ? { type: 'pong' } : solve(message));
+  }
+});
+process.stdin.on('end', () => process.exit(0));
+'''
+
+
+class JsRuntimeWorkerError(JsChallengeProviderError):
+    """The worker process crashed or did not respond in time"""
+
+
+class JsRuntimeWorker:
+    """
+    A long-lived JS runtime process that runs WORKER_SCRIPT
+
+    `players` holds the urls of the players that the process is known to have
+    loaded. The process may have evicted them since, so this is only a hint
+    """
+
+    def __init__(self, cmd: list[str], env: dict[str, str] | None = None):
+        self._proc = Popen(
+            cmd, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self._responses = queue.Queue()
+        self._stderr = collections.deque(maxlen=20)
+        self.players = set()
+        self.last_used = time.monotonic()
+        threading.Thread(target=self._read_stdout, daemon=True).start()
+        threading.Thread(target=self._read_stderr, daemon=True).start()
+
+    def _read_stdout(self):
+        stdout = self._proc.stdout
+        try:
+            while header := stdout.readline():
+                self._responses.put(json.loads(stdout.read(int(header))))
+        except (OSError, ValueError):
+            pass
+        self._responses.put(None)
+
+    def _read_stderr(self):
+        with contextlib.suppress(OSError, ValueError):
+            for line in self._proc.stderr:
+                self._stderr.append(line.decode(errors='replace').rstrip())
+
+    def is_alive(self) -> bool:
+        return self._proc.poll() is None
+
+    def request(self, message: dict, timeout: float) -> dict:
+        data = json.dumps(message).encode()
+        try:
+            self._proc.stdin.write(b'%d\n' % len(data) + data)
+            self._proc.stdin.flush()
+            response = self._responses.get(timeout=timeout)
+        except OSError:
+            response = None
+        except queue.Empty:
+            self.close()
+            raise JsRuntimeWorkerError(f'Worker process did not respond within {timeout} seconds')
+        self.last_used = time.monotonic()
+        if response is None:
+            self.close()
+            msg = f'Worker process exited unexpectedly (returncode: {self._proc.returncode})'
+            if self._stderr:
+                msg = f'{msg}: {" ".join(self._stderr)}'
+            raise JsRuntimeWorkerError(msg)
+        return response
+
+    def ping(self, timeout: float) -> bool:
+        try:
+            return self.request({'type': 'ping'}, timeout)['type'] == 'pong'
+        except JsRuntimeWorkerError:
+            return False
+
+    def close(self):
+        with contextlib.suppress(OSError):
+            self._proc.stdin.close()
+        try:
+            self._proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+            self._proc.wait()
+
+
+class JsRuntimeWorkerPool:
+    """
+    Starts up to `size` workers using `create_worker`, on demand
+
+    Workers that crashed are replaced, and workers that have been idle for
+    HEALTH_CHECK_INTERVAL seconds are pinged before they are used again
+    """
+
+    HEALTH_CHECK_INTERVAL = 60
+    HEALTH_CHECK_TIMEOUT = 10
+
+    def __init__(self, create_worker, size: int):
+        self._create_worker = create_worker
+        self._size = size
+        self._idle: list[JsRuntimeWorker] = []
+        self._count = 0
+        self._cond = threading.Condition()
+        self._closed = False
+
+    @contextlib.contextmanager
+    def worker(self, player_url: str | None = None):
+        """Use a worker, preferring one that has already loaded the player"""
+        worker = self._acquire(player_url)
+        try:
+            yield worker
+        finally:
+            self._release(worker)
+
+    def _acquire(self, player_url):
+        with self._cond:
+            while not self._closed and not self._idle and self._count >= self._size:
+                self._cond.wait()
+            if self._closed:
+                raise JsRuntimeWorkerError('Worker pool is closed')
+            worker = None
+            if self._idle:
+                worker = next((w for w in self._idle if player_url in w.players), self._idle[-1])
+                self._idle.remove(worker)
+            else:
+                self._count += 1
+
+        if worker is not None and self._is_healthy(worker):
+            return worker
+        if worker is not None:
+            worker.close()
+        try:
+            return self._create_worker()
+        except BaseException:
+            with self._cond:
+                self._count -= 1
+                self._cond.notify()
+            raise
+
+    def _is_healthy(self, worker):
+        if not worker.is_alive():
+            return False
+        if time.monotonic() - worker.last_used < self.HEALTH_CHECK_INTERVAL:
+            return True
+        return worker.ping(self.HEALTH_CHECK_TIMEOUT)
+
+    def _release(self, worker):
+        with self._cond:
+            if worker.is_alive() and not self._closed:
+                self._idle.append(worker)
+                worker = None
+            else:
+                self._count -= 1
+            self._cond.notify()
+        if worker is not None:
+            worker.close()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._count -= len(idle)
+            self._cond.notify_all()
+        for worker in idle:
+            worker.close()
@@ -2,13 +2,19 @@
 
 import collections
 import dataclasses
+import hashlib
+import time
 import typing
+import urllib.parse
 
 from yt_dlp.extractor.youtube.jsc._builtin.ejs import _EJS_WIKI_URL
 from yt_dlp.extractor.youtube.jsc._registry import (
+    _jsc_cache_provider_preferences,
+    _jsc_cache_providers,
     _jsc_preferences,
     _jsc_providers,
 )
+from yt_dlp.extractor.youtube.jsc.cache import JsChallengeCacheProvider, JsChallengeCacheProviderError
 from yt_dlp.extractor.youtube.jsc.provider import (
     JsChallengeProvider,
     JsChallengeProviderError,
@@ -34,15 +40,107 @@
     from collections.abc import Iterable
 
     from yt_dlp.extractor.youtube.jsc._builtin.ejs import _SkippedComponent
+    from yt_dlp.extractor.youtube.jsc.cache import CacheProviderPreference
     from yt_dlp.extractor.youtube.jsc.provider import Preference as JsChallengePreference
 
 
+_OUTPUT_TYPES = {
+    JsChallengeType.N: NChallengeOutput,
+    JsChallengeType.SIG: SigChallengeOutput,
+}
+
+
+class JsChallengeCache:
+    """
+    Cache of the results of solved challenges, keyed by player, challenge type and challenge.
+
+    A player never changes once it is released, so results are only expired
+    to drop those of players that have been rotated out.
+    """
+
+    DEFAULT_TTL = 60 * 60 * 24 * 3
+
+    def __init__(
+        self,
+        logger: IEContentProviderLogger,
+        cache_providers: list[JsChallengeCacheProvider],
+        cache_provider_preferences: list[CacheProviderPreference] | None = None,
+    ):
+        self.cache_providers: dict[str, JsChallengeCacheProvider] = {
+            provider.PROVIDER_KEY: provider for provider in (cache_providers or [])}
+        self.cache_provider_preferences: list[CacheProviderPreference] = cache_provider_preferences or []
+        self.logger = logger
+
+    def _get_cache_providers(self, request: JsChallengeRequest) -> list[JsChallengeCacheProvider]:
+        """Sorts available cache providers by preference, given a request"""
+        preferences = {
+            provider: sum(pref(provider, request) for pref in self.cache_provider_preferences)
+            for provider in self.cache_providers.values()
+        }
+        return [
+            provider for provider in sorted(
+                self.cache_providers.values(), key=preferences.get, reverse=True) if provider.is_available()]
+
+    @staticmethod
+    def _generate_key(request: JsChallengeRequest, challenge: str) -> str:
+        # The player path includes the player id, which is a hash of the player JS
+        player_path = urllib.parse.urlparse(request.input.player_url).path
+        bindings = {'_dlp_cache': 'v1', 'player': player_path, 'type': request.type.value, 'challenge': challenge}
+        return hashlib.sha256(repr(bindings).encode()).hexdigest()
+
+    def _handle_error(self, e: Exception, provider: JsChallengeCacheProvider):
+        if isinstance(e, JsChallengeCacheProviderError):
+            self.logger.warning(
+                f'Error from "{provider.PROVIDER_NAME}" JS Challenge cache provider: '
+                f'{e!r}{provider_bug_report_message(provider) if not e.expected else ""}')
+        else:
+            self.logger.error(
+                f'Error occurred with "{provider.PROVIDER_NAME}" JS Challenge cache provider: '
+                f'{e!r}{provider_bug_report_message(provider)}')
+
+    def get(self, request: JsChallengeRequest) -> dict[str, str]:
+        """Return the cached results of the challenges of the request"""
+        results = {}
+        providers = self._get_cache_providers(request)
+        for challenge in request.input.challenges:
+            key = self._generate_key(request, challenge)
+            for provider in providers:
+                try:
+                    result = provider.get(key)
+                except Exception as e:
+                    self._handle_error(e, provider)
+                    continue
+                if isinstance(result, str):
+                    results[challenge] = result
+                    break
+        if results:
+            self.logger.trace(
+                f'Retrieved {len(results)} of {len(request.input.challenges)} {request.type.value} '
+                f'challenge results from cache')
+        return results
+
+    def store(self, request: JsChallengeRequest, response: JsChallengeResponse):
+        expires_at = int(time.time()) + self.DEFAULT_TTL
+        for provider in self._get_cache_providers(request):
+            for challenge, result in response.output.results.items():
+                try:
+                    provider.store(self._generate_key(request, challenge), result, expires_at)
+                except Exception as e:
+                    self._handle_error(e, provider)
+                    break
+
+    def close(self):
+        for provider in self.cache_providers.values():
+            provider.close()
+
+
 class JsChallengeRequestDirector:
 
-    def __init__(self, logger: IEContentProviderLogger):
+    def __init__(self, logger: IEContentProviderLogger, cache: JsChallengeCache | None = None):
         self.providers: dict[str, JsChallengeProvider] = {}
         self.preferences: list[JsChallengePreference] = []
         self.logger = logger
+        self.cache = cache
 
     def register_provider(self, provider: JsChallengeProvider):
         self.providers[provider.PROVIDER_KEY] = provider
@@ -92,14 +190,42 @@ def _handle_error(self, e: Exception, provider: JsChallengeProvider, requests: l
                 f'         requests = {requests}\n'
                 f'         {provider_bug_report_message(provider, before="")}', cause=e)
 
+    def _get_cached_results(self, requests: list[JsChallengeRequest]):
+        """Split the requests into responses from the cache and requests for the remaining challenges"""
+        results, next_requests = [], []
+        for request in requests:
+            cached = self.cache.get(request) if self.cache else {}
+            if not cached:
+                next_requests.append(request)
+                continue
+            cached_request = dataclasses.replace(
+                request, input=dataclasses.replace(request.input, challenges=list(cached)))
+            cached_response = JsChallengeResponse(request.type, _OUTPUT_TYPES[request.type](cached))
+            if (vr_msg := validate_response(cached_response, cached_request)) is not True:
+                self.logger.warning(f'Invalid JS Challenge response retrieved from cache: {vr_msg or ""}')
+                next_requests.append(request)
+                continue
+            results.append((cached_request, cached_response))
+            if remaining := [challenge for challenge in request.input.challenges if challenge not in cached]:
+                next_requests.append(dataclasses.replace(
+                    request, input=dataclasses.replace(request.input, challenges=remaining)))
+        return results, next_requests
+
     def bulk_solve(self, requests: list[JsChallengeRequest]) -> list[tuple[JsChallengeRequest, JsChallengeResponse]]:
-        """Solves multiple JS Challenges in bulk, returning a list of responses"""
+        """
+        Solves multiple JS Challenges in bulk, returning a list of responses
+
+        Challenges that were solved before are answered from the cache. Their responses
+        are for a copy of the request, with only the challenges that were found
+        """
+        results, next_requests = self._get_cached_results(requests)
+        if not next_requests:
+            self.logger.trace(f'Found all {len(requests)} requested JS Challenges in cache')
+            return results
+
         if not self.providers:
             self.logger.trace('No JS Challenge providers registered')
-            return []
-
-        results = []
-        next_requests = requests[:]
+            return results
 
         skipped_components = []
         for provider in self._get_providers(next_requests):
@@ -134,6 +260,8 @@ def bulk_solve(self, requests: list[JsChallengeRequest]) -> list[tuple[JsChallen
                             f'         {provider_bug_report_message(provider, before="")}')
                         continue
                     results.append((response.request, response.response))
+                    if self.cache:
+                        self.cache.store(response.request, response.response)
             except Exception as e:
                 if isinstance(e, JsChallengeProviderRejectedRequest) and e._skipped_components:
                     skipped_components.extend(e._skipped_components)
@@ -143,9 +271,8 @@ def bulk_solve(self, requests: list[JsChallengeRequest]) -> list[tuple[JsChallen
         if skipped_components:
             self.__report_skipped_components(skipped_components)
 
-        if len(results) != len(requests):
-            self.logger.trace(
-                f'Not all JS Challenges were solved, expected {len(requests)} responses, got {len(results)}')
+        if next_requests:
+            self.logger.trace('Not all JS Challenges were solved')
             self.logger.trace(f'Unsolved requests: {next_requests}')
         else:
             self.logger.trace(f'Solved all {len(requests)} requested JS Challenges')
@@ -197,6 +324,8 @@ def join_parts(parts, joiner):
     def close(self):
         for provider in self.providers.values():
             provider.close()
+        if self.cache:
+            self.cache.close()
 
 
 EXTRACTOR_ARG_PREFIX = 'youtubejsc'
@@ -222,8 +351,20 @@ def get_provider_logger_and_settings(provider, logger_key):
             YoutubeIEContentProviderLogger(ie, logger_prefix, log_level=log_level),
             ie.get_param('extractor_args', {}).get(extractor_key, {}))
 
+    cache_providers = []
+    for cache_provider in _jsc_cache_providers.value.values():
+        logger, settings = get_provider_logger_and_settings(cache_provider, 'jsc:cache')
+        cache_providers.append(cache_provider(ie, logger, settings))
+
+    cache = JsChallengeCache(
+        logger=YoutubeIEContentProviderLogger(ie, 'jsc:cache', log_level=log_level),
+        cache_providers=cache_providers,
+        cache_provider_preferences=list(_jsc_cache_provider_preferences.value),
+    )
+
     director = JsChallengeRequestDirector(
         logger=YoutubeIEContentProviderLogger(ie, 'jsc', log_level=log_level),
+        cache=cache,
     )
 
     ie._downloader.add_close_hook(director.close)
@@ -238,7 +379,9 @@ def get_provider_logger_and_settings(provider, logger_key):
     if director.logger.log_level <= director.logger.LogLevel.DEBUG:
         # calling is_available() for every JS Challenge provider upfront may have some overhead
         director.logger.debug(f'JS Challenge Providers: {provider_display_list(director.providers.values())}')
+        director.logger.debug(f'JS Challenge Cache Providers: {provider_display_list(cache.cache_providers.values())}')
         director.logger.trace(f'Registered {len(director.preferences)} JS Challenge provider preferences')
+        director.logger.trace(f'Registered {len(cache.cache_provider_preferences)} cache provider preferences')
 
     return director
 
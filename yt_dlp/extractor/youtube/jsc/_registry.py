@@ -2,3 +2,5 @@
 
 _jsc_providers = Indirect({})
 _jsc_preferences = Indirect(set())
+_jsc_cache_providers = Indirect({})
+_jsc_cache_provider_preferences = Indirect(set())
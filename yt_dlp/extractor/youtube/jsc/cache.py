@@ -0,0 +1,69 @@
+"""PUBLIC API"""
+
+from __future__ import annotations
+
+import abc
+import typing
+
+from yt_dlp.extractor.youtube.jsc._registry import (
+    _jsc_cache_provider_preferences,
+    _jsc_cache_providers,
+)
+from yt_dlp.extractor.youtube.jsc.provider import JsChallengeRequest
+from yt_dlp.extractor.youtube.pot._provider import (
+    IEContentProvider,
+    IEContentProviderError,
+    register_preference_generic,
+    register_provider_generic,
+)
+
+__all__ = [
+    'JsChallengeCacheProvider',
+    'JsChallengeCacheProviderError',
+    'register_preference',
+    'register_provider',
+]
+
+
+class JsChallengeCacheProviderError(IEContentProviderError):
+    """An error occurred while accessing the cache"""
+
+
+class JsChallengeCacheProvider(IEContentProvider, abc.ABC, suffix='JCCP'):
+    """Stores the results of solved JS Challenges, so that they can be shared (e.g. between processes)"""
+
+    @abc.abstractmethod
+    def get(self, key: str) -> str | None:
+        pass
+
+    @abc.abstractmethod
+    def store(self, key: str, value: str, expires_at: int):
+        pass
+
+    @abc.abstractmethod
+    def delete(self, key: str):
+        pass
+
+
+def register_provider(provider: type[JsChallengeCacheProvider]):
+    """Register a JsChallengeCacheProvider class"""
+    return register_provider_generic(
+        provider=provider,
+        base_class=JsChallengeCacheProvider,
+        registry=_jsc_cache_providers.value,
+    )
+
+
+def register_preference(
+        *providers: type[JsChallengeCacheProvider]) -> typing.Callable[[CacheProviderPreference], CacheProviderPreference]:
+    """Register a preference for a JsChallengeCacheProvider"""
+    return register_preference_generic(
+        JsChallengeCacheProvider,
+        _jsc_cache_provider_preferences.value,
+        *providers,
+    )
+
+
+if typing.TYPE_CHECKING:
+    CacheProviderPreference = typing.Callable[[JsChallengeCacheProvider, JsChallengeRequest], int]
+    __all__.append('CacheProviderPreference')
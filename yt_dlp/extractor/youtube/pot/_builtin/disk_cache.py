@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import time
+
+from yt_dlp.extractor.youtube.pot._provider import BuiltinIEContentProvider
+from yt_dlp.extractor.youtube.pot.cache import (
+    PoTokenCacheProvider,
+    register_preference,
+    register_provider,
+)
+from yt_dlp.extractor.youtube.pot.provider import PoTokenRequest
+
+
+@register_provider
+class DiskPCP(PoTokenCacheProvider, BuiltinIEContentProvider):
+    """Store PO Tokens in the yt-dlp cache directory, which can be shared between processes"""
+    PROVIDER_NAME = 'disk'
+    _CACHE_SECTION = 'youtube-pot'
+
+    def is_available(self) -> bool:
+        return self.ie.cache.enabled
+
+    def get(self, key: str) -> str | None:
+        # Expired entries are discarded by the cache
+        return self.ie.cache.load(self._CACHE_SECTION, key)
+
+    def store(self, key: str, value: str, expires_at: int):
+        ttl = expires_at - time.time()
+        if ttl <= 0:
+            return
+        # Writes are atomic, so concurrent processes see either the old or the new entry
+        self.ie.cache.store(self._CACHE_SECTION, key, value, ttl=ttl)
+
+    def delete(self, key: str):
+        self.ie.cache.store(self._CACHE_SECTION, key, None)
+
+
+@register_preference(DiskPCP)
+def disk_cache_preference(provider: PoTokenCacheProvider, request: PoTokenRequest) -> int:
+    # Below the memory cache, so that the disk is only read on a memory cache miss
+    return 100
@@ -1,10 +1,13 @@
 import collections
 import contextlib
+import functools
+import hashlib
 import itertools
 import json
 import math
 import operator
 import re
+import threading
 
 from .utils import (
     NO_DEFAULT,
@@ -198,6 +201,63 @@ def js_number_to_string(val: float, radix: int = 10):
 _QUOTES = '\'"/'
 _NESTED_BRACKETS = r'[^[\]]+(?:\[[^[\]]+(?:\[[^\]]+\])?\])?'
 
+# Parsed sub-expressions are cached, so that evaluating a function repeatedly
+# (e.g. in a loop) does not tokenize its body every time. Longer expressions,
+# such as whole function bodies or the rest of a player, are not cached so
+# that the caches cannot keep large sources alive. Most of the time is spent
+# on the short statements, so the cache must hold all of those of a function;
+# see devscripts/benchmark_jsinterp.py
+_PARSE_CACHE_SIZE = 8192
+_MAX_CACHED_EXPR_LENGTH = 256
+
+
+def _parse_cache(func):
+    cached_func = functools.lru_cache(maxsize=_PARSE_CACHE_SIZE)(func)
+
+    @functools.wraps(func)
+    def wrapper(*args):
+        if any(isinstance(arg, str) and len(arg) > _MAX_CACHED_EXPR_LENGTH for arg in args):
+            return func(*args)
+        return cached_func(*args)
+
+    wrapper.cache_info, wrapper.cache_clear = cached_func.cache_info, cached_func.cache_clear
+    return wrapper
+
+
+@_parse_cache
+def _js_to_json(code):
+    return js_to_json(code, strict=True)
+
+
+_STATEMENT_RE = re.compile(r'(?P<var>(?:var|const|let)\s)|return(?:\s+|(?=["\'])|$)|(?P<throw>throw\s+)')
+_CONTROL_FLOW_RE = re.compile(r'''(?x)
+    (?P<try>try)\s*\{|
+    (?P<if>if)\s*\(|
+    (?P<switch>switch)\s*\(|
+    (?P<for>for)\s*\(
+    ''')
+_ASSIGNMENT_RE = re.compile(fr'''(?x)
+    (?P<out>{_NAME_RE})(?:\[(?P<index>{_NESTED_BRACKETS})\])?\s*
+    (?P<op>{"|".join(map(re.escape, set(_OPERATORS) - _COMP_OPERATORS))})?
+    =(?!=)(?P<expr>.*)$
+    ''')
+_INCREMENT_RE = re.compile(rf'''(?x)
+    (?P<pre_sign>\+\+|--)(?P<var1>{_NAME_RE})|
+    (?P<var2>{_NAME_RE})(?P<post_sign>\+\+|--)''')
+_EXPRESSION_RE = re.compile(fr'''(?x)
+    (?P<return>
+        (?!if|return|true|false|null|undefined|NaN)(?P<name>{_NAME_RE})$
+    )|(?P<attribute>
+        (?P<var>{_NAME_RE})(?:
+            (?P<nullish>\?)?\.(?P<member>[^(]+)|
+            \[(?P<member2>{_NESTED_BRACKETS})\]
+        )\s*
+    )|(?P<indexing>
+        (?P<in>{_NAME_RE})\[(?P<idx>.+)\]$
+    )|(?P<function>
+        (?P<fname>{_NAME_RE})\((?P<args>.*)\)$
+    )''')
+
 
 class JS_Undefined:
     pass
@@ -284,8 +344,13 @@ class JSInterpreter:
         'y': 4096,  # Perform a "sticky" search that matches starting at the current position in the target string
     }
 
+    _FUNCTION_CODE_CACHE_SIZE = 64
+    _function_code_cache = collections.OrderedDict()
+    _function_code_lock = threading.Lock()
+
     def __init__(self, code, objects=None):
         self.code, self._functions = code, {}
+        self._code_digest = None
         self._objects = {} if objects is None else objects
         self._undefined_varnames = set()
 
@@ -315,10 +380,12 @@ def _regex_flags(cls, expr):
         return flags, expr[idx + 1:]
 
     @staticmethod
+    @_parse_cache
     def _separate(expr, delim=',', max_split=None):
         OP_CHARS = '+-*/%&|^=<>!,;{}:['
         if not expr:
-            return
+            return ()
+        separated = []
         counters = dict.fromkeys(_MATCHING_PARENS.values(), 0)
         start, splits, pos, delim_len = 0, 0, 0, len(delim) - 1
         in_quote, escaping, after_op, in_regex_char_group = None, False, True, False
@@ -346,22 +413,42 @@ def _separate(expr, delim=',', max_split=None):
             elif pos != delim_len:
                 pos += 1
                 continue
-            yield expr[start: idx - delim_len]
+            separated.append(expr[start: idx - delim_len])
             start, pos = idx + 1, 0
             splits += 1
             if max_split and splits >= max_split:
                 break
-        yield expr[start:]
+        separated.append(expr[start:])
+        return tuple(separated)
 
     @classmethod
     def _separate_at_paren(cls, expr, delim=None):
         if delim is None:
             delim = expr and _MATCHING_PARENS[expr[0]]
-        separated = list(cls._separate(expr, delim, 1))
+        separated = cls._separate(expr, delim, 1)
         if len(separated) < 2:
             raise cls.Exception(f'No terminating paren {delim}', expr)
         return separated[0][1:].strip(), separated[1].strip()
 
+    @classmethod
+    @_parse_cache
+    def _separate_at_operator(cls, expr):
+        """ @returns op, left_expr, right_expr for the operator with the lowest precedence, or None """
+        for op in _OPERATORS:
+            separated = list(cls._separate(expr, op))
+            right_expr = separated.pop()
+            while True:
+                if op in '?<>*-' and len(separated) > 1 and not separated[-1].strip():
+                    separated.pop()
+                elif not (separated and op == '?' and right_expr.startswith('.')):
+                    break
+                right_expr = f'{op}{right_expr}'
+                if op != '-':
+                    right_expr = f'{separated.pop()}{op}{right_expr}'
+            if separated:
+                return op, op.join(separated), right_expr
+        return None
+
     def _operator(self, op, left_val, right_expr, expr, local_vars, allow_recursion):
         if op in ('||', '&&'):
             if (op == '&&') ^ _js_ternary(left_val):
@@ -416,7 +503,7 @@ def interpret_statement(self, stmt, local_vars, allow_recursion=100, _is_var_dec
             if should_return:
                 return ret, should_return
 
-        m = re.match(r'(?P<var>(?:var|const|let)\s)|return(?:\s+|(?=["\'])|$)|(?P<throw>throw\s+)', stmt)
+        m = _STATEMENT_RE.match(stmt)
         if m:
             expr = stmt[len(m.group(0)):].strip()
             if m.group('throw'):
@@ -435,7 +522,7 @@ def interpret_statement(self, stmt, local_vars, allow_recursion=100, _is_var_dec
                 # Avoid https://github.com/python/cpython/issues/74534
                 # inner = re.compile(inner[1:].replace('[[', r'[\['), flags=flags)
             else:
-                inner = json.loads(js_to_json(f'{inner}{expr[0]}', strict=True))
+                inner = json.loads(_js_to_json(f'{inner}{expr[0]}'))
             if not outer:
                 return inner, should_return
             expr = self._named_object(local_vars, inner) + outer
@@ -490,12 +577,7 @@ def dict_item(key, val):
                 for item in self._separate(inner)])
             expr = name + outer
 
-        m = re.match(r'''(?x)
-                (?P<try>try)\s*\{|
-                (?P<if>if)\s*\(|
-                (?P<switch>switch)\s*\(|
-                (?P<for>for)\s*\(
-                ''', expr)
+        m = _CONTROL_FLOW_RE.match(expr)
         md = m.groupdict() if m else {}
         if md.get('if'):
             cndn, expr = self._separate_at_paren(expr[m.end() - 1:])
@@ -613,11 +695,7 @@ def dict_item(key, val):
                     return ret, True
             return ret, False
 
-        m = re.match(fr'''(?x)
-                (?P<out>{_NAME_RE})(?:\[(?P<index>{_NESTED_BRACKETS})\])?\s*
-                (?P<op>{"|".join(map(re.escape, set(_OPERATORS) - _COMP_OPERATORS))})?
-                =(?!=)(?P<expr>.*)$
-            ''', expr)
+        m = _ASSIGNMENT_RE.match(expr)
         if m:  # We are assigning a value to a variable
             left_val = local_vars.get(m.group('out'))
 
@@ -640,9 +718,7 @@ def dict_item(key, val):
                 m.group('op'), self._index(left_val, idx), m.group('expr'), expr, local_vars, allow_recursion)
             return left_val[idx], should_return
 
-        for m in re.finditer(rf'''(?x)
-                (?P<pre_sign>\+\+|--)(?P<var1>{_NAME_RE})|
-                (?P<var2>{_NAME_RE})(?P<post_sign>\+\+|--)''', expr):
+        for m in _INCREMENT_RE.finditer(expr):
             var = m.group('var1') or m.group('var2')
             start, end = m.span()
             sign = m.group('pre_sign') or m.group('post_sign')
@@ -655,19 +731,7 @@ def dict_item(key, val):
         if not expr:
             return None, should_return
 
-        m = re.match(fr'''(?x)
-            (?P<return>
-                (?!if|return|true|false|null|undefined|NaN)(?P<name>{_NAME_RE})$
-            )|(?P<attribute>
-                (?P<var>{_NAME_RE})(?:
-                    (?P<nullish>\?)?\.(?P<member>[^(]+)|
-                    \[(?P<member2>{_NESTED_BRACKETS})\]
-                )\s*
-            )|(?P<indexing>
-                (?P<in>{_NAME_RE})\[(?P<idx>.+)\]$
-            )|(?P<function>
-                (?P<fname>{_NAME_RE})\((?P<args>.*)\)$
-            )''', expr)
+        m = _EXPRESSION_RE.match(expr)
         if expr.isdigit():
             return int(expr), should_return
 
@@ -696,27 +760,17 @@ def dict_item(key, val):
             return ret, should_return
 
         with contextlib.suppress(ValueError):
-            return json.loads(js_to_json(expr, strict=True)), should_return
+            return json.loads(_js_to_json(expr)), should_return
 
         if m and m.group('indexing'):
             val = local_vars[m.group('in')]
             idx = self.interpret_expression(m.group('idx'), local_vars, allow_recursion)
             return self._index(val, idx), should_return
 
-        for op in _OPERATORS:
-            separated = list(self._separate(expr, op))
-            right_expr = separated.pop()
-            while True:
-                if op in '?<>*-' and len(separated) > 1 and not separated[-1].strip():
-                    separated.pop()
-                elif not (separated and op == '?' and right_expr.startswith('.')):
-                    break
-                right_expr = f'{op}{right_expr}'
-                if op != '-':
-                    right_expr = f'{separated.pop()}{op}{right_expr}'
-            if not separated:
-                continue
-            left_val = self.interpret_expression(op.join(separated), local_vars, allow_recursion)
+        separated = self._separate_at_operator(expr)
+        if separated:
+            op, left_expr, right_expr = separated
+            left_val = self.interpret_expression(left_expr, local_vars, allow_recursion)
             return self._operator(op, left_val, right_expr, expr, local_vars, allow_recursion), should_return
 
         if m and m.group('attribute'):
@@ -920,6 +974,26 @@ def extract_object(self, objname, *global_stack):
 
     def extract_function_code(self, funcname):
         """ @returns argnames, code """
+        # Cached by a digest of the code, since site extractors create a new JSInterpreter
+        # for each extraction, and the code itself may be several megabytes
+        if self._code_digest is None:
+            self._code_digest = hashlib.sha256(self.code.encode('utf-8', 'surrogatepass')).digest()
+        key = (self._code_digest, funcname)
+        with self._function_code_lock:
+            cached = self._function_code_cache.get(key)
+            if cached is not None:
+                self._function_code_cache.move_to_end(key)
+        if cached is None:
+            cached = self._extract_function_code(self.code, funcname)
+            with self._function_code_lock:
+                self._function_code_cache[key] = cached
+                if len(self._function_code_cache) > self._FUNCTION_CODE_CACHE_SIZE:
+                    self._function_code_cache.popitem(last=False)
+        argnames, code = cached
+        return list(argnames), code
+
+    @classmethod
+    def _extract_function_code(cls, code, funcname):
         func_m = re.search(
             r'''(?xs)
                 (?:
@@ -929,11 +1003,11 @@ def extract_function_code(self, funcname):
                 )\s*
                 \((?P<args>[^)]*)\)\s*
                 (?P<code>{.+})''' % {'name': re.escape(funcname)},
-            self.code)
+            code)
         if func_m is None:
-            raise self.Exception(f'Could not find JS function "{funcname}"')
-        code, _ = self._separate_at_paren(func_m.group('code'))
-        return [x.strip() for x in func_m.group('args').split(',')], code
+            raise cls.Exception(f'Could not find JS function "{funcname}"')
+        code, _ = cls._separate_at_paren(func_m.group('code'))
+        return tuple(x.strip() for x in func_m.group('args').split(',')), code
 
     def extract_function(self, funcname, *global_stack):
         return function_with_repr(
@@ -960,12 +1034,13 @@ def call_function(self, funcname, *args):
     def build_function(self, argnames, code, *global_stack):
         global_stack = list(global_stack) or [{}]
         argnames = tuple(argnames)
+        code = code.replace('\n', ' ')
 
         def resf(args, kwargs={}, allow_recursion=100):
             global_stack[0].update(itertools.zip_longest(argnames, args, fillvalue=None))
             global_stack[0].update(kwargs)
             var_stack = LocalNameSpace(*global_stack)
-            ret, should_abort = self.interpret_statement(code.replace('\n', ' '), var_stack, allow_recursion - 1)
+            ret, should_abort = self.interpret_statement(code, var_stack, allow_recursion - 1)
             if should_abort:
                 return ret
         return resf
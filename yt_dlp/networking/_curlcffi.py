@@ -223,6 +223,7 @@ def _check_extensions(self, extensions):
         # CurlCFFIRH ignores legacy ssl options currently.
         # Impersonation generally uses a looser SSL configuration than urllib/requests.
         extensions.pop('legacy_ssl', None)
+        extensions.pop('fragment', None)
 
     def send(self, request: Request) -> Response:
         target = self._get_request_target(request)
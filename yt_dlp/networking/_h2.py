@@ -0,0 +1,584 @@
+from __future__ import annotations
+
+import collections
+import contextlib
+import email.message
+import io
+import socket
+import ssl
+import threading
+import time
+import urllib.parse
+import urllib.request
+import urllib.response
+
+from ..dependencies import h2
+from ..utils import int_or_none
+
+if h2 is None:
+    raise ImportError('h2 module is not installed')
+
+h2_version = tuple(int_or_none(x, default=0) for x in h2.__version__.split('.'))
+
+if h2_version < (4, 0):
+    h2._yt_dlp__version = f'{h2.__version__} (unsupported)'
+    raise ImportError('Only h2 >= 4.0 is supported')
+
+import h2.config
+import h2.connection
+import h2.errors
+import h2.events
+import h2.exceptions
+import h2.settings
+
+from ._helper import (
+    add_accept_encoding_header,
+    create_connection,
+    get_redirect_method,
+)
+from ._urllib import CONTENT_DECODE_ERRORS, SUPPORTED_ENCODINGS, HTTPHandler, UrllibRH
+from .common import (
+    Features,
+    Request,
+    RequestHandler,
+    Response,
+    register_preference,
+    register_rh,
+)
+from .exceptions import (
+    CertificateVerifyError,
+    HTTPError,
+    IncompleteRead,
+    RequestError,
+    SSLError,
+    TransportError,
+)
+from ..utils.networking import normalize_url
+
+# Connection-specific headers are not allowed in HTTP/2
+# See: https://datatracker.ietf.org/doc/html/rfc9113#section-8.2.2
+_CONNECTION_HEADERS = {'connection', 'host', 'keep-alive', 'proxy-connection', 'te', 'transfer-encoding', 'upgrade'}
+
+
+class _Stream:
+    def __init__(self, stream_id):
+        self.stream_id = stream_id
+        self.status = None
+        self.headers = None
+        self.buffer = bytearray()
+        self.ended = False
+        self.error = None
+
+
+class TLSConnection:
+    """
+    TLS over a socket, with the TLS state kept in memory
+
+    Unlike with ssl.SSLSocket, one thread can then wait for data from the socket
+    while others send. feed() and encrypt() must be serialized by the caller,
+    and so must send(), in the order of encrypt()
+    """
+
+    def __init__(self, sock, context, server_hostname):
+        self.sock = sock
+        self._incoming = ssl.MemoryBIO()
+        self._outgoing = ssl.MemoryBIO()
+        self._ssl = context.wrap_bio(self._incoming, self._outgoing, server_hostname=server_hostname)
+        while True:
+            try:
+                self._ssl.do_handshake()
+                break
+            except ssl.SSLWantReadError:
+                self._send_outgoing()
+                self.feed(self.recv())
+        self._send_outgoing()
+
+    def selected_alpn_protocol(self):
+        return self._ssl.selected_alpn_protocol()
+
+    def _send_outgoing(self):
+        data = self._outgoing.read()
+        if data:
+            self.sock.sendall(data)
+
+    def recv(self):
+        data = self.sock.recv(1 << 16)
+        if not data:
+            raise ConnectionResetError('Connection closed by the server')
+        return data
+
+    def feed(self, data):
+        """
+        Decrypt the data received from the socket
+        TLS 1.3 may need to respond, e.g. to a key update; this is returned by the next encrypt()
+        """
+        self._incoming.write(data)
+        decrypted = bytearray()
+        with contextlib.suppress(ssl.SSLWantReadError):
+            while True:
+                decrypted += self._ssl.read(1 << 16)
+        return bytes(decrypted)
+
+    def encrypt(self, data):
+        """Return the data to send to the socket"""
+        if data:
+            self._ssl.write(data)
+        return self._outgoing.read()
+
+    def send(self, data):
+        self.sock.sendall(data)
+
+    def close(self):
+        with contextlib.suppress(OSError):
+            self.sock.shutdown(socket.SHUT_RDWR)
+        with contextlib.suppress(OSError):
+            self.sock.close()
+
+
+class HTTP2Connection:
+    """
+    HTTP/2 connection to a host, shared by all the requests to it
+
+    A background thread reads the frames from the socket and passes them to the
+    streams, which are then read by the threads that sent the requests.
+    At most `max_streams` requests are sent at the same time
+    """
+
+    # Large windows, so that the server is not throttled by unread data of other streams
+    _STREAM_WINDOW = 1 << 22
+    _CONNECTION_WINDOW = 1 << 24
+
+    def __init__(self, tls: TLSConnection, max_streams=100):
+        self._tls = tls
+        self._max_streams = max_streams
+        self._cond = threading.Condition()
+        # Sending may block, so it is done outside of _cond
+        self._send_lock = threading.Lock()
+        self._outgoing = collections.deque()
+        self._streams = {}
+        self._error = None
+        self._goaway = False
+        self._conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=True))
+        with self._cond:
+            self._conn.initiate_connection()
+            self._conn.update_settings({
+                h2.settings.SettingCodes.ENABLE_PUSH: 0,
+                h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: self._STREAM_WINDOW,
+            })
+            self._conn.increment_flow_control_window(
+                self._CONNECTION_WINDOW - self._conn.inbound_flow_control_window)
+            self._queue()
+        self._send()
+        self._reader = threading.Thread(target=self._read_frames, name='h2-reader', daemon=True)
+        self._reader.start()
+
+    @property
+    def usable(self):
+        return self._error is None and not self._goaway
+
+    def _queue(self):
+        """Queue the data to send. Must be called with _cond held, and followed by _send() after releasing it"""
+        data = self._tls.encrypt(self._conn.data_to_send())
+        if data:
+            self._outgoing.append(data)
+
+    def _send(self, blocking=True):
+        """
+        Send the queued data, in order
+        If not blocking and another thread is sending, that thread sends it instead
+        """
+        while self._outgoing:
+            if not self._send_lock.acquire(blocking=blocking):
+                return
+            try:
+                while self._outgoing:
+                    self._tls.send(self._outgoing.popleft())
+            finally:
+                self._send_lock.release()
+
+    def _read_frames(self):
+        try:
+            while True:
+                data = self._tls.recv()
+                with self._cond:
+                    for event in self._conn.receive_data(self._tls.feed(data)):
+                        self._handle_event(event)
+                    self._queue()
+                    self._cond.notify_all()
+                # Keep reading while a large request body is being sent
+                self._send(blocking=False)
+        except Exception as e:
+            with self._cond:
+                self._error = e
+                for stream in self._streams.values():
+                    if not stream.ended:
+                        stream.error = stream.error or e
+                self._cond.notify_all()
+            self._tls.close()
+
+    def _handle_event(self, event):
+        if isinstance(event, h2.events.ConnectionTerminated):
+            # Streams up to last_stream_id are still processed by the server
+            self._goaway = True
+            for stream_id, stream in self._streams.items():
+                if not stream.ended and stream_id > (event.last_stream_id or 0):
+                    stream.error = ConnectionResetError(f'Connection closed by the server (error code {event.error_code})')
+            return
+
+        stream = self._streams.get(getattr(event, 'stream_id', None))
+        if stream is None:
+            if isinstance(event, h2.events.DataReceived):
+                self._conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+        elif isinstance(event, h2.events.ResponseReceived):
+            headers = email.message.Message()
+            for name, value in event.headers:
+                if name == b':status':
+                    stream.status = int(value)
+                elif not name.startswith(b':'):
+                    headers.add_header(name.decode('latin-1').title(), value.decode('latin-1'))
+            stream.headers = headers
+        elif isinstance(event, h2.events.DataReceived):
+            stream.buffer += event.data
+            padding = event.flow_controlled_length - len(event.data)
+            if padding:
+                self._conn.acknowledge_received_data(padding, event.stream_id)
+        elif isinstance(event, h2.events.StreamEnded):
+            stream.ended = True
+        elif isinstance(event, h2.events.StreamReset):
+            stream.error = ConnectionResetError(f'Stream reset by the server (error code {event.error_code})')
+
+    def _wait(self, predicate, timeout):
+        if not self._cond.wait_for(predicate, timeout):
+            raise TimeoutError('timed out')
+
+    def _check(self, stream=None):
+        if stream is not None and stream.error is not None:
+            raise stream.error
+        if self._error is not None:
+            raise self._error
+
+    def send_request(self, method, url, headers, data, timeout):
+        """Send the request and return its stream"""
+        parsed_url = urllib.parse.urlsplit(url)
+        request_headers = [
+            (b':method', method.encode()),
+            (b':scheme', parsed_url.scheme.encode()),
+            (b':authority', parsed_url.netloc.rpartition('@')[2].encode()),
+            (b':path', (urllib.parse.urlunsplit(('', '', parsed_url.path or '/', parsed_url.query, '')).encode())),
+        ]
+        for name, value in headers.items():
+            if name.lower() not in _CONNECTION_HEADERS:
+                request_headers.append((name.lower().encode(), str(value).encode('latin-1')))
+
+        with self._cond:
+            self._wait(lambda: not self.usable or self._conn.open_outbound_streams < min(
+                self._max_streams, self._conn.remote_settings.max_concurrent_streams), timeout)
+            if self._goaway:
+                raise ConnectionResetError('Connection closed by the server')
+            self._check()
+            stream = _Stream(self._conn.get_next_available_stream_id())
+            self._streams[stream.stream_id] = stream
+            self._conn.send_headers(stream.stream_id, request_headers, end_stream=not data)
+            self._queue()
+        self._send()
+
+        data = memoryview(data or b'')
+        while data:
+            with self._cond:
+                self._wait(lambda: (
+                    not self.usable or stream.error
+                    or self._conn.local_flow_control_window(stream.stream_id) > 0), timeout)
+                self._check(stream)
+                size = min(
+                    len(data), self._conn.local_flow_control_window(stream.stream_id),
+                    self._conn.max_outbound_frame_size)
+                self._conn.send_data(stream.stream_id, data[:size].tobytes(), end_stream=size == len(data))
+                data = data[size:]
+                self._queue()
+            self._send()
+        return stream
+
+    def get_response(self, stream, timeout):
+        """Wait for the response headers of the stream. Returns (status, headers)"""
+        with self._cond:
+            self._wait(lambda: stream.headers is not None or stream.error or self._error, timeout)
+            if stream.headers is None:
+                self._check(stream)
+            return stream.status, stream.headers
+
+    def read(self, stream, amt, timeout):
+        with self._cond:
+            self._wait(lambda: stream.buffer or stream.ended or stream.error or self._error, timeout)
+            if stream.buffer:
+                data = bytes(stream.buffer[:amt])
+                del stream.buffer[:amt]
+                self._conn.acknowledge_received_data(len(data), stream.stream_id)
+                self._queue()
+            else:
+                self._check(stream)
+                return b''
+        self._send()
+        return data
+
+    def close_stream(self, stream):
+        with self._cond:
+            self._streams.pop(stream.stream_id, None)
+            if stream.ended or stream.error or self._error:
+                return
+            with contextlib.suppress(h2.exceptions.H2Error, ssl.SSLError):
+                self._conn.reset_stream(stream.stream_id, h2.errors.ErrorCodes.CANCEL)
+                self._queue()
+        with contextlib.suppress(OSError):
+            self._send()
+
+    def close(self):
+        with self._cond:
+            with contextlib.suppress(h2.exceptions.H2Error, ssl.SSLError):
+                self._conn.close_connection()
+                self._queue()
+            self._goaway = True
+        with contextlib.suppress(OSError):
+            self._send()
+        self._tls.close()
+
+
+class H2ResponseReader(io.RawIOBase):
+    def __init__(self, connection, stream, timeout, expected_length=None):
+        self._connection = connection
+        self._stream = stream
+        self._timeout = timeout
+        self._expected_length = expected_length
+        self._decoded = None
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def _read(self, size):
+        data = self._connection.read(self._stream, size, self._timeout)
+        self.bytes_read += len(data)
+        if not data and self._expected_length is not None and self.bytes_read < self._expected_length:
+            raise IncompleteRead(partial=self.bytes_read, expected=self._expected_length)
+        return data
+
+    def decode(self, encodings):
+        """Read and decode the whole body, as the urllib handler does"""
+        data = b''.join(iter(lambda: self._read(1 << 20), b''))
+        for encoding in encodings:
+            if encoding == 'gzip':
+                data = HTTPHandler.gz(data)
+            elif encoding == 'deflate':
+                data = HTTPHandler.deflate(data)
+            elif encoding == 'br' and 'br' in SUPPORTED_ENCODINGS:
+                data = HTTPHandler.brotli(data)
+        self._decoded = io.BytesIO(data)
+
+    def readinto(self, buffer):
+        if self._decoded is not None:
+            size = self._decoded.readinto(buffer)
+        else:
+            data = self._read(len(buffer))
+            size = len(data)
+            buffer[:size] = data
+        if not size:
+            self.close()
+        return size
+
+    def close(self):
+        if not self.closed:
+            self._connection.close_stream(self._stream)
+        super().close()
+
+
+class H2ResponseAdapter(Response):
+    def __init__(self, reader: H2ResponseReader, url, headers, status):
+        super().__init__(fp=reader, url=url, headers=headers, status=status)
+
+    def read(self, amt=None):
+        if self.closed:
+            return b''
+        try:
+            data = self.fp.read(-1 if amt is None else amt)
+            if self.fp.closed or (not data and amt != 0):
+                self.close()
+            return data
+        except RequestError:
+            self.close()
+            raise
+        except Exception as e:
+            self.close()
+            raise TransportError(cause=e) from e
+
+
+@register_rh
+class H2RH(RequestHandler):
+    """HTTP/2 RequestHandler, using h2
+    https://github.com/python-hyper/h2
+
+    Requests to the same host are multiplexed over one connection.
+    Hosts that do not support HTTP/2 are requested through the urllib handler instead
+
+    @param max_concurrent_streams: Maximum number of requests to send over a connection at the same time.
+    """
+    _SUPPORTED_URL_SCHEMES = ('https',)
+    _SUPPORTED_PROXY_SCHEMES = ()
+    _SUPPORTED_FEATURES = (Features.NO_PROXY,)
+    RH_NAME = 'h2'
+
+    _MAX_REDIRECTS = 10
+
+    def __init__(self, *, max_concurrent_streams: int = 100, **kwargs):
+        super().__init__(**kwargs)
+        self.max_concurrent_streams = max_concurrent_streams
+        self._lock = threading.Lock()
+        self._connections = {}
+        self._connection_locks = {}
+        self._http1_hosts = set()
+        self._urllib_handler = UrllibRH(**kwargs)
+        self._urllib_handler.connection_stats = self.connection_stats
+
+    def close(self):
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for connection in connections:
+            connection.close()
+        self._urllib_handler.close()
+
+    def _check_extensions(self, extensions):
+        super()._check_extensions(extensions)
+        extensions.pop('cookiejar', None)
+        extensions.pop('timeout', None)
+        extensions.pop('legacy_ssl', None)
+        extensions.pop('fragment', None)
+
+    def _prepare_headers(self, _, headers):
+        add_accept_encoding_header(headers, SUPPORTED_ENCODINGS)
+
+    @staticmethod
+    def _host_key(url):
+        parsed_url = urllib.parse.urlsplit(url)
+        return parsed_url.hostname, parsed_url.port or 443
+
+    def is_http1_host(self, url):
+        """Whether the host of the url is known to not support HTTP/2"""
+        return self._host_key(url) in self._http1_hosts
+
+    def _connect(self, host, port, timeout, legacy_ssl_support):
+        timings = {}
+        sock = create_connection(
+            (host, port), timeout=timeout,
+            source_address=(self.source_address, 0) if self.source_address else None,
+            dns_cache=self.dns_cache, happy_eyeballs=self.happy_eyeballs,
+            _timings=timings)
+        try:
+            context = self._make_sslcontext(legacy_ssl_support=legacy_ssl_support)
+            context.set_alpn_protocols(['h2', 'http/1.1'])
+            start = time.perf_counter()
+            tls = TLSConnection(sock, context, host)
+            timings['tls'] = time.perf_counter() - start
+        except BaseException:
+            sock.close()
+            raise
+        if tls.selected_alpn_protocol() != 'h2':
+            tls.close()
+            return None, timings
+        sock.settimeout(None)  # Timeouts are handled per request
+        return HTTP2Connection(tls, self.max_concurrent_streams), timings
+
+    def _get_connection(self, url, timeout, legacy_ssl_support):
+        """Return (connection, timings of the new connection or None). The connection is None for HTTP/1.1 hosts"""
+        key = (*self._host_key(url), legacy_ssl_support)
+        with self._lock:
+            lock = self._connection_locks.setdefault(key, threading.Lock())
+        with lock:
+            connection = self._connections.get(key)
+            if connection is not None and connection.usable:
+                return connection, None
+            connection, timings = self._connect(*key[:2], timeout, legacy_ssl_support)
+            with self._lock:
+                if connection is None:
+                    self._http1_hosts.add(key[:2])
+                    self._connections.pop(key, None)
+                else:
+                    self._connections[key] = connection
+            return connection, timings
+
+    def _send_http1(self, request):
+        self._urllib_handler.validate(request)
+        return self._urllib_handler.send(request)
+
+    def _send(self, request):
+        url, method, data = request.url, request.method, request.data
+        host = '%s:%d' % self._host_key(url)
+        headers = self._get_headers(request)
+        cookiejar = self._get_cookiejar(request)
+        timeout = self._calculate_timeout(request)
+        legacy_ssl_support = request.extensions.get('legacy_ssl')
+        if legacy_ssl_support is None:
+            legacy_ssl_support = self.legacy_ssl_support
+        if data is not None and not isinstance(data, bytes):
+            data = data.read() if hasattr(data, 'read') else b''.join(data)
+
+        for _ in range(self._MAX_REDIRECTS + 1):
+            if urllib.parse.urlsplit(url).scheme.lower() != 'https' or self.is_http1_host(url):
+                return self._send_http1(Request(
+                    url, data, headers, proxies=request.proxies, method=method, extensions=request.extensions))
+
+            cookie_request = urllib.request.Request(url, headers=headers)
+            cookiejar.add_cookie_header(cookie_request)
+            try:
+                connection, timings = self._get_connection(url, timeout, legacy_ssl_support)
+                if connection is None:
+                    continue
+                stream = connection.send_request(
+                    method, url, {**headers, **cookie_request.unredirected_hdrs}, data, timeout)
+                sent = time.perf_counter()
+                status, response_headers = connection.get_response(stream, timeout)
+            except ssl.SSLCertVerificationError as e:
+                raise CertificateVerifyError(cause=e) from e
+            except ssl.SSLError as e:
+                raise SSLError(cause=e) from e
+            except (OSError, h2.exceptions.H2Error) as e:
+                raise TransportError(cause=e) from e
+
+            self.connection_stats.record_request(host, timings, time.perf_counter() - sent)
+            cookiejar.extract_cookies(
+                urllib.response.addinfourl(io.BytesIO(), response_headers, url, status), cookie_request)
+
+            reader = H2ResponseReader(
+                connection, stream, timeout, int_or_none(response_headers.get('Content-Length')))
+            encodings = [e.strip() for e in reversed(response_headers.get('Content-Encoding', '').split(','))]
+            if any(encodings):
+                try:
+                    reader.decode(encodings)
+                except (RequestError, *CONTENT_DECODE_ERRORS) as e:
+                    raise TransportError(cause=e) from e
+            response = H2ResponseAdapter(reader, url, response_headers, status)
+
+            location = response.headers.get('Location')
+            if status not in (301, 302, 303, 307, 308) or not location:
+                break
+            response.close()
+            url = normalize_url(urllib.parse.urljoin(url, location.encode('latin-1').decode()))
+            host = '%s:%d' % self._host_key(url)
+            new_method = get_redirect_method(method, status)
+            headers = {k: v for k, v in headers.items() if k.title() != 'Cookie'}
+            if new_method != method:
+                data = None
+                headers = {k: v for k, v in headers.items() if k.title() not in ('Content-Length', 'Content-Type')}
+            method = new_method
+        else:
+            raise HTTPError(response, redirect_loop=True)
+
+        if not 200 <= response.status < 300:
+            raise HTTPError(response)
+        return response
+
+
+@register_preference(H2RH)
+def h2_preference(rh, request):
+    # Fragments of the same format are usually requested from the same host
+    if request.extensions.get('fragment') and not rh.is_http1_host(request.url):
+        return 200
+    return 0
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import collections
 import contextlib
 import functools
+import itertools
 import os
+import queue
 import socket
 import ssl
 import sys
+import threading
+import time
 import typing
 import urllib.parse
 import urllib.request
@@ -182,6 +187,149 @@ def _clear_instances(self):
         self.__instances.clear()
 
 
+class ConnectionStats:
+    """
+    Per-host statistics of the connections used by a RequestHandler
+
+    The times are totals in seconds. DNS, connect and TLS handshake times are
+    summed over the new connections, and the time to first byte over all requests
+    """
+
+    FIELDS = ('requests', 'new_connections', 'reused_connections', 'dns_time', 'connect_time', 'tls_time', 'ttfb')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def record_request(self, host, timings, ttfb):
+        """@param timings  Timings of the new connection, or None if it was reused"""
+        with self._lock:
+            stats = self._hosts.setdefault(host, dict.fromkeys(self.FIELDS, 0))
+            stats['requests'] += 1
+            stats['ttfb'] += ttfb
+            if timings is None:
+                stats['reused_connections'] += 1
+                return
+            stats['new_connections'] += 1
+            stats['dns_time'] += timings.get('dns', 0)
+            stats['connect_time'] += timings.get('connect', 0)
+            stats['tls_time'] += timings.get('tls', 0)
+
+    def get(self):
+        """Return a copy of the statistics, as {host: {field: value}}"""
+        with self._lock:
+            return {host: dict(stats) for host, stats in self._hosts.items()}
+
+    def clear(self):
+        with self._lock:
+            self._hosts.clear()
+
+    @classmethod
+    def merge(cls, *all_stats):
+        """Sum the statistics returned by get() for each host"""
+        merged = {}
+        for stats in all_stats:
+            for host, values in stats.items():
+                host_stats = merged.setdefault(host, dict.fromkeys(cls.FIELDS, 0))
+                for field in cls.FIELDS:
+                    host_stats[field] += values[field]
+        return merged
+
+
+class ConnectionStatsMixin:
+    """
+    Mixin for http.client (and urllib3) HTTPConnection classes that records
+    each request in the ConnectionStats `stats`
+
+    A connection is counted as new if it was connected since the previous response.
+    Connections made by subclasses that override connect() are not timed.
+    The DNSCache `dns_cache` and `happy_eyeballs` are passed on to create_connection
+    """
+
+    stats = None
+    dns_cache = None
+    happy_eyeballs = False
+    _timings = None
+    _request_sent = None
+
+    def _timed_create_connection(self, *args, **kwargs):
+        """Use as _create_connection of a http.client.HTTPConnection to time DNS resolution"""
+        return create_connection(
+            *args, **kwargs, dns_cache=self.dns_cache, happy_eyeballs=self.happy_eyeballs, _timings=self._timings)
+
+    def _new_conn(self):  # urllib3
+        start = time.perf_counter()
+        sock = super()._new_conn()
+        if self._timings is not None:
+            self._timings.setdefault('connect', time.perf_counter() - start)
+        return sock
+
+    def connect(self):
+        self._timings = timings = {}
+        start = time.perf_counter()
+        super().connect()
+        total = time.perf_counter() - start
+        timings.setdefault('connect', total - timings.get('dns', 0))
+        if isinstance(self.sock, ssl.SSLSocket):
+            timings['tls'] = max(total - timings['connect'] - timings.get('dns', 0), 0)
+
+    def request(self, *args, **kwargs):
+        if self.sock is None and self._timings is None:
+            self._timings = {}
+        super().request(*args, **kwargs)
+        self._request_sent = time.perf_counter()
+
+    def getresponse(self, *args, **kwargs):
+        response = super().getresponse(*args, **kwargs)
+        timings, self._timings = self._timings, None
+        if self.stats is not None and self._request_sent is not None:
+            self.stats.record_request(f'{self.host}:{self.port}', timings, time.perf_counter() - self._request_sent)
+        return response
+
+
+class DNSCache:
+    """
+    Thread-safe cache of getaddrinfo() results, shared between request handlers
+
+    getaddrinfo() does not expose the TTL of the DNS records, so entries expire
+    `ttl` seconds after they were resolved. `resolver` may be replaced for testing
+    """
+
+    DEFAULT_TTL = 60
+
+    def __init__(self, ttl=DEFAULT_TTL, resolver=socket.getaddrinfo):
+        self.ttl = ttl
+        self._resolver = resolver
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def resolve(self, host, port, family=0, type=socket.SOCK_STREAM):
+        key = (host, port, family, type)
+        with self._lock:
+            expires, ip_addrs = self._entries.get(key, (0, None))
+            if expires > time.monotonic():
+                self.stats['hits'] += 1
+                return list(ip_addrs)
+            self.stats['misses'] += 1
+
+        ip_addrs = self._resolver(host, port, family, type)
+        if ip_addrs:
+            with self._lock:
+                self._entries[key] = (time.monotonic() + self.ttl, tuple(ip_addrs))
+        return list(ip_addrs)
+
+    def invalidate(self, host, port):
+        """Remove the entries of the address, e.g. after none of them could be connected to"""
+        with self._lock:
+            for key in [key for key in self._entries if key[:2] == (host, port)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
 def add_accept_encoding_header(headers: HTTPHeaderDict, supported_encodings: Iterable[str]):
     if 'Accept-Encoding' not in headers:
         headers['Accept-Encoding'] = ', '.join(supported_encodings) or 'identity'
@@ -199,10 +347,12 @@ def wrapper(self, *args, **kwargs):
     return wrapper
 
 
-def _socket_connect(ip_addr, timeout, source_address):
+def _socket_connect(ip_addr, timeout, source_address, socket_options=None):
     af, socktype, proto, _canonname, sa = ip_addr
     sock = socket.socket(af, socktype, proto)
     try:
+        for option in socket_options or ():
+            sock.setsockopt(*option)
         if timeout is not socket._GLOBAL_DEFAULT_TIMEOUT:
             sock.settimeout(timeout)
         if source_address:
@@ -232,18 +382,90 @@ def create_socks_proxy_socket(dest_addr, proxy_args, proxy_ip_addr, timeout, sou
         raise
 
 
+# Delay before starting a connection attempt to the next address, see RFC 8305 section 5
+HAPPY_EYEBALLS_DELAY = 0.25
+
+
+def _interleave_address_families(ip_addrs):
+    """Alternate between the address families, starting with the first one (RFC 8305 section 4)"""
+    first_af = ip_addrs[0][0]
+    return [addr for addrs in itertools.zip_longest(
+        [addr for addr in ip_addrs if addr[0] == first_af],
+        [addr for addr in ip_addrs if addr[0] != first_af],
+    ) for addr in addrs if addr is not None]
+
+
+def _race_connect(ip_addrs, timeout, source_address, create_socket_func, delay=HAPPY_EYEBALLS_DELAY):
+    """
+    Connect to the addresses in parallel, starting a new attempt every `delay` seconds
+    or as soon as the previous one failed. The first connected socket is returned
+    """
+    results = queue.Queue()
+    lock = threading.Lock()
+    done = False
+
+    def attempt(ip_addr):
+        try:
+            sock = create_socket_func(ip_addr, timeout, source_address)
+        except OSError as e:
+            results.put((None, e))
+            return
+        with lock:
+            if not done:
+                results.put((sock, None))
+                return
+        sock.close()
+
+    pending = collections.deque(ip_addrs)
+    running, err = 0, None
+    try:
+        while pending or running:
+            if pending:
+                threading.Thread(target=attempt, args=(pending.popleft(),), daemon=True).start()
+                running += 1
+            try:
+                sock, err = results.get(timeout=delay if pending else None)
+            except queue.Empty:
+                continue
+            running -= 1
+            if sock is not None:
+                return sock
+        raise err
+    finally:
+        with lock:
+            done = True
+        # Close the sockets of the attempts that also succeeded
+        while True:
+            try:
+                sock, _ = results.get_nowait()
+            except queue.Empty:
+                break
+            if sock is not None:
+                sock.close()
+        err = None
+
+
 def create_connection(
     address,
     timeout=socket._GLOBAL_DEFAULT_TIMEOUT,
     source_address=None,
     *,
+    dns_cache=None,
+    happy_eyeballs=False,
     _create_socket_func=_socket_connect,
+    _timings=None,
 ):
     # Work around socket.create_connection() which tries all addresses from getaddrinfo() including IPv6.
     # This filters the addresses based on the given source_address.
     # Based on: https://github.com/python/cpython/blob/main/Lib/socket.py#L810
     host, port = address
-    ip_addrs = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+    start = time.perf_counter()
+    if dns_cache is not None:
+        ip_addrs = dns_cache.resolve(host, port, 0, socket.SOCK_STREAM)
+    else:
+        ip_addrs = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+    if _timings is not None:
+        _timings['dns'] = time.perf_counter() - start
     if not ip_addrs:
         raise OSError('getaddrinfo returns an empty list')
     if source_address is not None:
@@ -255,16 +477,28 @@ def create_connection(
                 f'Can\'t use "{source_address[0]}" as source address')
 
     err = None
-    for ip_addr in ip_addrs:
+    if happy_eyeballs and len({addr[0] for addr in ip_addrs}) > 1:
         try:
-            sock = _create_socket_func(ip_addr, timeout, source_address)
-            # Explicitly break __traceback__ reference cycle
-            # https://bugs.python.org/issue36820
-            err = None
-            return sock
+            sock = _race_connect(_interleave_address_families(ip_addrs), timeout, source_address, _create_socket_func)
         except OSError as e:
             err = e
+    else:
+        for ip_addr in ip_addrs:
+            try:
+                sock = _create_socket_func(ip_addr, timeout, source_address)
+                err = None
+                break
+            except OSError as e:
+                err = e
+
+    if err is None:
+        if _timings is not None:
+            _timings['connect'] = time.perf_counter() - start - _timings['dns']
+        return sock
 
+    if dns_cache is not None:
+        # The host may have moved
+        dns_cache.invalidate(host, port)
     try:
         raise err
     finally:
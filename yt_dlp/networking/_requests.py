@@ -4,6 +4,7 @@
 import http.client
 import logging
 import re
+import socket
 import warnings
 
 from ..dependencies import brotli, requests, urllib3
@@ -33,7 +34,9 @@
 import urllib3.util
 
 from ._helper import (
+    ConnectionStatsMixin,
     InstanceStoreMixin,
+    _socket_connect,
     add_accept_encoding_header,
     create_connection,
     create_socks_proxy_socket,
@@ -157,24 +160,92 @@ def read(self, amt: int | None = None):
             raise TransportError(cause=e) from e
 
 
+class ResolvingConnectionMixin:
+    """Connect with our create_connection instead of urllib3's, to use the DNSCache and happy eyeballs"""
+
+    def _new_conn(self):
+        try:
+            return create_connection(
+                (self._dns_host, self.port),
+                timeout=self.timeout,
+                source_address=self.source_address,
+                dns_cache=self.dns_cache,
+                happy_eyeballs=self.happy_eyeballs,
+                _create_socket_func=functools.partial(_socket_connect, socket_options=self.socket_options),
+                _timings=self._timings)
+        except socket.gaierror as e:
+            raise urllib3.exceptions.NameResolutionError(self.host, self, e) from e
+        except TimeoutError as e:
+            raise urllib3.exceptions.ConnectTimeoutError(
+                self, f'Connection to {self.host} timed out. (connect timeout={self.timeout})') from e
+        except OSError as e:
+            raise urllib3.exceptions.NewConnectionError(
+                self, f'Failed to establish a new connection: {e}') from e
+
+
+class StatsHTTPConnection(ConnectionStatsMixin, ResolvingConnectionMixin, urllib3.connection.HTTPConnection):
+    pass
+
+
+class StatsHTTPSConnection(ConnectionStatsMixin, ResolvingConnectionMixin, urllib3.connection.HTTPSConnection):
+    pass
+
+
+class StatsConnectionPoolMixin:
+    """Pass the ConnectionStats and connection options of the pool on to its new connections"""
+    connection_stats = None
+    dns_cache = None
+    happy_eyeballs = False
+
+    def _new_conn(self):
+        conn = super()._new_conn()
+        conn.stats = self.connection_stats
+        conn.dns_cache = self.dns_cache
+        conn.happy_eyeballs = self.happy_eyeballs
+        return conn
+
+
+class StatsHTTPConnectionPool(StatsConnectionPoolMixin, urllib3.HTTPConnectionPool):
+    ConnectionCls = StatsHTTPConnection
+
+
+class StatsHTTPSConnectionPool(StatsConnectionPoolMixin, urllib3.HTTPSConnectionPool):
+    ConnectionCls = StatsHTTPSConnection
+
+
+STATS_POOL_CLASSES = {
+    'http': StatsHTTPConnectionPool,
+    'https': StatsHTTPSConnectionPool,
+}
+
+
 class RequestsHTTPAdapter(requests.adapters.HTTPAdapter):
-    def __init__(self, ssl_context=None, proxy_ssl_context=None, source_address=None, **kwargs):
+    def __init__(
+            self, ssl_context=None, proxy_ssl_context=None, source_address=None,
+            connection_stats=None, dns_cache=None, happy_eyeballs=False, **kwargs):
         self._pm_args = {}
         if ssl_context:
             self._pm_args['ssl_context'] = ssl_context
         if source_address:
             self._pm_args['source_address'] = (source_address, 0)
         self._proxy_ssl_context = proxy_ssl_context or ssl_context
+        self._connection_stats = connection_stats
+        self._dns_cache = dns_cache
+        self._happy_eyeballs = happy_eyeballs
         super().__init__(**kwargs)
 
     def init_poolmanager(self, *args, **kwargs):
-        return super().init_poolmanager(*args, **kwargs, **self._pm_args)
+        super().init_poolmanager(*args, **kwargs, **self._pm_args)
+        self.poolmanager.pool_classes_by_scheme = STATS_POOL_CLASSES
 
     def proxy_manager_for(self, proxy, **proxy_kwargs):
         extra_kwargs = {}
         if not proxy.lower().startswith('socks') and self._proxy_ssl_context:
             extra_kwargs['proxy_ssl_context'] = self._proxy_ssl_context
-        return super().proxy_manager_for(proxy, **proxy_kwargs, **self._pm_args, **extra_kwargs)
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs, **self._pm_args, **extra_kwargs)
+        if not isinstance(manager, SocksProxyManager):
+            manager.pool_classes_by_scheme = STATS_POOL_CLASSES
+        return manager
 
     # Skip `requests` internal verification; we use our own SSLContext
     def cert_verify(*args, **kwargs):
@@ -188,7 +259,11 @@ def get_connection_with_tls_context(self, request, verify, proxies=None, cert=No
         if proxy := select_proxy(url, proxies):
             manager = self.proxy_manager_for(proxy)
 
-        return manager.connection_from_url(url)
+        pool = manager.connection_from_url(url)
+        pool.connection_stats = self._connection_stats
+        pool.dns_cache = self._dns_cache
+        pool.happy_eyeballs = self._happy_eyeballs
+        return pool
 
 
 class RequestsSession(requests.sessions.Session):
@@ -290,6 +365,7 @@ def _check_extensions(self, extensions):
         extensions.pop('timeout', None)
         extensions.pop('legacy_ssl', None)
         extensions.pop('keep_header_casing', None)
+        extensions.pop('fragment', None)
 
     def _create_instance(self, cookiejar, legacy_ssl_support=None):
         session = RequestsSession()
@@ -297,6 +373,9 @@ def _create_instance(self, cookiejar, legacy_ssl_support=None):
             ssl_context=self._make_sslcontext(legacy_ssl_support=legacy_ssl_support),
             source_address=self.source_address,
             max_retries=urllib3.util.retry.Retry(False),
+            connection_stats=self.connection_stats,
+            dns_cache=self.dns_cache,
+            happy_eyeballs=self.happy_eyeballs,
         )
         session.adapters.clear()
         session.headers = requests.models.CaseInsensitiveDict()
@@ -20,6 +20,7 @@
 )
 
 from ._helper import (
+    ConnectionStatsMixin,
     InstanceStoreMixin,
     add_accept_encoding_header,
     create_connection,
@@ -50,11 +51,23 @@
     CONTENT_DECODE_ERRORS.append(brotli.error)
 
 
-def _create_http_connection(http_class, source_address, *args, **kwargs):
+class _HTTPConnection(ConnectionStatsMixin, http.client.HTTPConnection):
+    pass
+
+
+class _HTTPSConnection(ConnectionStatsMixin, http.client.HTTPSConnection):
+    pass
+
+
+def _create_http_connection(
+        http_class, source_address, *args, stats=None, dns_cache=None, happy_eyeballs=False, **kwargs):
     hc = http_class(*args, **kwargs)
+    hc.stats = stats
+    hc.dns_cache = dns_cache
+    hc.happy_eyeballs = happy_eyeballs
 
     if hasattr(hc, '_create_connection'):
-        hc._create_connection = create_connection
+        hc._create_connection = hc._timed_create_connection
 
     if source_address is not None:
         hc.source_address = (source_address, 0)
@@ -77,10 +90,13 @@ class HTTPHandler(urllib.request.AbstractHTTPHandler):
     public domain.
     """
 
-    def __init__(self, context=None, source_address=None, *args, **kwargs):
+    def __init__(
+            self, context=None, source_address=None, *args,
+            stats=None, dns_cache=None, happy_eyeballs=False, **kwargs):
         super().__init__(*args, **kwargs)
         self._source_address = source_address
         self._context = context
+        self._connect_kwargs = {'stats': stats, 'dns_cache': dns_cache, 'happy_eyeballs': happy_eyeballs}
 
     @staticmethod
     def _make_conn_class(base, req):
@@ -91,15 +107,15 @@ def _make_conn_class(base, req):
         return conn_class
 
     def http_open(self, req):
-        conn_class = self._make_conn_class(http.client.HTTPConnection, req)
+        conn_class = self._make_conn_class(_HTTPConnection, req)
         return self.do_open(functools.partial(
-            _create_http_connection, conn_class, self._source_address), req)
+            _create_http_connection, conn_class, self._source_address, **self._connect_kwargs), req)
 
     def https_open(self, req):
-        conn_class = self._make_conn_class(http.client.HTTPSConnection, req)
+        conn_class = self._make_conn_class(_HTTPSConnection, req)
         return self.do_open(
             functools.partial(
-                _create_http_connection, conn_class, self._source_address),
+                _create_http_connection, conn_class, self._source_address, **self._connect_kwargs),
             req, context=self._context)
 
     @staticmethod
@@ -192,6 +208,7 @@ def connect(self):
                 (proxy_args['addr'], proxy_args['port']),
                 timeout=self.timeout,
                 source_address=self.source_address,
+                dns_cache=self.dns_cache,
                 _create_socket_func=functools.partial(
                     create_socks_proxy_socket, (self.host, self.port), proxy_args))
             if isinstance(self, http.client.HTTPSConnection):
@@ -368,6 +385,7 @@ def _check_extensions(self, extensions):
         extensions.pop('cookiejar', None)
         extensions.pop('timeout', None)
         extensions.pop('legacy_ssl', None)
+        extensions.pop('fragment', None)
 
     def _create_instance(self, proxies, cookiejar, legacy_ssl_support=None):
         opener = urllib.request.OpenerDirector()
@@ -376,7 +394,10 @@ def _create_instance(self, proxies, cookiejar, legacy_ssl_support=None):
             HTTPHandler(
                 debuglevel=int(bool(self.verbose)),
                 context=self._make_sslcontext(legacy_ssl_support=legacy_ssl_support),
-                source_address=self.source_address),
+                source_address=self.source_address,
+                stats=self.connection_stats,
+                dns_cache=self.dns_cache,
+                happy_eyeballs=self.happy_eyeballs),
             HTTPCookieProcessor(cookiejar),
             DataHandler(),
             UnknownHandler(),
@@ -139,6 +139,7 @@ def _send(self, request):
         create_conn_kwargs = {
             'source_address': (self.source_address, 0) if self.source_address else None,
             'timeout': timeout,
+            'dns_cache': self.dns_cache,
         }
         proxy = select_proxy(request.url, self._get_proxies(request))
         try:
@@ -153,6 +154,7 @@ def _send(self, request):
             else:
                 sock = create_connection(
                     address=(wsuri.host, wsuri.port),
+                    happy_eyeballs=self.happy_eyeballs,
                     **create_conn_kwargs,
                 )
             ssl_ctx = self._make_sslcontext(legacy_ssl_support=request.extensions.get('legacy_ssl'))
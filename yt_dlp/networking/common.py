@@ -14,7 +14,7 @@
 from http import HTTPStatus
 from types import NoneType
 
-from ._helper import make_ssl_context, wrap_request_errors
+from ._helper import ConnectionStats, DNSCache, make_ssl_context, wrap_request_errors
 from .exceptions import (
     NoSupportingHandlers,
     RequestError,
@@ -77,6 +77,10 @@ def add_handler(self, handler: RequestHandler):
         assert isinstance(handler, RequestHandler), 'handler must be a RequestHandler'
         self.handlers[handler.RH_KEY] = handler
 
+    def get_connection_stats(self) -> dict[str, dict[str, int | float]]:
+        """Connection statistics of all handlers, per host. See ConnectionStats"""
+        return ConnectionStats.merge(*(handler.connection_stats.get() for handler in self.handlers.values()))
+
     def _get_handlers(self, request: Request) -> list[RequestHandler]:
         """Sorts handlers by preference, given a request"""
         preferences = {
@@ -167,6 +171,9 @@ class RequestHandler(abc.ABC):
     If a Request is not supported by the handler, an UnsupportedRequest
     should be raised with a reason.
 
+    Handlers may record the requests they send and whether they opened a new
+    connection for them in `connection_stats`, a ConnectionStats instance.
+
     By default, some checks are done on the request in _validate() based on the following class variables:
     - `_SUPPORTED_URL_SCHEMES`: a tuple of supported url schemes.
         Any Request with an url scheme not in this list will raise an UnsupportedRequest.
@@ -191,6 +198,8 @@ class RequestHandler(abc.ABC):
             dict with {client_certificate, client_certificate_key, client_certificate_password}
     @param verify: Verify SSL certificates
     @param legacy_ssl_support: Enable legacy SSL options such as legacy server connect and older cipher support.
+    @param dns_cache: DNSCache to resolve hostnames with. May be shared between handlers.
+    @param happy_eyeballs: Connect to the IPv4 and IPv6 addresses of a host in parallel (RFC 8305).
 
     Some configuration options may be available for individual Requests too. In this case,
     either the Request configuration option takes precedence or they are merged.
@@ -207,6 +216,8 @@ class RequestHandler(abc.ABC):
     - `timeout`: socket timeout to use for this request.
     - `legacy_ssl`: Enable legacy SSL options for this request. See legacy_ssl_support.
     - `keep_header_casing`: Keep the casing of headers when sending the request.
+    - `fragment`: The request is for a fragment of a media download. This is only a hint
+        for handler preferences and should be accepted by all handlers.
     To enable these, add extensions.pop('<extension>', None) to _check_extensions
 
     Apart from the url protocol, proxies dict may contain the following keys:
@@ -233,6 +244,8 @@ def __init__(
         client_cert: dict[str, str | None] | None = None,
         verify: bool = True,
         legacy_ssl_support: bool = False,
+        dns_cache: DNSCache | None = None,
+        happy_eyeballs: bool = False,
         **_,
     ):
 
@@ -247,6 +260,9 @@ def __init__(
         self._client_cert = client_cert or {}
         self.verify = verify
         self.legacy_ssl_support = legacy_ssl_support
+        self.dns_cache = dns_cache
+        self.happy_eyeballs = happy_eyeballs
+        self.connection_stats = ConnectionStats()
         super().__init__()
 
     def _make_sslcontext(self, legacy_ssl_support=None):
@@ -336,6 +352,7 @@ def _check_extensions(self, extensions):
         assert isinstance(extensions.get('timeout'), (float, int, NoneType))
         assert isinstance(extensions.get('legacy_ssl'), (bool, NoneType))
         assert isinstance(extensions.get('keep_header_casing'), (bool, NoneType))
+        assert isinstance(extensions.get('fragment'), (bool, NoneType))
 
     def _validate(self, request):
         self._check_url_scheme(request)
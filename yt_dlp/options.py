@@ -642,6 +642,18 @@ def _preset_alias_callback(option, opt_str, value, parser):
         action='store_const', const='::', dest='source_address',
         help='Make all connections via IPv6',
     )
+    network.add_option(
+        '--happy-eyeballs',
+        action='store_true', dest='happy_eyeballs', default=False,
+        help='Connect to the IPv4 and IPv6 addresses of a host in parallel and use the first connection to succeed')
+    network.add_option(
+        '--no-happy-eyeballs',
+        action='store_false', dest='happy_eyeballs',
+        help='Connect to the addresses of a host one at a time (default)')
+    network.add_option(
+        '--dns-cache-ttl',
+        metavar='SECONDS', dest='dns_cache_ttl', default=None, type=float,
+        help='Number of seconds to reuse resolved hostnames for (default is 60). Use 0 to disable the cache')
     network.add_option(
         '--enable-file-urls', action='store_true',
         dest='enable_file_urls', default=False,
@@ -779,7 +791,11 @@ def _preset_alias_callback(option, opt_str, value, parser):
     selection.add_option(
         '--download-archive', metavar='FILE',
         dest='download_archive',
-        help='Download only videos not listed in the archive file. Record the IDs of all downloaded videos in it')
+        help=(
+            'Download only videos not listed in the archive file. Record the IDs of all downloaded videos in it. '
+            'If FILE ends in .sqlite, .sqlite3 or .db, an indexed SQLite database is used instead of a text file; '
+            'when the database is created, the text archive with the same name minus that extension is imported, '
+            'e.g. archive.txt for archive.txt.sqlite'))
     selection.add_option(
         '--no-download-archive',
         dest='download_archive', action='store_const', const=None,
@@ -1011,6 +1027,33 @@ def _preset_alias_callback(option, opt_str, value, parser):
         '-N', '--concurrent-fragments',
         dest='concurrent_fragment_downloads', metavar='N', default=1, type=int,
         help='Number of fragments of a dash/hlsnative video that should be downloaded concurrently (default is %default)')
+    downloader.add_option(
+        '--adaptive-fragments',
+        action='store_true', dest='adaptive_fragment_concurrency', default=False,
+        help=(
+            'Adjust the number of concurrently downloaded fragments between 1 and --concurrent-fragments '
+            'based on the measured throughput and fragment errors'))
+    downloader.add_option(
+        '--no-adaptive-fragments',
+        action='store_false', dest='adaptive_fragment_concurrency',
+        help='Always download --concurrent-fragments fragments concurrently (default)')
+    downloader.add_option(
+        '--async-fragments',
+        action='store_true', dest='async_fragments', default=False,
+        help=(
+            'Download the fragments of a dash/hlsnative video on a single asyncio event loop instead of threads. '
+            'This allows a much higher --concurrent-fragments. '
+            'Threads are still used if a proxy, impersonation or a rate limit is needed, or the video is live'))
+    downloader.add_option(
+        '--no-async-fragments',
+        action='store_false', dest='async_fragments',
+        help='Download concurrent fragments with threads (default)')
+    downloader.add_option(
+        '--http-connections',
+        dest='http_connections', metavar='N', default=1, type=int,
+        help=(
+            'Number of connections used to download a single file over HTTP as concurrent byte ranges '
+            '(default is %default). Only used when the server reports the file size and supports ranges'))
     downloader.add_option(
         '-r', '--limit-rate', '--rate-limit',
         dest='ratelimit', metavar='RATE',
@@ -1060,6 +1103,14 @@ def _preset_alias_callback(option, opt_str, value, parser):
         '--no-keep-fragments',
         action='store_false', dest='keep_fragments',
         help='Delete downloaded fragments after downloading is finished (default)')
+    downloader.add_option(
+        '--in-memory-fragments',
+        action='store_true', dest='in_memory_fragments', default=False,
+        help='Download fragments into memory instead of temporary files. Ignored with --keep-fragments')
+    downloader.add_option(
+        '--no-in-memory-fragments',
+        action='store_false', dest='in_memory_fragments',
+        help='Download fragments into temporary files (default)')
     downloader.add_option(
         '--buffer-size',
         dest='buffersize', metavar='SIZE', default='1024',
@@ -1102,6 +1153,28 @@ def _preset_alias_callback(option, opt_str, value, parser):
         '--no-lazy-playlist',
         action='store_false', dest='lazy_playlist',
         help='Process videos in the playlist only after the entire playlist is parsed (default)')
+    downloader.add_option(
+        '--concurrent-extractions',
+        dest='concurrent_extractions', metavar='N', default=1, type=int,
+        help=(
+            'Number of playlist entries to extract concurrently, ahead of the one being processed (default is %default). '
+            'The entries are still downloaded one at a time and in order'))
+    downloader.add_option(
+        '--prefetch-playlist-pages',
+        dest='prefetch_playlist_pages', metavar='N', default=None, type=int,
+        help=(
+            'Number of pages of a paginated playlist to download in the background, '
+            'ahead of the page being processed. Only some sites support this'))
+    downloader.add_option(
+        '--spool-playlist-entries',
+        action='store_true', dest='spool_playlist_entries', default=False,
+        help=(
+            'Keep the information of processed playlist entries in a temporary file instead of in memory. '
+            'Useful with --dump-single-json or --write-info-json on very large playlists'))
+    downloader.add_option(
+        '--no-spool-playlist-entries',
+        action='store_false', dest='spool_playlist_entries',
+        help='Keep the information of processed playlist entries in memory (default)')
     downloader.add_option(
         '--hls-prefer-native',
         dest='hls_prefer_native', action='store_true', default=None,
@@ -1313,6 +1386,17 @@ def _preset_alias_callback(option, opt_str, value, parser):
         help=(
             'Quiet, but print JSON information for each URL or infojson passed. Simulate unless --no-simulate is used. '
             'If the URL refers to a playlist, the whole playlist information is dumped in a single line'))
+    verbosity.add_option(
+        '--ndjson',
+        action='store_true', dest='ndjson', default=False,
+        help=(
+            'Quiet, but extract the URLs concurrently and print one line of JSON for each, '
+            'with the information or the errors and the time taken. Nothing is downloaded. '
+            'The URLs of --batch-file are read only as they are needed'))
+    verbosity.add_option(
+        '--ndjson-workers',
+        dest='ndjson_workers', metavar='N', default=1, type=int,
+        help='Number of URLs to extract concurrently with --ndjson (default is %default)')
     verbosity.add_option(
         '--print-json',
         action='store_true', dest='print_json', default=False,
@@ -1566,6 +1650,11 @@ def _preset_alias_callback(option, opt_str, value, parser):
     filesystem.add_option(
         '--no-cache-dir', action='store_false', dest='cachedir',
         help='Disable filesystem caching')
+    filesystem.add_option(
+        '--cache-max-size', dest='cache_max_size', default=None, metavar='SIZE',
+        help=(
+            'Maximum total size of the cache dir (e.g. 50M). '
+            'The least recently used files are deleted when it is exceeded. By default, the size is not limited'))
     filesystem.add_option(
         '--rm-cache-dir',
         action='store_true', dest='rm_cachedir',
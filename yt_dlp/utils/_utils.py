@@ -4,6 +4,7 @@
 import codecs
 import collections
 import collections.abc
+import concurrent.futures
 import contextlib
 import datetime as dt
 import email.header
@@ -35,6 +36,7 @@
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 import traceback
 import types
@@ -188,8 +190,12 @@ def preferredencoding():
     return pref
 
 
-def write_json_file(obj, fn):
-    """ Encode obj as JSON and write it to fn, atomically if possible """
+def write_json_file(obj, fn, *, chunks=None):
+    """
+    Encode obj as JSON and write it to fn, atomically if possible
+
+    @param chunks  Iterable of already encoded JSON text to write instead of obj
+    """
 
     tf = tempfile.NamedTemporaryFile(
         prefix=f'{os.path.basename(fn)}.', dir=os.path.dirname(fn),
@@ -197,7 +203,10 @@ def write_json_file(obj, fn):
 
     try:
         with tf:
-            json.dump(obj, tf, ensure_ascii=False)
+            if chunks is None:
+                json.dump(obj, tf, ensure_ascii=False)
+            else:
+                tf.writelines(chunks)
         if sys.platform == 'win32':
             # Need to remove existing file on Windows, else os.rename raises
             # WindowsError or FileExistsError.
@@ -2297,6 +2306,57 @@ def __str__(self):
         return repr(self.exhaust())
 
 
+class SpooledList(collections.abc.Sequence):
+    """
+    Immutable list of JSON serializable items that are kept in a temporary file
+
+    Only the position of each item in the file is held in memory. The items are
+    encoded when they are stored and decoded again on every access
+    """
+
+    Block = collections.namedtuple('Block', ('offset', 'length'))
+
+    def __init__(self, items=()):
+        self._file = tempfile.TemporaryFile()
+        self._lock = threading.Lock()
+        self._blocks = [self.store(item) for item in items]
+
+    def store(self, item):
+        """Write the item to the file, without adding it to the list. Returns its Block"""
+        data = json.dumps(item).encode()
+        with self._lock:
+            self._file.seek(0, os.SEEK_END)
+            block = self.Block(self._file.tell(), len(data))
+            self._file.write(data)
+        return block
+
+    def arrange(self, items):
+        """Set the items of the list. Blocks returned by store are used as they are"""
+        self._blocks = [item if isinstance(item, self.Block) else self.store(item) for item in items]
+        return self
+
+    def _read(self, block):
+        with self._lock:
+            self._file.seek(block.offset)
+            return self._file.read(block.length).decode()
+
+    def iter_json(self):
+        """Yield the items as encoded by json.dumps"""
+        for block in self._blocks:
+            yield self._read(block)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [json.loads(self._read(block)) for block in self._blocks[idx]]
+        return json.loads(self._read(self._blocks[idx]))
+
+    def __len__(self):
+        return len(self._blocks)
+
+    def __repr__(self):
+        return repr(self[:])
+
+
 class PagedList:
 
     class IndexError(IndexError):  # noqa: A001
@@ -2341,7 +2401,78 @@ def __bool__(self):
 
 
 class OnDemandPagedList(PagedList):
-    """Download pages until a page with less than maximum results"""
+    """
+    Download pages until a page with less than maximum results
+
+    If prefetch_pages is set, that many of the following pages are downloaded
+    in background threads while the current one is being consumed. If ydl is
+    also set, the output of those pagefuncs is deferred and replayed through it
+    when the page is used, so that it is in order
+    """
+
+    def __init__(self, pagefunc, pagesize, use_cache=True, prefetch_pages=None, ydl=None):
+        super().__init__(pagefunc, pagesize, use_cache)
+        self.prefetch_pages = prefetch_pages
+        self.ydl = ydl
+        self._last_page = float('inf')
+        self._prefetched = {}
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def getpage(self, pagenum):
+        future = self._prefetch(pagenum)
+        if future is None:
+            page_results = super().getpage(pagenum)
+        else:
+            page_results, output = future.result()
+            if self.ydl is not None:
+                self.ydl._replay_output(output)
+            if isinstance(page_results, Exception):
+                raise page_results
+            if self._use_cache:
+                self._cache[pagenum] = page_results
+        if len(page_results) < self._pagesize:
+            self._last_page = min(self._last_page, pagenum)
+        return page_results
+
+    def _prefetch(self, pagenum):
+        """Start downloading the pages after pagenum. Returns the future of pagenum, if it was prefetched"""
+        if not self.prefetch_pages:
+            return None
+        with self._lock:
+            future = self._prefetched.pop(pagenum, None)
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    self.prefetch_pages, thread_name_prefix='OnDemandPagedList')
+            wanted = range(pagenum + 1, min(pagenum + self.prefetch_pages, self._last_page, self._pagecount) + 1)
+            for n in list(self._prefetched):
+                if n not in wanted:
+                    self._prefetched.pop(n).cancel()
+            for n in wanted:
+                if n not in self._prefetched and n not in self._cache:
+                    self._prefetched[n] = self._executor.submit(self._fetch_page, n)
+        return future
+
+    def _fetch_page(self, pagenum):
+        with self.ydl._deferring_output() if self.ydl is not None else contextlib.nullcontext([]) as output:
+            try:
+                page_results = list(self._pagefunc(pagenum))
+            except Exception as e:
+                # Raised when the page is used, after its output
+                return e, output
+        if len(page_results) < self._pagesize:
+            self._last_page = min(self._last_page, pagenum)
+        return page_results, output
+
+    def stop_prefetching(self):
+        """Cancel the pending page downloads"""
+        with self._lock:
+            for future in self._prefetched.values():
+                future.cancel()
+            self._prefetched.clear()
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
 
     def _getslice(self, start, end):
         for pagenum in itertools.count(start // self._pagesize):
@@ -2430,6 +2561,11 @@ def __init__(self, ydl, info_dict):
                 self._entries[i - 1] = entry
         elif isinstance(entries, (list, PagedList, LazyList)):
             self._entries = entries
+            if isinstance(entries, OnDemandPagedList):
+                if entries.prefetch_pages is None:
+                    entries.prefetch_pages = ydl.params.get('prefetch_playlist_pages')
+                if entries.ydl is None:
+                    entries.ydl = ydl
         else:
             self._entries = LazyList(entries)
 
@@ -2465,18 +2601,22 @@ def get_requested_items(self):
         elif playlist_start != 1 or playlist_end:
             self.ydl.report_warning('Ignoring playliststart and playlistend because playlistitems was given', only_once=True)
 
-        for index in self.parse_playlist_items(playlist_items):
-            for i, entry in self[index]:
-                yield i, entry
-                if not entry:
-                    continue
-                try:
-                    # The item may have just been added to archive. Don't break due to it
-                    if not self.ydl.params.get('lazy_playlist'):
-                        # TODO: Add auto-generated fields
-                        self.ydl._match_entry(entry, incomplete=True, silent=True)
-                except (ExistingVideoReached, RejectedVideoReached):
-                    return
+        try:
+            for index in self.parse_playlist_items(playlist_items):
+                for i, entry in self[index]:
+                    yield i, entry
+                    if not entry:
+                        continue
+                    try:
+                        # The item may have just been added to archive. Don't break due to it
+                        if not self.ydl.params.get('lazy_playlist'):
+                            # TODO: Add auto-generated fields
+                            self.ydl._match_entry(entry, incomplete=True, silent=True)
+                    except (ExistingVideoReached, RejectedVideoReached):
+                        return
+        finally:
+            if isinstance(self._entries, OnDemandPagedList):
+                self._entries.stop_prefetching()
 
     def get_full_count(self):
         if self.is_exhausted and not self.is_incomplete:
@@ -2563,7 +2703,7 @@ def parse_qs(url, **kwargs):
     return urllib.parse.parse_qs(urllib.parse.urlparse(url).query, **kwargs)
 
 
-def read_batch_urls(batch_fd):
+def read_batch_urls(batch_fd, *, lazy=False):
     def fixup(url):
         if not isinstance(url, str):
             url = url.decode('utf-8', 'replace')
@@ -2578,8 +2718,11 @@ def fixup(url):
         # However, it can be safely stripped out if following a whitespace
         return re.split(r'\s#', url, maxsplit=1)[0].rstrip()
 
-    with contextlib.closing(batch_fd) as fd:
-        return [url for url in map(fixup, fd) if url]
+    def read_urls():
+        with contextlib.closing(batch_fd) as fd:
+            yield from filter(None, map(fixup, fd))
+
+    return read_urls() if lazy else list(read_urls())
 
 
 def urlencode_postdata(*args, **kargs):
@@ -5433,6 +5576,8 @@ def __init__(self, ydl, field_preference):
         self.ydl = ydl
         self._order = []
         self.evaluate_params(self.ydl.params, field_preference)
+        # The settings are resolved once, so that the sorter can be reused for many formats
+        self._preferences = [self._compile_field_preference(field) for field in self._order]
         if ydl.params.get('verbose'):
             self.print_verbose_info(self.ydl.write_debug)
 
@@ -5558,46 +5703,82 @@ def print_verbose_info(self, write_debug):
             if self._get_field_setting(field, 'limit_text') is not None else '')
             for field in self._order if self._get_field_setting(field, 'visible')])))
 
-    def _calculate_field_preference_from_value(self, format_, field, type_, value):
-        reverse = self._get_field_setting(field, 'reverse')
-        closest = self._get_field_setting(field, 'closest')
-        limit = self._get_field_setting(field, 'limit')
+    def _compile_order(self, field):
+        order_list = (self._use_free_order and self._get_field_setting(field, 'order_free')) or self._get_field_setting(field, 'order')
+        list_length = len(order_list)
+        empty_pos = order_list.index('') if '' in order_list else list_length + 1
+        none_value = list_length - (order_list.index(None) if None in order_list else empty_pos)
+        if not self._get_field_setting(field, 'regex'):
+            positions = {value: list_length - i for i, value in reversed(list(enumerate(order_list)))}
+            return lambda value: none_value if value is None else positions.get(value.lower(), list_length - empty_pos)
 
-        if type_ == 'extractor':
-            maximum = self._get_field_setting(field, 'max')
-            if value is None or (maximum is not None and value >= maximum):
-                value = -1
-        elif type_ == 'boolean':
-            in_list = self._get_field_setting(field, 'in_list')
-            not_in_list = self._get_field_setting(field, 'not_in_list')
-            value = 0 if ((in_list is None or value in in_list) and (not_in_list is None or value not in not_in_list)) else -1
-        elif type_ == 'ordered':
-            value = self._resolve_field_value(field, value, True)
-
-        # try to convert to number
-        val_num = float_or_none(value, default=self._get_field_setting(field, 'default'))
-        is_num = self._get_field_setting(field, 'convert') != 'string' and val_num is not None
-        if is_num:
-            value = val_num
-
-        return ((-10, 0) if value is None
-                else (1, value, 0) if not is_num  # if a field has mixed strings and numbers, strings are sorted higher
-                else (0, -abs(value - limit), value - limit if reverse else limit - value) if closest
-                else (0, value, 0) if not reverse and (limit is None or value <= limit)
-                else (0, -value, 0) if limit is None or (reverse and value == limit) or value > limit
-                else (-1, value, 0))
-
-    def _calculate_field_preference(self, format_, field):
-        type_ = self._get_field_setting(field, 'type')  # extractor, boolean, ordered, field, multiple
-        get_value = lambda f: format_.get(self._get_field_setting(f, 'field'))
+        matchers = [(list_length - i, re.compile(regex).match) for i, regex in enumerate(order_list) if regex]
+
+        # The same few codecs, protocols, etc. occur in almost every format
+        @functools.lru_cache(maxsize=256)
+        def position(value):
+            value = value.lower()
+            return next((pos for pos, match in matchers if match(value)), list_length - empty_pos)
+
+        return lambda value: none_value if value is None else position(value)
+
+    def _compile_field_preference(self, field):
+        """Return a function that calculates the sort key of the field for a format"""
+        get_setting = functools.partial(self._get_field_setting, field)
+        type_ = get_setting('type')  # extractor, boolean, ordered, field, multiple
+        key = get_setting('field')
         if type_ == 'multiple':
             type_ = 'field'  # Only 'field' is allowed in multiple for now
-            actual_fields = self._get_field_setting(field, 'field')
+            keys = tuple(self._get_field_setting(f, 'field') for f in key)
+            function = get_setting('function')
+            get_value = lambda format_: function(map(format_.get, keys))
+        else:
+            get_value = None  # format_.get(key); inlined since this is the hot path
 
-            value = self._get_field_setting(field, 'function')(get_value(f) for f in actual_fields)
+        if type_ == 'extractor':
+            maximum = get_setting('max')
+            to_value = lambda value: -1 if value is None or (maximum is not None and value >= maximum) else value
+        elif type_ == 'boolean':
+            in_list, not_in_list = get_setting('in_list'), get_setting('not_in_list')
+            to_value = lambda value: 0 if ((in_list is None or value in in_list)
+                                           and (not_in_list is None or value not in not_in_list)) else -1
+        elif type_ == 'ordered':
+            to_value = self._compile_order(field)
         else:
-            value = get_value(field)
-        return self._calculate_field_preference_from_value(format_, field, type_, value)
+            to_value = None
+
+        reverse, closest, limit = get_setting('reverse'), get_setting('closest'), get_setting('limit')
+        default = get_setting('default')
+        is_string = get_setting('convert') == 'string'
+
+        def preference(format_):
+            value = format_.get(key) if get_value is None else get_value(format_)
+            if to_value:
+                value = to_value(value)
+            if is_string:
+                return (-10, 0) if value is None else (1, value, 0)
+
+            # try to convert to number
+            if value is None:
+                number = default
+            else:
+                try:
+                    number = float(value)
+                except (ValueError, TypeError):
+                    number = default
+            if number is None:
+                # if a field has mixed strings and numbers, strings are sorted higher
+                return (-10, 0) if value is None else (1, value, 0)
+            elif limit is None:
+                return (0, -number, 0) if reverse else (0, number, 0)
+
+            value = number
+            return ((0, -abs(value - limit), value - limit if reverse else limit - value) if closest
+                    else (0, value, 0) if not reverse and value <= limit
+                    else (0, -value, 0) if (reverse and value == limit) or value > limit
+                    else (-1, value, 0))
+
+        return preference
 
     @staticmethod
     def _fill_sorting_fields(format):
@@ -5624,20 +5805,26 @@ def _fill_sorting_fields(format):
             format['preference'] = -100
 
         # Determine missing bitrates
+        def combine(operator, a, b):
+            # Avoids raising (and catching) an exception in the common case of a missing value
+            if format.get(a) is None or format.get(b) is None:
+                return None
+            return try_call(lambda: operator(format[a], format[b])) or None
+
         if format.get('vcodec') == 'none':
             format['vbr'] = 0
         if format.get('acodec') == 'none':
             format['abr'] = 0
         if not format.get('vbr') and format.get('vcodec') != 'none':
-            format['vbr'] = try_call(lambda: format['tbr'] - format['abr']) or None
+            format['vbr'] = combine(operator.sub, 'tbr', 'abr')
         if not format.get('abr') and format.get('acodec') != 'none':
-            format['abr'] = try_call(lambda: format['tbr'] - format['vbr']) or None
+            format['abr'] = combine(operator.sub, 'tbr', 'vbr')
         if not format.get('tbr'):
-            format['tbr'] = try_call(lambda: format['vbr'] + format['abr']) or None
+            format['tbr'] = combine(operator.add, 'vbr', 'abr')
 
     def calculate_preference(self, format):
         self._fill_sorting_fields(format)
-        return tuple(self._calculate_field_preference(format, field) for field in self._order)
+        return tuple([preference(format) for preference in self._preferences])
 
 
 def filesize_from_tbr(tbr, duration):